@@ -6,6 +6,8 @@ import sys
 
 from argparse import ArgumentParser
 
+from pre_commit.reports import REPORT_WRITERS
+
 #
 # Parse arguments
 #
@@ -40,8 +42,134 @@ parser.add_argument(
     help="enable the R linter?"
 )
 
+parser.add_argument(
+    "--pre-push",
+    action="store_true",
+    help="also install a pre-push hook that lints the files of all of the "
+    "commits being pushed (e.g. commits made with '--no-verify')?"
+)
+
+parser.add_argument(
+    "--mirror",
+    action="store_true",
+    help="keep a persistent copy of the staged files in '.git/style/' that "
+    "is updated incrementally (faster when committing repeatedly)?"
+)
+
+parser.add_argument(
+    "--cache",
+    action="store_true",
+    help="cache linting results in '.git/style/' so that files whose staged "
+    "content was already linted are not linted again?"
+)
+
+parser.add_argument(
+    "--cache-size",
+    type=int,
+    default=64,
+    metavar="MB",
+    help="maximum size of the linting results cache, in megabytes "
+    "(default: 64)"
+)
+
+parser.add_argument(
+    "--python-in-process",
+    action="store_true",
+    help="run flake8 inside of the hook's process (through its Python API) "
+    "instead of as a new process?"
+)
+
+parser.add_argument(
+    "--changed-lines-only",
+    action="store_true",
+    help="only reject commits for linting problems on the lines that they "
+    "add or modify?"
+)
+
+parser.add_argument(
+    "--fail-fast",
+    action="store_true",
+    help="stop linting at the first file with linting problems, and only "
+    "report its problems?"
+)
+
+parser.add_argument(
+    "--report",
+    choices=sorted(REPORT_WRITERS),
+    default="",
+    help="also write a report of the linting problems of each commit "
+    "attempt to .git/style/, in this format"
+)
+
+parser.add_argument(
+    "--max-file-size",
+    type=int,
+    default=1024,
+    metavar="KB",
+    help="do not lint files larger than this, in kilobytes (default: 1024; "
+    "0 for no limit)"
+)
+
+parser.add_argument(
+    "--skip-generated",
+    action="store_true",
+    help="do not lint the files that look generated (e.g. with a \"Code "
+    "generated ... DO NOT EDIT.\" or \"@generated\" comment near their "
+    "top)"
+)
+
+parser.add_argument(
+    "--watch",
+    action="store_true",
+    help="lint staged files in the background as soon as they are staged, "
+    "so that the results are cached at commit time (implies --cache)?"
+)
+
+parser.add_argument(
+    "--server",
+    action="store_true",
+    help="lint in a background server that keeps the linters and the "
+    "recent results in memory between commits?"
+)
+
+parser.add_argument(
+    "--markdown-worker",
+    action="store_true",
+    help="keep a Node.js process with markdownlint loaded running between "
+    "commits, instead of starting markdownlint for each batch of files?"
+)
+
+parser.add_argument(
+    "--r-worker",
+    action="store_true",
+    help="keep an R session with lintr loaded running between commits, "
+    "instead of starting R for each file?"
+)
+
+parser.add_argument(
+    "--worker-idle-timeout",
+    type=int,
+    default=600,
+    metavar="SECONDS",
+    help="number of seconds after which an unused linter session (or lint "
+    "server) exits (default: 600)"
+)
+
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=0,
+    help="maximum number of linter processes to run at the same time "
+    "(default: the number of CPUs)"
+)
+
 args = parser.parse_args()
 
+# the watcher records its results in the cache
+if args.watch:
+    args.cache = True
+
 # if the user did not select a subset of linters to activate, default to
 # activating all of the available linters
 if not any([args.m, args.p, args.r]):
@@ -102,6 +230,20 @@ for repo in repos:
             current_target_pre_commit_hook_stat.st_mode | stat.S_IEXEC
         )
 
+        # likewise for the pre-push hook, if the user asked for it
+        if args.pre_push:
+            target_pre_push_hook = os.path.join(target_path, "pre-push")
+            if os.path.exists(target_pre_push_hook):
+                os.remove(target_pre_push_hook)
+            shutil.move(
+                os.path.join(target_path, "pre_commit", "pre-push"),
+                target_pre_push_hook
+            )
+            os.chmod(
+                target_pre_push_hook,
+                os.stat(target_pre_push_hook).st_mode | stat.S_IEXEC
+            )
+
         # write a configuration file for the linters that the user decided
         # to enable
         with open(
@@ -111,6 +253,30 @@ for repo in repos:
             conf_file.write("markdown = %s\n" % args.m)
             conf_file.write("python = %s\n" % args.p)
             conf_file.write("r = %s\n" % args.r)
+            conf_file.write("[options]\n")
+            conf_file.write("mirror = %s\n" % args.mirror)
+            conf_file.write("cache = %s\n" % args.cache)
+            conf_file.write("cache_size = %d\n" % args.cache_size)
+            conf_file.write("jobs = %d\n" % args.jobs)
+            conf_file.write(
+                "python_in_process = %s\n" % args.python_in_process
+            )
+            conf_file.write(
+                "changed_lines_only = %s\n" % args.changed_lines_only
+            )
+            conf_file.write("fail_fast = %s\n" % args.fail_fast)
+            conf_file.write("report = %s\n" % args.report)
+            conf_file.write("max_file_size = %d\n" % args.max_file_size)
+            conf_file.write("skip_generated = %s\n" % args.skip_generated)
+            conf_file.write("watch = %s\n" % args.watch)
+            conf_file.write("server = %s\n" % args.server)
+            conf_file.write(
+                "markdown_worker = %s\n" % args.markdown_worker
+            )
+            conf_file.write("r_worker = %s\n" % args.r_worker)
+            conf_file.write(
+                "worker_idle_timeout = %d\n" % args.worker_idle_timeout
+            )
 
         # mark installation as successful
         summary_dict[repo] = True
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Lint all of the tracked files of a repository, e.g. in CI.
+
+The files are read from the index, or from the tree of a given revision
+(without checking it out); alternatively, only the files changed between
+two revisions are linted. The work can be split across several machines
+with `--shard`.
+"""
+import sys
+
+from argparse import (
+    ArgumentParser,
+    ArgumentTypeError
+)
+
+from pre_commit.git import GitHandle
+from pre_commit.hook import (
+    get_available_linters,
+    get_path_patterns
+)
+from pre_commit.lint import Lint
+from pre_commit.patterns import PathMatcher
+from pre_commit.reports import REPORT_WRITERS
+from pre_commit.util import in_shard
+
+
+def parse_shard(value):
+    """
+    Parses a "<shard>/<number of shards>" argument.
+    """
+    try:
+        shard, shard_count = [int(part) for part in value.split("/")]
+    except ValueError:
+        raise ArgumentTypeError("expected '<shard>/<number of shards>'")
+
+    if not 1 <= shard <= shard_count:
+        raise ArgumentTypeError(
+            "the shard must be between 1 and the number of shards"
+        )
+
+    return shard, shard_count
+
+
+#
+# Parse arguments
+#
+parser = ArgumentParser(
+    description="Lint all of the tracked files of a repository. Unless "
+    "otherwise specified, all available linters are run."
+)
+
+parser.add_argument(
+    "repository",
+    nargs="?",
+    default=".",
+    help="the root or a subdirectory of the repository to lint "
+    "(default: the current directory)"
+)
+
+parser.add_argument(
+    "-m",
+    action="store_true",
+    help="run the Markdown linter?"
+)
+
+parser.add_argument(
+    "-p",
+    action="store_true",
+    help="run the Python linter?"
+)
+
+parser.add_argument(
+    "-r",
+    action="store_true",
+    help="run the R linter?"
+)
+
+files = parser.add_mutually_exclusive_group()
+
+files.add_argument(
+    "--revision",
+    help="lint the files of this revision (e.g. 'HEAD' or a commit hash) "
+    "instead of the files in the index"
+)
+
+files.add_argument(
+    "--range",
+    metavar="BASE..HEAD",
+    help="only lint the files changed between two revisions, as of the "
+    "second one (use 'BASE...HEAD' for the changes since the merge base)"
+)
+
+parser.add_argument(
+    "--shard",
+    type=parse_shard,
+    default=(1, 1),
+    metavar="I/N",
+    help="only lint the I-th of N disjoint slices of the files, e.g. '2/4' "
+    "(default: '1/1', i.e. all of the files)"
+)
+
+parser.add_argument(
+    "--fail-fast",
+    action="store_true",
+    help="stop at the first file with linting problems"
+)
+
+parser.add_argument(
+    "--report",
+    choices=sorted(REPORT_WRITERS),
+    help="also write a report of the linting problems in this format"
+)
+
+parser.add_argument(
+    "--report-file",
+    help="the path of the report (default: 'lint-report' with the extension "
+    "of the format, in the current directory)"
+)
+
+parser.add_argument(
+    "--max-file-size",
+    type=int,
+    default=1024,
+    metavar="KB",
+    help="do not lint files larger than this, in kilobytes (default: 1024; "
+    "0 for no limit)"
+)
+
+parser.add_argument(
+    "--skip-generated",
+    action="store_true",
+    help="do not lint the files that look generated"
+)
+
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=0,
+    help="maximum number of linter processes to run at the same time "
+    "(default: the number of CPUs)"
+)
+
+args = parser.parse_args()
+
+# if the user did not select a subset of linters, default to running all of
+# the available linters
+if not any([args.m, args.p, args.r]):
+    args.m = True
+    args.p = True
+    args.r = True
+
+git_handle = GitHandle(path=args.repository)
+
+# use the configuration files of the repository, like the hook
+available_linters = get_available_linters(
+    git_handle.root, python_in_process=True
+)
+linters = [
+    available_linters[k]
+    for k, enabled in (("markdown", args.m), ("python", args.p), ("r", args.r))
+    if enabled
+]
+
+# list the files of the shard
+if args.range:
+    all_blobs = git_handle.get_changed_files_blobs(args.range)
+else:
+    all_blobs = git_handle.get_tracked_files_blobs(args.revision)
+
+# leave out the files excluded by the `.style` file of the repository
+path_matcher = PathMatcher(get_path_patterns(git_handle.root))
+
+blobs = {
+    _path: sha for _path, sha in all_blobs.items()
+    if in_shard(_path, *args.shard) and not path_matcher.excludes(_path)
+}
+
+# set no traceback in error messages
+sys.tracebacklimit = 0
+
+if args.report and not args.report_file:
+    args.report_file = "lint-report%s" % REPORT_WRITERS[args.report].extension
+
+problems = Lint(
+    git_handle=git_handle, linters=linters, jobs=args.jobs,
+    report_format=args.report, report_path=args.report_file,
+    fail_fast=args.fail_fast, max_file_size=args.max_file_size * 1024,
+    skip_generated=args.skip_generated
+).run(blobs=blobs)
+
+print(
+    "%d of %d files have linting problems%s." % (
+        problems, len(blobs),
+        " (at least)" if args.fail_fast and problems else ""
+    ),
+    file=sys.stderr
+)
+
+# the number of files may not fit in an exit status
+sys.exit(1 if problems else 0)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+This module defines the `ResultCache` class, an on-disk cache of linting
+results keyed by the content of the linted files.
+
+It only depends on the standard library, so that it can also be run as a
+script to inspect or clear the cache of a repository where the hook is
+installed:
+
+```
+python .git/hooks/pre_commit/cache.py [--clear]
+```
+"""
+import json
+import sqlite3
+from argparse import ArgumentParser
+from hashlib import sha1
+from os import (
+    makedirs,
+    path
+)
+from time import time
+
+
+# default maximum size of the cached results, in bytes
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# approximate size of the bookkeeping data stored with each result, in bytes
+_ROW_OVERHEAD = 128
+
+
+class ResultCache(object):
+    """
+    A SQLite database holding the exit status and the output of linters.
+
+    Results are looked up by a key that identifies the content of the linted
+    file (i.e. its blob hash), the linter, its configuration and its version,
+    so that a blob that was already linted (e.g. in an earlier attempt to
+    commit, an amend or a rebase) is never linted again.
+
+    The least recently used results are evicted when the total size of the
+    cached results exceeds `max_size` bytes.
+
+    The database may be shared by concurrent processes (e.g. the hook and
+    the watcher, see `pre_commit.watcher`): each change is committed at
+    once, so that no process holds a write lock for long, and a lookup or a
+    change that fails because the database is busy is ignored (a lookup is
+    then a miss).
+    """
+
+    def __init__(self, db_path, max_size=DEFAULT_MAX_SIZE):
+        """
+        Args:
+            db_path: the path of the SQLite database; it is created if it
+                does not exist.
+            max_size: the maximum size of the cached results, in bytes.
+        """
+        self.db_path = db_path
+        self.max_size = max_size
+
+        makedirs(path.dirname(path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        # readers and a writer do not block each other
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        # this is a cache: durability is not worth an fsync per commit
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                status INTEGER,
+                output TEXT,
+                size INTEGER,
+                last_used REAL
+            );
+            CREATE INDEX IF NOT EXISTS results_last_used
+                ON results (last_used);
+            CREATE TABLE IF NOT EXISTS versions (
+                linter TEXT,
+                executable TEXT,
+                fingerprint TEXT,
+                paths TEXT,
+                version TEXT,
+                PRIMARY KEY (linter, executable)
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER
+            );
+        """)
+
+        # hits and misses of this session, saved by `commit()`
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Combines the parts of a key (e.g. a blob hash, the name of a linter,
+        the hash of its configuration, its version and, for path-scoped
+        configurations, the path of the file) into a single string.
+        """
+        return sha1("\0".join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a result.
+
+        Args:
+            key: a key built with `make_key()`.
+
+        Returns:
+            A `(status, output)` tuple with the exit status and the output of
+            the linter, or `None` if the result is not cached.
+        """
+        try:
+            row = self.connection.execute(
+                "SELECT status, output FROM results WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE results SET last_used = ? WHERE key = ?",
+                    (time(), key)
+                )
+                self.connection.commit()
+
+        except sqlite3.OperationalError:
+            # e.g. the database is locked by another process
+            self.connection.rollback()
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        status, output = row
+        return status, output
+
+    def put(self, key, status, output):
+        """
+        Stores a result.
+
+        Args:
+            key: a key built with `make_key()`.
+            status: the exit status of the linter.
+            output: the output of the linter, which must not depend on the
+                path of the linted file, as results are shared by all the
+                paths with the same key (see `dump_diagnostics()`).
+        """
+        try:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (
+                    key, status, output,
+                    len(output.encode('utf-8')) + _ROW_OVERHEAD, time()
+                )
+            )
+            self.connection.commit()
+
+        except sqlite3.OperationalError:
+            # the result is not cached
+            self.connection.rollback()
+
+    def get_version(self, linter, executable):
+        """
+        Returns the version of a linter stored by `set_version()`, as a
+        `(fingerprint, paths, version)` tuple, or `None`.
+        """
+        try:
+            row = self.connection.execute(
+                "SELECT fingerprint, paths, version FROM versions "
+                "WHERE linter = ? AND executable = ?",
+                (linter, executable)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+
+        if row is None:
+            return None
+
+        fingerprint, paths, version = row
+        return fingerprint, json.loads(paths), version
+
+    def set_version(self, linter, executable, fingerprint, paths, version):
+        """
+        Stores the version of a linter.
+
+        Args:
+            linter: the name of the linter.
+            executable: the path of the executable of the linter.
+            fingerprint: a fingerprint of the executable and of `paths`,
+                which tells when the version must be looked up again.
+            paths: the list of the paths from which the linter loads its
+                code (e.g. its plugins).
+            version: the version of the linter.
+        """
+        try:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?)",
+                (linter, executable, fingerprint, json.dumps(paths), version)
+            )
+            self.connection.commit()
+
+        except sqlite3.OperationalError:
+            # the version is looked up again next time
+            self.connection.rollback()
+
+    def _evict(self):
+        """
+        Deletes the least recently used results until the total size of the
+        cached results is below `max_size`.
+        """
+        total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+        if total_size <= self.max_size:
+            return
+
+        rows = self.connection.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ).fetchall()
+
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_size:
+                break
+            evicted.append((key,))
+            total_size -= size
+
+        self.connection.executemany(
+            "DELETE FROM results WHERE key = ?", evicted
+        )
+
+    def commit(self):
+        """
+        Evicts results if needed and saves the statistics to disk.
+        """
+        try:
+            self._evict()
+
+            for name, value in (
+                ("hits", self.hits), ("misses", self.misses)
+            ):
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO stats VALUES (?, 0)", (name,)
+                )
+                self.connection.execute(
+                    "UPDATE stats SET value = value + ? WHERE name = ?",
+                    (value, name)
+                )
+            self.connection.commit()
+            self.hits = 0
+            self.misses = 0
+
+        except sqlite3.OperationalError:
+            # the statistics are saved by a later commit
+            self.connection.rollback()
+
+    def close(self):
+        """
+        Commits all changes and closes the database.
+        """
+        self.commit()
+        self.connection.close()
+
+    def get_stats(self):
+        """
+        Returns a dictionary with the number of cached results, their total
+        size in bytes, and the number of cache hits and misses recorded so
+        far.
+        """
+        entries, size = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+
+        stats = {"entries": entries, "size": size, "hits": 0, "misses": 0}
+        stats.update(
+            self.connection.execute("SELECT name, value FROM stats")
+        )
+        stats["hits"] += self.hits
+        stats["misses"] += self.misses
+
+        return stats
+
+    def get_hit_ratio(self):
+        """
+        Returns the fraction of lookups that were cache hits, or `None` if
+        there were no lookups.
+        """
+        stats = self.get_stats()
+        lookups = stats["hits"] + stats["misses"]
+
+        return stats["hits"] / lookups if lookups else None
+
+    def clear(self):
+        """
+        Deletes all cached results and statistics.
+        """
+        self.connection.executescript("""
+            DELETE FROM results;
+            DELETE FROM versions;
+            DELETE FROM stats;
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.connection.commit()
+
+
+def get_default_cache_path(git_dir):
+    """
+    Returns the path of the cache of a repository.
+
+    Args:
+        git_dir: the absolute path of the git directory of the repository.
+    """
+    return path.join(git_dir, "style", "cache.sqlite")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Show statistics about the linting results cache of the "
+        "'style' pre-commit hook."
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="delete all cached results"
+    )
+    args = parser.parse_args()
+
+    # this file lives in ".git/hooks/pre_commit/"
+    cache = ResultCache(get_default_cache_path(
+        path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+    ))
+
+    if args.clear:
+        cache.clear()
+        print("The cache was cleared.")
+
+    else:
+        stats = cache.get_stats()
+        hit_ratio = cache.get_hit_ratio()
+        print(
+            "Cached results: %d (%.1f MiB)\n"
+            "Hits: %d\n"
+            "Misses: %d\n"
+            "Hit ratio: %s" % (
+                stats["entries"], stats["size"] / 1024 / 1024,
+                stats["hits"], stats["misses"],
+                "n/a" if hit_ratio is None else "%.1f%%" % (100 * hit_ratio)
+            )
+        )
+
+    cache.connection.close()
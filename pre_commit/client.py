@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+This module defines the `LintClient` class, the client side of the lint
+server (see `pre_commit.server`).
+
+It only depends on the standard library, so that the hook does not need to
+load the linters when the server is available.
+"""
+import sys
+from glob import glob
+from hashlib import sha1
+from os import path
+
+from pre_commit.worker import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DaemonClient,
+    get_socket_path,
+    WorkerError
+)
+
+
+def get_server_socket_path():
+    """
+    Returns the path of the socket of the lint server running the code of
+    this package, so that hooks installed from different versions of this
+    repository never talk to the same server.
+    """
+    package_dir = path.dirname(path.abspath(__file__))
+
+    digest = sha1()
+    for file_path in sorted(glob(path.join(package_dir, "*.py"))):
+        with open(file_path, "rb") as source_file:
+            digest.update(source_file.read())
+
+    return get_socket_path(sys.executable, "lint-server", digest.hexdigest())
+
+
+class LintClient(DaemonClient):
+    """
+    Sends the staged blobs of a repository to the lint server, starting the
+    server if it is not running.
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, start_timeout=30,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        """
+        Args:
+            idle_timeout: the number of seconds after which the server exits
+                if it receives no requests.
+            start_timeout, request_timeout: see `DaemonClient`.
+        """
+        socket_path = get_server_socket_path()
+
+        super().__init__(
+            socket_path,
+            [
+                sys.executable, "-m", "pre_commit.server",
+                "--socket", socket_path,
+                "--idle-timeout", str(idle_timeout)
+            ],
+            start_timeout,
+            request_timeout
+        )
+
+    def lint(self, root, conf_file_path, blobs, changed_lines=None):
+        """
+        Lints blobs with the server.
+
+        Args:
+            root: the absolute path of the root of the repository.
+            conf_file_path: the full path to the `linters.conf` file of the
+                hook.
+            blobs: a dictionary mapping the relative paths of the files to
+                lint to the hashes of their blobs.
+            changed_lines: an optional dictionary mapping the relative paths
+                of the files to a `LineIndex` of their changed lines (see
+                `pre_commit.diff`), which is needed to only report the
+                problems on changed lines (see `Lint.run()`).
+
+        Returns:
+            A `(status, output)` tuple with the number of files with linting
+            problems and the output of the linters, or `None` if the server
+            is not available.
+        """
+        try:
+            response = self.request({
+                "root": root,
+                "conf_file_path": conf_file_path,
+                "blobs": blobs,
+                "changed_lines": None if changed_lines is None else {
+                    pth: line_index.ranges()
+                    for pth, line_index in changed_lines.items()
+                }
+            })
+        except (OSError, ValueError, WorkerError):
+            return None
+
+        return response["status"], response["output"]
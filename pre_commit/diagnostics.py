@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+This module defines the `Diagnostic` class, which holds a problem reported by
+a linter, and the functions that parse the output of the linters into
+diagnostics.
+
+The linters are asked for machine-readable output where they support it
+(flake8's `--format` option, markdownlint's `--json` option, and a
+tab-separated format printed by the R code of `RLinter`); the output of
+other linters is parsed as "<path>:<line>[:<column>]: <message>" lines.
+Output that cannot be parsed (e.g. a crash of the linter) is kept as a
+diagnostic without a line, so that it is still reported.
+"""
+import json
+import re
+from collections import namedtuple
+
+
+# the format of flake8's output, for its `--format` option
+FLAKE8_FORMAT = "%(path)s\t%(row)d\t%(col)d\t%(code)s\t%(text)s"
+
+
+class Diagnostic(namedtuple(
+    "Diagnostic", ["path", "line", "column", "code", "message", "severity"]
+)):
+    """
+    A problem reported by a linter.
+
+    Attributes:
+        path: the path of the file, as passed to the linter.
+        line: the 1-based line of the problem, or `None` if the problem is
+            not about a line (e.g. a crash of the linter).
+        column: the 1-based column of the problem, or `None`.
+        code: the name or code of the rule (e.g. "E225"), or "".
+        message: the description of the problem.
+        severity: "error", "warning" or "style".
+    """
+    __slots__ = ()
+
+    def format(self):
+        """
+        Returns the diagnostic as a "<path>:<line>:<column>: <code> <message>"
+        string, or its message alone if it is not about a line.
+        """
+        if self.line is None:
+            return self.message
+
+        location = "%s:%d" % (self.path, self.line)
+        if self.column is not None:
+            location += ":%d" % self.column
+
+        return "%s: %s" % (
+            location,
+            "%s %s" % (self.code, self.message) if self.code else self.message
+        )
+
+
+def format_diagnostics(diagnostics):
+    """
+    Returns the text of a list of diagnostics, one per line.
+    """
+    return "".join("%s\n" % diagnostic.format() for diagnostic in diagnostics)
+
+
+def dump_diagnostics(diagnostics):
+    """
+    Serializes the diagnostics of a file (e.g. to store them in the cache),
+    leaving out their path.
+    """
+    return json.dumps([diagnostic[1:] for diagnostic in diagnostics])
+
+
+def load_diagnostics(data, pth):
+    """
+    Deserializes the output of `dump_diagnostics()` for the file at `pth`.
+    """
+    return [Diagnostic(pth, *fields) for fields in json.loads(data)]
+
+
+def _parse_lines(out, default_path, parse_line):
+    """
+    Parses the output of a linter line by line.
+
+    Args:
+        out: the output of the linter.
+        default_path: the path of the diagnostics that are not about a line.
+        parse_line: a function returning the `Diagnostic` of a line, or
+            `None` if the line does not start a diagnostic.
+
+    Returns:
+        A list of `Diagnostic` objects; the lines that do not start a
+        diagnostic (e.g. the code snippets printed by some linters) are
+        appended to the message of the previous one.
+    """
+    diagnostics = []
+    for line in out.splitlines():
+        diagnostic = parse_line(line)
+        if diagnostic is not None:
+            diagnostics.append(diagnostic)
+        elif diagnostics:
+            diagnostics[-1] = diagnostics[-1]._replace(
+                message="%s\n%s" % (diagnostics[-1].message, line)
+            )
+        elif line.strip():
+            diagnostics.append(
+                Diagnostic(default_path, None, None, "", line, "error")
+            )
+
+    return diagnostics
+
+
+def parse_text(out, pth):
+    """
+    Parses the output of a linter for the file at `pth`, made of
+    "<path>:<line>[:<column>][:] <message>" lines.
+    """
+    pattern = re.compile(r"^%s:(\d+)(?::(\d+))?:?\s*(.*)$" % re.escape(pth))
+
+    def parse_line(line):
+        match = pattern.match(line)
+        if match is None:
+            return None
+
+        row, column, message = match.groups()
+        return Diagnostic(
+            pth, int(row), int(column) if column else None, "", message,
+            "error"
+        )
+
+    return _parse_lines(out, pth, parse_line)
+
+
+def parse_flake8(out, default_path):
+    """
+    Parses the output of flake8 in the `FLAKE8_FORMAT` format.
+    """
+    def parse_line(line):
+        fields = line.split("\t", 4)
+        if len(fields) != 5 or not fields[1].isdigit():
+            return None
+
+        pth, row, column, code, message = fields
+        return Diagnostic(
+            pth, int(row), int(column), code, message,
+            "warning" if code.startswith("W") else "error"
+        )
+
+    return _parse_lines(out, default_path, parse_line)
+
+
+def parse_markdownlint(out, default_path):
+    """
+    Parses the JSON output of markdownlint (the list of results printed with
+    its `--json` option).
+    """
+    try:
+        results = json.loads(out) if out.strip() else []
+    except ValueError:
+        # e.g. a crash of markdownlint
+        return _parse_lines(out, default_path, lambda line: None)
+
+    diagnostics = []
+    for result in results:
+        message = result["ruleDescription"]
+        if result.get("errorDetail"):
+            message += " [%s]" % result["errorDetail"]
+        if result.get("errorContext"):
+            message += ' [Context: "%s"]' % result["errorContext"]
+
+        diagnostics.append(Diagnostic(
+            result["fileName"],
+            result["lineNumber"],
+            result["errorRange"][0] if result.get("errorRange") else None,
+            "/".join(result["ruleNames"]),
+            message,
+            "error"
+        ))
+
+    # markdownlint lists the problems of a file rule by rule
+    return sorted(
+        diagnostics, key=lambda d: (d.path, d.line, d.column or 0, d.code)
+    )
+
+
+def parse_lintr(out, default_path):
+    """
+    Parses the tab-separated output of the R code of `RLinter`, with the
+    path, the line, the column, the linter, the type and the message of
+    each lint.
+    """
+    def parse_line(line):
+        fields = line.split("\t", 5)
+        if len(fields) != 6 or not fields[1].isdigit():
+            return None
+
+        pth, row, column, linter, lint_type, message = fields
+        return Diagnostic(
+            pth, int(row), int(column) if column.isdigit() else None,
+            linter, message, lint_type
+        )
+
+    return _parse_lines(out, default_path, parse_line)
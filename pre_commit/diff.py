@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+This module implements diff-aware linting: it finds the lines that a diff
+changes in each file, and drops the problems that linters report on other
+lines, so that touching a legacy file does not require fixing all of its
+pre-existing problems.
+"""
+import re
+from bisect import bisect_right
+
+
+# the header of a hunk of a unified diff, e.g. "@@ -12,3 +12,4 @@"
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class LineIndex(object):
+    """
+    An interval index of the lines of a file that a diff changes.
+    """
+
+    def __init__(self, ranges=()):
+        """
+        Args:
+            ranges: an iterable of `(first line, last line)` tuples (both
+                1-based and inclusive), which must not overlap.
+        """
+        ranges = sorted(ranges)
+        self._starts = [start for start, end in ranges]
+        self._ends = [end for start, end in ranges]
+
+    def __contains__(self, line):
+        # find the last range that starts before the line
+        i = bisect_right(self._starts, line) - 1
+        return i >= 0 and line <= self._ends[i]
+
+    def __bool__(self):
+        return bool(self._starts)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, LineIndex) and
+            (self._starts, self._ends) == (other._starts, other._ends)
+        )
+
+    def __repr__(self):
+        return "LineIndex(%r)" % self.ranges()
+
+    def ranges(self):
+        """
+        Returns the sorted list of the `(first line, last line)` tuples of
+        the index, e.g. to send it to another process.
+        """
+        return list(zip(self._starts, self._ends))
+
+
+def parse_changed_lines(diff):
+    """
+    Finds the lines that a diff changes in each file.
+
+    Args:
+        diff: the output of `git diff -U0`, as a string.
+
+    Returns:
+        A dictionary mapping the relative path of each file (in the new
+        version) to a `LineIndex` of its added or modified lines; deleted
+        lines do not count, and deleted files are left out.
+    """
+    changed_lines = {}
+    ranges = None
+    # the numbers of old and new lines of the current hunk that are left to
+    # read: they may look like headers (e.g. an added "++ b/foo" line is
+    # "+++ b/foo")
+    old_lines = new_lines = 0
+    previous_line = ""
+
+    for line in diff.splitlines():
+        if old_lines > 0 or new_lines > 0:
+            # "\ No newline at end of file" is not a line of the hunk
+            if line[:1] in ("-", " "):
+                old_lines -= 1
+            if line[:1] in ("+", " "):
+                new_lines -= 1
+            continue
+
+        if line.startswith("+++ ") and previous_line.startswith("--- "):
+            # "+++ b/<path>", or "+++ /dev/null" for a deleted file
+            ranges = []
+            if line.startswith("+++ b/"):
+                changed_lines[line[len("+++ b/"):]] = ranges
+
+        match = HUNK_HEADER.match(line)
+        if match and ranges is not None:
+            old_count = int(match.group(1) or 1)
+            start = int(match.group(2))
+            count = int(match.group(3) or 1)
+            if count:
+                ranges.append((start, start + count - 1))
+            old_lines, new_lines = old_count, count
+
+        previous_line = line
+
+    return {pth: LineIndex(ranges) for pth, ranges in changed_lines.items()}
+
+
+def filter_diagnostics(diagnostics, line_index):
+    """
+    Keeps the problems that a linter reports on the changed lines of a file.
+
+    Args:
+        diagnostics: a list of `Diagnostic` objects for a single file (see
+            `pre_commit.diagnostics`).
+        line_index: a `LineIndex` of the changed lines of the file.
+
+    Returns:
+        The diagnostics on changed lines, and the diagnostics that are not
+        about a line (e.g. a crash of the linter).
+    """
+    return [
+        diagnostic for diagnostic in diagnostics
+        if diagnostic.line is None or diagnostic.line in line_index
+    ]
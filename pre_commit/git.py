@@ -3,15 +3,29 @@
 This module defines the `GitHandle` class which encapsulates the logic of all
 of the necessary interaction with git.
 """
-from os import path
+import asyncio
+from collections import namedtuple
+from os import (
+    makedirs,
+    path,
+    remove
+)
 from shlex import shlex
 from subprocess import (
     Popen,
     PIPE
 )
 
+from pre_commit.diff import parse_changed_lines
 from pre_commit.util import exec_in_dir
 
+# maximum number of bytes of a staged file that are held in memory at once
+CHUNK_SIZE = 64 * 1024
+
+# the modes of the entries of a tree that are not regular files
+SUBMODULE_MODE = "160000"
+SYMLINK_MODE = "120000"
+
 
 class GitError(Exception):
     pass
@@ -31,6 +45,195 @@ class RepositoryError(GitError):
     pass
 
 
+class FileChange(namedtuple(
+    "FileChange",
+    ["status", "old_path", "path", "old_mode", "new_mode", "old_sha",
+     "new_sha"]
+)):
+    """
+    A file changed between two trees (or between a tree and the index), as
+    listed by `git diff --raw`.
+
+    Attributes:
+        status: the status letter of the change, e.g. "A" (added), "M"
+            (modified), "D" (deleted) or "R" (renamed).
+        old_path: the relative path of the file before the change, which is
+            different from `path` for renames.
+        path: the relative path of the file after the change.
+        old_mode: the mode of the file before the change.
+        new_mode: the mode of the file after the change.
+        old_sha: the hash of the blob before the change.
+        new_sha: the hash of the blob after the change (made of zeros for
+            deletions).
+    """
+    __slots__ = ()
+
+    @property
+    def changes_content(self):
+        """
+        Whether the change produces new content to lint, i.e. a regular file
+        whose blob changed (which leaves out deletions, renames without
+        changes, mode changes, submodules and symbolic links).
+
+        A file renamed without changes still counts if its extension changed,
+        since other linters may apply to it.
+        """
+        return (
+            self.status != "D" and
+            self.new_mode not in (SUBMODULE_MODE, SYMLINK_MODE) and (
+                self.new_sha != self.old_sha or
+                path.splitext(self.old_path)[1] != path.splitext(self.path)[1]
+            )
+        )
+
+
+def parse_raw_diff(out):
+    """
+    Parses the output of `git diff --raw -z` (or `git diff-tree`), with or
+    without rename detection.
+
+    Args:
+        out: the output of git, as bytes.
+
+    Returns:
+        A list of `FileChange` objects.
+    """
+    # with `-z`, each change produces NUL-terminated fields:
+    # ":<old mode> <new mode> <old hash> <new hash> <status>", "<path>",
+    # and "<new path>" for renames and copies (and `git diff-tree --stdin`
+    # adds the hash of each commit before its changes)
+    fields = iter(out.decode('utf-8').split('\0'))
+    changes = []
+    for field in fields:
+        if not field.startswith(":"):
+            continue
+        old_mode, new_mode, old_sha, new_sha, status = field[1:].split()
+        old_path = next(fields)
+        _path = next(fields) if status[0] in "RC" else old_path
+        changes.append(FileChange(
+            status[0], old_path, _path, old_mode, new_mode, old_sha, new_sha
+        ))
+
+    return changes
+
+
+class _AsyncCatFile(object):
+    """
+    A thin wrapper around a long-lived `git cat-file --batch` asyncio
+    subprocess, to be created with `start()`.
+
+    Objects are requested one at a time by writing their name to the
+    process' stdin and reading the response from its stdout, so that a
+    single git process can serve an arbitrary number of blobs.
+
+    The content of an object is never read in one go: it is handed over in
+    chunks of at most `CHUNK_SIZE` bytes, as they arrive from git.
+    """
+
+    def __init__(self, process):
+        self.process = process
+
+    @classmethod
+    async def start(cls, root):
+        """
+        Starts a `git cat-file --batch` process.
+
+        Args:
+            root: the absolute path to the root of a git repository.
+
+        Returns:
+            An `_AsyncCatFile` instance.
+        """
+        process = await asyncio.create_subprocess_exec(
+            "git", "cat-file", "--batch",
+            cwd=root,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+
+        return cls(process)
+
+    async def request(self, name):
+        """
+        Asks git for an object and reads the header of the response.
+
+        Args:
+            name: an object name understood by git, e.g. the hash of a blob.
+
+        Returns:
+            The size of the object in bytes, or `None` if the object does
+            not exist.
+        """
+        self.process.stdin.write(("%s\n" % name).encode('utf-8'))
+        await self.process.stdin.drain()
+
+        # the header is either "<sha> <type> <size>" or "<name> missing"
+        header = (await self.process.stdout.readline()).decode('utf-8')
+        if not header:
+            raise GitError("git cat-file exited unexpectedly.")
+        header = header.split()
+        if header[-1] == "missing":
+            return None
+
+        return int(header[-1])
+
+    async def read_head(self, size):
+        """
+        Reads the first `size` bytes of the object whose header was just
+        requested; the rest of it must then be read with `copy()` or
+        `skip()`.
+        """
+        return await self.process.stdout.readexactly(size)
+
+    async def _chunks(self, size):
+        """
+        Yields the (rest of the) content of the object whose header was just
+        requested, in chunks of at most `CHUNK_SIZE` bytes.
+        """
+        remaining = size
+        while remaining:
+            chunk = await self.process.stdout.read(
+                min(remaining, CHUNK_SIZE)
+            )
+            if not chunk:
+                raise GitError("git cat-file exited unexpectedly.")
+            remaining -= len(chunk)
+            yield chunk
+
+        # each object is followed by a '\n'
+        await self.process.stdout.readexactly(1)
+
+    async def copy(self, size, file_obj):
+        """
+        Copies the (rest of the) content of the object whose header was just
+        requested to a file, without holding more than `CHUNK_SIZE` bytes in
+        memory.
+
+        Args:
+            size: the number of bytes left to read from the object.
+            file_obj: a file object opened for writing in binary mode.
+        """
+        async for chunk in self._chunks(size):
+            file_obj.write(chunk)
+
+    async def skip(self, size):
+        """
+        Discards the (rest of the) object whose header was just requested.
+        """
+        async for chunk in self._chunks(size):
+            pass
+
+    async def close(self):
+        """
+        Terminates the `git cat-file` process.
+        """
+        self.process.stdin.close()
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+
 class GitHandle(object):
     """
     This class provides a handle to perform git-related operations in the
@@ -109,38 +312,306 @@ class GitHandle(object):
 
             return head_hash
 
+    def get_git_dir(self):
+        """
+        Gets the absolute path of the git directory of the repository
+        (usually the `.git` subdirectory of its root).
+
+        Returns:
+            A string with the absolute path of the git directory.
+        """
+        with exec_in_dir(self.root):
+            pipe = Popen(
+                ["git", "rev-parse", "--absolute-git-dir"],
+                stdout=PIPE,
+                stderr=PIPE
+            )
+            out, err = pipe.communicate()
+
+            # strip the trailing '\n'
+            return out.decode('utf-8')[:-1]
+
     def get_staged_files_paths(self):
         """
         Gets the relative paths of all staged files.
 
         Returns:
             A list with the relative paths of all files that are currently
-            staged.
+            staged, without the deleted files.
+        """
+        return [
+            change.path for change in self.get_staged_changes()
+            if change.status != "D"
+        ]
+
+    def get_staged_changes(self):
+        """
+        Lists the staged changes, with rename detection.
+
+        Returns:
+            A list of `FileChange` objects.
+        """
+        head_hash = self.get_head_hash()
+
+        with exec_in_dir(self.root):
+            pipe = Popen(
+                [
+                    "git", "diff", "--cached", "--raw", "-z", "--no-abbrev",
+                    "-M", head_hash
+                ],
+                stdout=PIPE,
+                stderr=PIPE
+            )
+            out, err = pipe.communicate()
+
+        if pipe.returncode:
+            raise GitError(err.decode('utf-8').strip())
+
+        return parse_raw_diff(out)
+
+    def get_staged_files_blobs(self):
+        """
+        Gets the relative paths of the staged files whose content changed
+        together with the hashes of their staged blobs.
+
+        Deleted files, renamed files without changes, files whose mode
+        changed only, submodules and symbolic links are left out (see
+        `FileChange.changes_content`).
+
+        Returns:
+            A dictionary mapping the relative path of each file to the hash of
+            its blob in the index.
+        """
+        return {
+            change.path: change.new_sha
+            for change in self.get_staged_changes() if change.changes_content
+        }
+
+    def get_staged_changed_lines(self):
+        """
+        Gets the lines that the staged changes add or modify in each file.
+
+        Returns:
+            A dictionary mapping the relative path of each staged file to a
+            `LineIndex` (see `pre_commit.diff`) of its changed lines.
         """
         head_hash = self.get_head_hash()
 
         with exec_in_dir(self.root):
             pipe = Popen(
-                ["git", "diff", "--cached", "--name-only", head_hash],
+                [
+                    "git", "-c", "core.quotepath=off", "diff", "--cached",
+                    "-U0", "--no-color", "--no-ext-diff", "-M",
+                    "--src-prefix=a/", "--dst-prefix=b/", head_hash
+                ],
                 stdout=PIPE,
                 stderr=PIPE
             )
             out, err = pipe.communicate()
 
-            staged_files = (
-                out
-                .decode('utf-8')[:-1]    # remove trailing '\n'
-                .split('\n')
+        if pipe.returncode:
+            raise GitError(err.decode('utf-8').strip())
+
+        return parse_changed_lines(out.decode('utf-8', errors='replace'))
+
+    def get_changed_files_blobs(self, revision_range):
+        """
+        Gets the relative paths of the files changed between two revisions
+        together with the hashes of their blobs in the second revision.
+
+        The same changes as in `get_staged_files_blobs()` are left out.
+
+        Args:
+            revision_range: a range of revisions that `git diff` accepts,
+                e.g. "<base>..<head>" (the changes from `base` to `head`) or
+                "<base>...<head>" (the changes from the merge base of `base`
+                and `head` to `head`).
+
+        Returns:
+            A dictionary mapping the relative path of each changed file to
+            the hash of its blob in the second revision.
+        """
+        with exec_in_dir(self.root):
+            pipe = Popen(
+                [
+                    "git", "diff", "--raw", "-z", "--no-abbrev", "-M",
+                    revision_range
+                ],
+                stdout=PIPE,
+                stderr=PIPE
             )
+            out, err = pipe.communicate()
+
+        if pipe.returncode:
+            raise GitError(err.decode('utf-8').strip())
+
+        return {
+            change.path: change.new_sha
+            for change in parse_raw_diff(out) if change.changes_content
+        }
+
+    def _get_pushed_commits(self, local_sha, remote_sha, remote):
+        """
+        Lists the commits that pushing `local_sha` over `remote_sha` sends
+        to a remote, oldest first.
+        """
+        cmd = [
+            "git", "rev-list", "--reverse", "--topo-order", local_sha,
+            "--not", "--remotes=%s" % remote
+        ]
+
+        with exec_in_dir(self.root):
+            # the commit of the remote is unknown if it was never fetched
+            for extra_args in (
+                [remote_sha] if set(remote_sha) != {"0"} else [], []
+            ):
+                pipe = Popen(cmd + extra_args, stdout=PIPE, stderr=PIPE)
+                out, err = pipe.communicate()
+                if not pipe.returncode:
+                    return out.decode('utf-8').split()
+
+        raise GitError(err.decode('utf-8').strip())
+
+    def get_pushed_files_blobs(self, refs, remote):
+        """
+        Gets the blobs introduced by the commits that are being pushed,
+        together with the paths at which they were introduced.
 
-            # drop nulls produce by split, if any
-            staged_files = [file for file in staged_files if file]
+        The same changes as in `get_staged_files_blobs()` are left out, and
+        so are the changes of merge commits.
 
-            staged_files_paths = [
-                path.relpath(file, self.root) for file in staged_files
-            ]
+        Args:
+            refs: a list of `(local hash, remote hash)` tuples, one for each
+                ref being pushed, as read by a pre-push hook (the hash of
+                the remote ref is made of zeros if it does not exist yet).
+            remote: the name of the remote.
 
-            return staged_files_paths
+        Returns:
+            A list of distinct `(path, blob hash)` tuples, in the order in
+            which the commits introduced them; the same blob may appear at
+            several paths, which linters may treat differently (see
+            `Linter.plan()`, which lints it once when they do not).
+        """
+        commits = []
+        for local_sha, remote_sha in refs:
+            # skip deleted refs
+            if set(local_sha) == {"0"}:
+                continue
+            for commit in self._get_pushed_commits(
+                local_sha, remote_sha, remote
+            ):
+                if commit not in commits:
+                    commits.append(commit)
+
+        with exec_in_dir(self.root):
+            pipe = Popen(
+                [
+                    "git", "diff-tree", "--stdin", "-r", "--raw", "-z",
+                    "--no-abbrev", "-M", "--root"
+                ],
+                stdin=PIPE,
+                stdout=PIPE,
+                stderr=PIPE
+            )
+            out, err = pipe.communicate(
+                "".join("%s\n" % commit for commit in commits).encode('utf-8')
+            )
+
+        pushed_files_blobs = []
+        seen = set()
+        for change in parse_raw_diff(out):
+            file_blob = (change.path, change.new_sha)
+            if change.changes_content and file_blob not in seen:
+                seen.add(file_blob)
+                pushed_files_blobs.append(file_blob)
+
+        return pushed_files_blobs
+
+    def get_tracked_files_blobs(self, revision=None):
+        """
+        Gets the relative paths of all tracked files together with the hashes
+        of their blobs.
+
+        Submodules and symbolic links are left out.
+
+        Args:
+            revision: a revision (e.g. "HEAD", a branch or a commit hash)
+                whose tree lists the files; if `None`, the files are listed
+                from the index.
+
+        Returns:
+            A dictionary mapping the relative path of each tracked file to
+            the hash of its blob.
+        """
+        if revision is None:
+            # "<mode> <hash> <stage>\t<path>"
+            cmd = ["git", "ls-files", "--stage", "-z"]
+        else:
+            # "<mode> <type> <hash>\t<path>"
+            cmd = ["git", "ls-tree", "-r", "-z", "--full-tree", revision]
+
+        with exec_in_dir(self.root):
+            pipe = Popen(cmd, stdout=PIPE, stderr=PIPE)
+            out, err = pipe.communicate()
+
+        if pipe.returncode:
+            raise GitError(err.decode('utf-8').strip())
+
+        tracked_files_blobs = {}
+        for entry in out.decode('utf-8').split('\0'):
+            if not entry:
+                continue
+
+            info, _path = entry.split('\t', 1)
+            mode, field, field1 = info.split()
+
+            # skip submodules, symbolic links and unmerged entries
+            if mode in (SUBMODULE_MODE, SYMLINK_MODE):
+                continue
+            if revision is None and field1 != "0":
+                continue
+
+            tracked_files_blobs[_path] = field if revision is None else field1
+
+        return tracked_files_blobs
+
+    def get_blob_sizes(self, shas):
+        """
+        Gets the sizes of several blobs through a single
+        `git cat-file --batch-check` process, without reading their content.
+
+        Args:
+            shas: an iterable of blob hashes.
+
+        Returns:
+            A dictionary mapping the hash of each blob that exists to its
+            size in bytes.
+        """
+        with exec_in_dir(self.root):
+            pipe = Popen(
+                [
+                    "git", "cat-file",
+                    "--batch-check=%(objectname) %(objectsize)"
+                ],
+                stdin=PIPE,
+                stdout=PIPE,
+                stderr=PIPE
+            )
+            out, err = pipe.communicate(
+                "".join("%s\n" % sha for sha in shas).encode('utf-8')
+            )
+
+        if pipe.returncode:
+            raise GitError(err.decode('utf-8').strip())
+
+        # each line is either "<sha> <size>" or "<sha> missing"
+        blob_sizes = {}
+        for line in out.decode('utf-8').splitlines():
+            sha, size = line.split()
+            if size != "missing":
+                blob_sizes[sha] = int(size)
+
+        return blob_sizes
 
     def get_staged_file_content(self, staged_file_path):
         """
@@ -152,8 +623,6 @@ class GitHandle(object):
         Returns:
             A byte literal corresponding to the contents of the staged file.
         """
-        # quote the staged_file name or path in order to take care of
-        # escaping in the shell
         with exec_in_dir(self.root):
             pipe = Popen(
                 ["git", "show", ":%s" % staged_file_path],
@@ -163,3 +632,66 @@ class GitHandle(object):
             out, err = pipe.communicate()
 
             return out
+
+    async def write_blobs_async(self, blobs, dest_dir, callback=None,
+                                sniff=None, sniff_size=8000):
+        """
+        Writes the contents of several blobs to a directory, reading them
+        through a single `git cat-file --batch` asyncio subprocess and
+        streaming them to disk in bounded chunks, so that other work (e.g.
+        linting the files that were already written) can proceed in the
+        meantime.
+
+        Args:
+            blobs: a dictionary mapping relative file paths to blob hashes.
+            dest_dir: the path of the directory in which to write the files.
+            callback: an optional function that is called with the relative
+                path of each file as soon as the file is written (or
+                skipped).
+            sniff: an optional function that is called with the relative
+                path and the first `sniff_size` bytes of each file, before
+                the rest of the file is read, and that returns `True` if the
+                file should not be written (any previous version of the file
+                in `dest_dir` is then removed).
+            sniff_size: see `sniff`.
+
+        Returns:
+            A list with the paths of the written files, relative to
+            `dest_dir`.
+        """
+        cat_file = await _AsyncCatFile.start(self.root)
+
+        try:
+            written_files_paths = []
+            for rel_path, name in sorted(blobs.items()):
+                # ensure parent directory of the file exists inside of
+                # `dest_dir`
+                dest_path = path.join(dest_dir, rel_path)
+                makedirs(path.dirname(dest_path), exist_ok=True)
+
+                size = await cat_file.request(name)
+
+                head = b""
+                if size is not None and sniff is not None:
+                    head = await cat_file.read_head(min(size, sniff_size))
+                    if sniff(rel_path, head):
+                        await cat_file.skip(size - len(head))
+                        if path.exists(dest_path):
+                            remove(dest_path)
+                        if callback is not None:
+                            callback(rel_path)
+                        continue
+
+                with open(dest_path, "wb") as dest_file:
+                    dest_file.write(head)
+                    if size is not None:
+                        await cat_file.copy(size - len(head), dest_file)
+
+                written_files_paths.append(rel_path)
+                if callback is not None:
+                    callback(rel_path)
+
+            return written_files_paths
+
+        finally:
+            await cat_file.close()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+This module builds the linters and the `Lint` object of the hook from the
+`linters.conf` file written by the installer (and from the `.style` file of
+the repository, if any).
+"""
+import sqlite3
+from os import path
+
+from pre_commit.cache import (
+    get_default_cache_path,
+    ResultCache
+)
+from pre_commit.lint import Lint
+from pre_commit.linters import (
+    MarkdownLinter,
+    PythonLinter,
+    RLinter
+)
+from pre_commit.patterns import PathMatcher
+from pre_commit.reports import get_default_report_path
+from pre_commit.util import (
+    get_config,
+    get_linter_config
+)
+
+
+# the configuration files of the linters, at the root of a repository
+LINTER_CONFIG_FILES = {
+    "markdown": ".markdownlint.json",
+    "python": ".flake8",
+    "r": ".lintr"
+}
+
+# the file at the root of a repository with the patterns of the paths that
+# are excluded from linting
+PATHS_FILE = ".style"
+
+
+def get_path_patterns(root, conf_file_path=None, linter_name=None):
+    """
+    Returns the patterns of the paths excluded from linting (see
+    `pre_commit.patterns`), which are listed by the `exclude` and `include`
+    options of the `[paths]` section (or of the `[paths.<linter>]` section
+    of a single linter) of the `.style` file at the root of a repository
+    and of the `linters.conf` file.
+
+    Args:
+        root: the absolute path of the root of the repository.
+        conf_file_path: the full path to the `linters.conf` file, if any.
+        linter_name: the name of a linter (as in `LINTER_CONFIG_FILES`), or
+            `None` for the patterns of all linters.
+
+    Returns:
+        A list of patterns, where the included paths are negated so that
+        they take precedence over the excluded ones.
+    """
+    section = "paths" if linter_name is None else "paths.%s" % linter_name
+
+    patterns = []
+    for config_path in (path.join(root, PATHS_FILE), conf_file_path):
+        if not config_path or not get_linter_config(config_path):
+            continue
+
+        patterns.extend(
+            get_config(section, "exclude", config_path, "").splitlines()
+        )
+        patterns.extend(
+            "!%s" % pattern.strip() for pattern in get_config(
+                section, "include", config_path, ""
+            ).splitlines()
+            if pattern.strip()
+        )
+
+    return patterns
+
+
+def get_available_linters(root, python_in_process=False,
+                          conf_file_path=None):
+    """
+    Returns all of the available linters, set up with the configuration
+    files found at the root of a repository.
+
+    Args:
+        root: the absolute path of the root of the repository.
+        python_in_process: see `PythonLinter`.
+        conf_file_path: the full path to the `linters.conf` file, if any,
+            which may exclude files from some linters (see
+            `get_path_patterns()`).
+
+    Returns:
+        A dictionary mapping the names of the linters (as in
+        `LINTER_CONFIG_FILES`) to `Linter` objects.
+    """
+    config_paths = {
+        k: get_linter_config(path.join(root, file_name))
+        for k, file_name in LINTER_CONFIG_FILES.items()
+    }
+
+    linters = {
+        "markdown": MarkdownLinter(config_path=config_paths["markdown"]),
+        "python": PythonLinter(
+            config_path=config_paths["python"],
+            in_process=python_in_process
+        ),
+        "r": RLinter(config_path=config_paths["r"])
+    }
+
+    for k, linter in linters.items():
+        path_matcher = PathMatcher(get_path_patterns(root, conf_file_path, k))
+        if path_matcher:
+            linter.path_matcher = path_matcher
+
+    return linters
+
+
+def get_linters(root, conf_file_path):
+    """
+    Returns the linters enabled in a configuration file.
+
+    Args:
+        root: the absolute path of the root of the repository.
+        conf_file_path: the full path to the `linters.conf` file.
+
+    Returns:
+        A list of `Linter` objects (see `pre_commit.linters`).
+    """
+    # parse linters configuration file
+    available_linters = get_available_linters(
+        root,
+        python_in_process=get_config(
+            "options", "python_in_process", conf_file_path, "False"
+        ) == "True",
+        conf_file_path=conf_file_path
+    )
+
+    # keep slow linters running between commits
+    worker_idle_timeout = float(
+        get_config("options", "worker_idle_timeout", conf_file_path, "600")
+    )
+    for k in ("markdown", "r"):
+        if get_config(
+            "options", "%s_worker" % k, conf_file_path, "False"
+        ) == "True":
+            available_linters[k].use_worker(worker_idle_timeout)
+
+    linters = []
+
+    for k, v in available_linters.items():
+        value = get_config("linters", k, conf_file_path)
+        if value == "True":
+            linters.append(v)
+
+    return linters
+
+
+def get_lint(git_handle, conf_file_path, linters=None, cache=None,
+             mirror=None, changed_lines_only=None, report=None,
+             fail_fast=None):
+    """
+    Returns the `Lint` object of the hook.
+
+    Args:
+        git_handle: a `GitHandle` instance for the repository of interest.
+        conf_file_path: the full path to the `linters.conf` file.
+        linters: the linters to run; defaults to the linters enabled in
+            the configuration file (see `get_linters()`).
+        cache: the `ResultCache` to use; defaults to the cache of the
+            repository, if it is enabled in the configuration file.
+        mirror: whether to write the files to the mirror of the repository;
+            defaults to the configuration file.
+        changed_lines_only: whether to only report the problems on the lines
+            changed in the index; defaults to the configuration file.
+        report: if `False`, the report of the problems that the
+            configuration file may ask for (see `pre_commit.reports`) is not
+            written to the git directory.
+        fail_fast: whether to stop at the first file with linting problems;
+            defaults to the configuration file.
+    """
+    if linters is None:
+        linters = get_linters(git_handle.root, conf_file_path)
+
+    # parse the other options
+    if mirror is None:
+        mirror = (
+            get_config("options", "mirror", conf_file_path, "False") == "True"
+        )
+
+    if cache is None and get_config(
+        "options", "cache", conf_file_path, "False"
+    ) == "True":
+        try:
+            cache = ResultCache(
+                get_default_cache_path(git_handle.get_git_dir()),
+                max_size=int(
+                    get_config("options", "cache_size", conf_file_path, "64")
+                ) * 1024 * 1024
+            )
+        except sqlite3.OperationalError:
+            # e.g. the database is locked by another process: lint without
+            # the cache
+            cache = None
+
+    if changed_lines_only is None:
+        changed_lines_only = get_config(
+            "options", "changed_lines_only", conf_file_path, "False"
+        ) == "True"
+
+    report_format = report_path = None
+    if report is not False:
+        report_format = get_config(
+            "options", "report", conf_file_path, ""
+        ) or None
+    if report_format:
+        report_path = get_default_report_path(
+            git_handle.get_git_dir(), report_format
+        )
+
+    if fail_fast is None:
+        fail_fast = get_config(
+            "options", "fail_fast", conf_file_path, "False"
+        ) == "True"
+
+    # 0 stands for the number of CPUs
+    jobs = int(get_config("options", "jobs", conf_file_path, "0"))
+
+    path_matcher = PathMatcher(
+        get_path_patterns(git_handle.root, conf_file_path)
+    )
+
+    # in kilobytes, where 0 stands for no limit
+    max_file_size = int(
+        get_config("options", "max_file_size", conf_file_path, "1024")
+    ) * 1024
+
+    skip_generated = get_config(
+        "options", "skip_generated", conf_file_path, "False"
+    ) == "True"
+
+    return Lint(
+        git_handle=git_handle, linters=linters, mirror=mirror, cache=cache,
+        jobs=jobs, changed_lines_only=changed_lines_only,
+        report_format=report_format, report_path=report_path,
+        fail_fast=fail_fast, path_matcher=path_matcher,
+        max_file_size=max_file_size, skip_generated=skip_generated
+    )
@@ -5,13 +5,21 @@ This module is where all of the linting logic is defined.
 Note that you can use the `Linter` convenience class in the
 `pre_commit.linters` module to implement additional linters.
 """
-from os import (
-    makedirs,
-    path
-)
+import asyncio
+from os import cpu_count
 from tempfile import TemporaryDirectory
 
-from pre_commit.linters import Linter
+from pre_commit.linters import (
+    Linter,
+    LinterIndex
+)
+from pre_commit.mirror import Mirror
+from pre_commit.reports import open_report
+from pre_commit.sniff import (
+    format_skipped,
+    get_skip_reason,
+    SNIFF_SIZE
+)
 from pre_commit.util import exec_in_dir
 
 
@@ -22,18 +30,61 @@ class Lint(object):
     The main method is `run()`, which executes all available linters.
     """
 
-    def __init__(self, git_handle, linters, *args, **kwargs):
+    def __init__(self, git_handle, linters, mirror=False, cache=None,
+                 jobs=None, changed_lines_only=False, report_format=None,
+                 report_path=None, fail_fast=False, path_matcher=None,
+                 max_file_size=None, skip_generated=False, *args, **kwargs):
         """
         Args:
             git_handle: a `GitHandle` instance for the repository of interest.
             linters: an iterable of `Linter` objects
                 (see `pre_commit.linters`).
+            mirror: if `True`, the staged files are written to a persistent
+                `Mirror` (see `pre_commit.mirror`) that is updated
+                incrementally, instead of to a new temporary directory.
+            cache: an optional `ResultCache` (see `pre_commit.cache`) used
+                to skip linting blobs that were already linted.
+            jobs: the maximum number of linter processes to run at the same
+                time (defaults to the number of CPUs).
+            changed_lines_only: if `True`, only the problems on the lines
+                that the staged changes add or modify are reported (see
+                `pre_commit.diff`); this only applies to the staged files.
+            report_format: the format of an optional report of the problems
+                found by the linters (see `pre_commit.reports`), which is
+                written to `report_path` by each run.
+            report_path: the path of the report.
+            fail_fast: if `True`, linting stops at the first batch of files
+                with linting problems: its problems are reported, the linter
+                processes that are still running are killed and the files
+                that are still queued are not linted.
+            path_matcher: an optional `PathMatcher` of the files that are
+                not linted (see `pre_commit.patterns`), which are dropped
+                before anything else; the linters may exclude more files
+                (see `Linter.path_matcher`).
+            max_file_size: an optional size limit, in bytes, above which
+                files are not linted (nor read from git).
+            skip_generated: if `True`, the files that look generated are not
+                linted either, like binary files (see `pre_commit.sniff`);
+                both are recognized from their first few KB, before the rest
+                of them is read.
         """
         # get the input git handle
         self.git_handle = git_handle
 
         # get the available linters
         self.linters = self._get_linters(linters)
+        self.linter_index = LinterIndex(self.linters)
+
+        self.mirror = mirror
+        self.cache = cache
+        self.jobs = jobs or cpu_count() or 1
+        self.changed_lines_only = changed_lines_only
+        self.report_format = report_format
+        self.report_path = report_path
+        self.fail_fast = fail_fast
+        self.path_matcher = path_matcher
+        self.max_file_size = max_file_size
+        self.skip_generated = skip_generated
 
     def _get_linters(self, linters):
         """
@@ -43,64 +94,347 @@ class Lint(object):
 
         return linters
 
-    def run(self):
+    def run(self, blobs=None, changed_lines=None):
         """
         Main method that executes all of the available linters.
 
+        This is a thin wrapper around the `run_async()` coroutine.
+
+        Args:
+            blobs: an optional dictionary mapping the relative paths of the
+                files to lint to the hashes of their blobs; defaults to the
+                staged files (see `GitHandle.get_staged_files_blobs()`).
+            changed_lines: with `changed_lines_only`, an optional dictionary
+                mapping the relative paths of the files to a `LineIndex` of
+                their changed lines (see `pre_commit.diff`); defaults to the
+                lines changed in the index if `blobs` is not given, and to
+                all lines otherwise.
+
         Returns:
             An integer corresponding to the number of staged files with
             linting problems.
         """
+        return asyncio.run(self.run_async(blobs, changed_lines))
+
+    async def run_async(self, blobs=None, changed_lines=None):
+        """
+        Coroutine that executes all of the available linters.
+
+        Reading the staged files from git, writing them to disk and linting
+        them happen in a single event loop: each batch of files is linted as
+        soon as all of its files are written, while the other files are still
+        being read from the index.
+
+        Args:
+            blobs, changed_lines: see `run()`.
+
+        Returns:
+            An integer corresponding to the number of staged files with
+            linting problems.
+        """
+        tmp_dir = None
+        report_writer = None
+        tasks = []
+
         try:
-            # get staged files
-            staged_files_paths = self.git_handle.get_staged_files_paths()
+            # get staged files and the hashes of their staged blobs
+            if blobs is None:
+                staged_files_blobs = self.git_handle.get_staged_files_blobs()
+            else:
+                staged_files_blobs = blobs
+
+            # drop excluded files (e.g. vendored code)
+            if self.path_matcher:
+                staged_files_blobs = {
+                    _path: sha for _path, sha in staged_files_blobs.items()
+                    if not self.path_matcher.excludes(_path)
+                }
+
+            # the lines changed in the index (which the blobs of other
+            # revisions do not match, unless their changed lines are given)
+            if not self.changed_lines_only:
+                changed_lines = None
+            elif blobs is None:
+                changed_lines = self.git_handle.get_staged_changed_lines()
 
-            # check that paths and file names are ok
-            for _path in staged_files_paths:
+            # only the files that some linter applies to are read from git
+            # and written to disk (e.g. not images or archives)
+            linter_files = self.linter_index.classify(staged_files_blobs)
+            files_blobs = {
+                _file: staged_files_blobs[_file]
+                for files in linter_files for _file in files
+            }
+
+            # check that the paths and file names passed to linters are ok
+            for _path in files_blobs:
                 self.git_handle._check_path_is_allowed(_path)
 
-            # create a temporary directory
-            tmp_dir = TemporaryDirectory()
-
-            # write the content of the staged files to temporary files
-            files_in_tmp_dir = []   # list for rel paths of temporary files
-            for rel_path in staged_files_paths:
-                # ensure parent directory of a staged file exists inside of
-                # `tmp_dir`
-                makedirs(path.join(
-                    tmp_dir.name,
-                    path.dirname(rel_path)
-                ), exist_ok=True)
-                # write content of staged file to a temporary file and
-                # collect relative path in the list
-                tmp_file_path = path.join(tmp_dir.name, rel_path)
-                with open(tmp_file_path, "wb") as tmp_file:
-                    content = self.git_handle.get_staged_file_content(rel_path)
-                    tmp_file.write(content)
-                    files_in_tmp_dir.append(
-                        path.relpath(tmp_file_path, tmp_dir.name)
-                    )
+            # skip the files that are too large from the sizes of their
+            # blobs, without reading them
+            skipped = {}
+            if self.max_file_size:
+                blob_sizes = self.git_handle.get_blob_sizes(
+                    set(files_blobs.values())
+                )
+                for _file, sha in files_blobs.items():
+                    if blob_sizes.get(sha, 0) > self.max_file_size:
+                        skipped[_file] = "large"
+
+                files_blobs = {
+                    _file: sha for _file, sha in files_blobs.items()
+                    if _file not in skipped
+                }
+                linter_files = [
+                    [_file for _file in files if _file not in skipped]
+                    for files in linter_files
+                ]
+
+            if self.mirror:
+                # only rewrite the files whose staged blob changed since the
+                # last run
+                mirror = Mirror(self.git_handle)
+                work_dir = mirror.path
+                blobs_to_write = mirror.prepare(files_blobs)
 
-            # get current directory and change directory to temporary directory
+            else:
+                # create a temporary directory
+                tmp_dir = TemporaryDirectory()
+                work_dir = tmp_dir.name
+                blobs_to_write = files_blobs
+
+            files_in_work_dir = sorted(files_blobs)
+
+            # the report is written as the linters report their results
+            if self.report_format:
+                report_writer = open_report(
+                    self.report_format, self.report_path
+                )
+
+            # one future per file, which is done once the file is on disk
+            loop = asyncio.get_running_loop()
+            written = {
+                _file: loop.create_future() for _file in files_in_work_dir
+            }
+
+            # get current directory and change directory to the directory
+            # holding the staged files
             # (this is to ensure that relative paths are correctly displayed
             # during linting and that linters run on the staged version of the
-            # files, which are the ones saved in the temporary files);
+            # files, which are the ones saved in that directory);
             # not changing directory can cause the paths to be interpreted
             # relatively to the git repository root, which can cause the
             # linters to run on the version of the files that is currently
             # in the tree!
-            with exec_in_dir(tmp_dir.name):
+            with exec_in_dir(work_dir):
+                # plan the work of all linters (the files do not need to be
+                # on disk for that)
+                plans = [
+                    linter.plan(files, files_blobs, self.cache, self.jobs)
+                    for linter, files in zip(self.linters, linter_files)
+                ]
+
+                # each blob is linted at a single path, whose results are
+                # copied to the other paths of the blob
+                files_to_lint = {
+                    _file for plan in plans for batch in plan.batches
+                    for _file in batch
+                }
+                copies = {}
+                for plan in plans:
+                    for _file, file_copies in plan.copies.items():
+                        copies.setdefault(_file, set()).update(file_copies)
+
+                # a temporary directory only receives the files to lint (and
+                # not the files with cached results or the copies)
+                if not self.mirror:
+                    blobs_to_write = {
+                        _file: sha for _file, sha in blobs_to_write.items()
+                        if _file in files_to_lint
+                    }
+                for _file in files_in_work_dir:
+                    if _file not in blobs_to_write:
+                        written[_file].set_result(None)
+
+                # the files to lint are inspected as they are read from git,
+                # and skipped (with their copies) if they are binary or
+                # generated
+                def sniff(_file, head):
+                    if _file in files_to_lint:
+                        reason = get_skip_reason(head, self.skip_generated)
+                        if reason is not None:
+                            skipped[_file] = reason
+                            for copy in copies.get(_file, ()):
+                                skipped[copy] = reason
+                    return _file in skipped
+
+                # write the content of the staged files to disk (all
+                # contents are read through a single git process and
+                # streamed to disk)...
+                writer = asyncio.ensure_future(self._write_blobs(
+                    blobs_to_write, work_dir, written, sniff
+                ))
+                tasks.append(writer)
+
+                # ...and run the linters concurrently as the files arrive
+                semaphore = asyncio.Semaphore(self.jobs)
+                batch_tasks = [
+                    [
+                        asyncio.ensure_future(
+                            self._run_batch(
+                                linter, batch, written, semaphore, skipped
+                            )
+                        )
+                        for batch in plan.batches
+                    ]
+                    for linter, plan in zip(self.linters, plans)
+                ]
+                tasks.extend(
+                    task for linter_tasks in batch_tasks
+                    for task in linter_tasks
+                )
+
                 # initialize a counter to count how many linters return a
                 # non-zero exit status
                 non_zero_linters = 0
-                for linter in self.linters:
-                    # run the linters
-                    non_zero_linters += linter.lint(files_in_tmp_dir)
 
+                if self.fail_fast:
+                    non_zero_linters = await self._report_first_failure(
+                        plans, batch_tasks, changed_lines, report_writer
+                    )
+                    if non_zero_linters:
+                        # the outstanding work is cancelled below
+                        self._print_skipped(skipped)
+                        return non_zero_linters
+
+                else:
+                    # report the results of the linters in order, as soon as
+                    # each of them is done, so that the output does not
+                    # depend on which process finishes first
+                    for linter, plan, linter_tasks in zip(
+                        self.linters, plans, batch_tasks
+                    ):
+                        for task in linter_tasks:
+                            plan.results.update(
+                                linter.copy_results(plan, await task)
+                            )
+                        # (skipped files have no results)
+                        non_zero_linters += linter.report(
+                            plan._replace(files=[
+                                _file for _file in plan.files
+                                if _file in plan.results
+                            ]),
+                            self.cache, changed_lines, report_writer
+                        )
+
+                await writer
+                if self.mirror:
+                    mirror.save(files_blobs)
+
+                self._print_skipped(skipped)
                 return non_zero_linters
 
         except Exception:
             raise
 
         finally:
-            tmp_dir.cleanup()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if report_writer is not None:
+                report_writer.close()
+            if self.cache is not None:
+                self.cache.commit()
+            if tmp_dir is not None:
+                tmp_dir.cleanup()
+
+    async def _report_first_failure(self, plans, batch_tasks, changed_lines,
+                                    report_writer):
+        """
+        Reports the results of each batch of files as soon as it is done
+        (starting with the cached results), until a batch has linting
+        problems.
+
+        Returns:
+            The number of files with linting problems in the first batches
+            that have some, or 0 if there are none.
+        """
+        def report(linter, plan, results):
+            return linter.report(
+                plan._replace(files=sorted(results), results=results),
+                self.cache, changed_lines, report_writer
+            )
+
+        non_zero_linters = 0
+        for linter, plan in zip(self.linters, plans):
+            non_zero_linters += report(linter, plan, dict(plan.results))
+        if non_zero_linters:
+            return non_zero_linters
+
+        batch_linters = {
+            task: (linter, plan)
+            for linter, plan, linter_tasks in zip(
+                self.linters, plans, batch_tasks
+            )
+            for task in linter_tasks
+        }
+        pending = set(batch_linters)
+        while pending and not non_zero_linters:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                linter, plan = batch_linters[task]
+                non_zero_linters += report(
+                    linter, plan, linter.copy_results(plan, task.result())
+                )
+
+        return non_zero_linters
+
+    def _print_skipped(self, skipped):
+        """
+        Prints the summary of the files that were not linted, if any.
+        """
+        summary = format_skipped(skipped, self.max_file_size)
+        if summary:
+            print(summary)
+
+    async def _write_blobs(self, blobs, work_dir, written, sniff=None):
+        """
+        Writes blobs to the working directory, marking the future of each file
+        in `written` as done once the file is on disk (or skipped by
+        `sniff`).
+        """
+        try:
+            await self.git_handle.write_blobs_async(
+                blobs,
+                work_dir,
+                callback=lambda _file: written[_file].set_result(None),
+                sniff=sniff,
+                sniff_size=SNIFF_SIZE
+            )
+
+        except Exception as e:
+            # do not leave the linters waiting for files that never come
+            for future in written.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+    async def _run_batch(self, linter, batch, written, semaphore,
+                         skipped=None):
+        """
+        Runs a linter on a batch of files once all of them are on disk,
+        without running more than `jobs` linter processes at the same time.
+
+        The files in `skipped` are left out of the batch.
+        """
+        for _file in batch:
+            await written[_file]
+
+        batch = [_file for _file in batch if _file not in (skipped or {})]
+        if not batch:
+            return {}
+
+        async with semaphore:
+            return await linter.run_batch_async(batch)
@@ -9,22 +9,284 @@ In order to wrap additional linters,
 
 2. set the `extension` attribute in the `__init__` method
 
-3. implement the `linter_process()` method.
+3. implement the `linter_command()` method (or, if the linter cannot be
+   run as a plain command, the `linter_process()` method).
+
+4. optionally, if the linter accepts several files at once, set the `batch`
+   attribute to `True` and implement the `batch_command()` method (or the
+   `batch_process()` method), so that the linter is started once per batch
+   of files instead of once per file.
+
+5. optionally, set the `version_command` attribute to a command that prints
+   the version of the linter, so that results can be cached safely (see
+   `pre_commit.cache`), and override the `_look_up_version()` method to
+   also return the paths from which the linter loads its code, so that the
+   version is only looked up again when they change.
+
+6. optionally, if starting the linter is slow (e.g. because it runs in an
+   interpreter that takes long to start), set the `worker_command` attribute
+   to a command that starts an interpreter speaking the protocol of
+   `pre_commit.worker`, so that the linter can be kept running between
+   commits.
+
+7. optionally, if the linter can print machine-readable output, override the
+   `parse_output()` method, which parses the output of the linter into
+   `Diagnostic` objects (see `pre_commit.diagnostics`).
 
 You are free to define linters for additional programming languages here.
 """
+import asyncio
+import re
+import site
+import sys
+from collections import namedtuple
+from glob import glob
+from hashlib import sha1
+from os import (
+    environ,
+    getcwd,
+    path,
+    stat,
+    sysconf
+)
+from io import StringIO
+from shutil import (
+    copyfile,
+    which
+)
 from subprocess import (
     Popen,
     PIPE,
     STDOUT
 )
 
+from pre_commit.diagnostics import (
+    dump_diagnostics,
+    FLAKE8_FORMAT,
+    format_diagnostics,
+    load_diagnostics,
+    parse_flake8,
+    parse_lintr,
+    parse_markdownlint,
+    parse_text
+)
+from pre_commit.diff import (
+    filter_diagnostics,
+    LineIndex
+)
+from pre_commit.worker import (
+    DEFAULT_IDLE_TIMEOUT,
+    END_OF_OUTPUT,
+    WorkerClient,
+    WorkerError
+)
+
+
+# number of bytes of the command line of a linter reserved for the command
+# itself and its options (see `get_max_args_size()`)
+_COMMAND_RESERVE = 4096
+
+
+def _can_run_flake8_in_process():
+    """
+    Returns whether flake8 can run inside of the hook's process: it must be
+    installed for this interpreter, and recent enough (6.0 or later) for the
+    parts of its API that `PythonLinter` uses.
+    """
+    try:
+        import flake8
+    except ImportError:
+        return False
+
+    major = flake8.__version__.split(".")[0]
+    return major.isdigit() and int(major) >= 6
+
+
+def get_max_args_size():
+    """
+    Returns the number of bytes that the file path arguments of a single
+    linter command can take, which is bounded by the maximum size of the
+    arguments and environment of a new process (`ARG_MAX`).
+    """
+    try:
+        arg_max = sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError):    # e.g. on Windows
+        arg_max = 32768
+
+    # the environment is passed to the linter too
+    env_size = sum(
+        len(key) + len(value) + 2 + 8 for key, value in environ.items()
+    )
+
+    return max(arg_max - env_size - _COMMAND_RESERVE, _COMMAND_RESERVE)
+
+
+def get_fingerprint(paths):
+    """
+    Returns a fingerprint of files and directories that changes whenever one
+    of them is modified, e.g. whenever a package is installed in a
+    directory of packages.
+    """
+    parts = []
+    for pth in paths:
+        try:
+            path_stat = stat(pth)
+            parts.append("%s:%d:%d" % (
+                pth, path_stat.st_mtime_ns, path_stat.st_size
+            ))
+        except OSError:
+            parts.append("%s:-" % pth)
+
+    return "\0".join(parts)
+
+
+def get_site_dirs(script):
+    """
+    Returns the directories of packages of the Python interpreter of a
+    script (and of the current user), guessed from the shebang line of the
+    script without running it.
+    """
+    interpreter = script
+    with open(script, "rb") as script_file:
+        shebang = script_file.readline().decode('utf-8', 'replace')
+    if shebang.startswith("#!") and shebang[2:].split():
+        interpreter = shebang[2:].split()[0]
+
+    prefix = path.dirname(path.dirname(interpreter))
+
+    return sorted(set(
+        glob(path.join(prefix, "lib", "python*", "*-packages")) +
+        glob(path.join(prefix, "local", "lib", "python*", "*-packages")) +
+        glob(path.join(
+            path.expanduser("~"), ".local", "lib", "python*", "site-packages"
+        ))
+    ))
+
+
+def chunk_paths(paths, max_size, max_count=None):
+    """
+    Splits a list of file paths into chunks that fit on a command line.
+
+    Args:
+        paths: a list of file paths.
+        max_size: the maximum number of bytes that the paths of a chunk can
+            take on the command line (see `get_max_args_size()`).
+        max_count: an optional maximum number of paths per chunk.
+
+    Returns:
+        A list of lists of file paths.
+    """
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for pth in paths:
+        # each argument takes its bytes, a NUL and a pointer
+        size = len(pth.encode('utf-8')) + 1 + 8
+        if chunk and (
+            chunk_size + size > max_size or len(chunk) == max_count
+        ):
+            chunks.append(chunk)
+            chunk = []
+            chunk_size = 0
+        chunk.append(pth)
+        chunk_size += size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def split_output(out, paths):
+    """
+    Splits the output of a linter run on several files into per-file outputs.
+
+    Each line is attributed to the file whose path it starts with (followed
+    by a ':'); lines that do not start with a path (e.g. the code snippets
+    printed by some linters) are attributed to the same file as the previous
+    line.
+
+    Args:
+        out: the output of the linter.
+        paths: the list of paths of the linted files.
+
+    Returns:
+        A dictionary mapping each path to its output, which is empty for files
+        without linting problems.
+    """
+    outputs = {pth: [] for pth in paths}
+
+    # output that cannot be attributed to a file (e.g. a crash of the linter
+    # before it reports anything) goes to the first file
+    current = paths[0] if paths else None
+    for line in out.splitlines(keepends=True):
+        # find the longest path followed by a ':' at the start of the line
+        start = line.find(":")
+        while start >= 0:
+            if line[:start] in outputs:
+                current = line[:start]
+            start = line.find(":", start + 1)
+
+        if current is not None:
+            outputs[current].append(line)
+
+    return {pth: "".join(lines) for pth, lines in outputs.items()}
+
+
+class LintPlan(namedtuple(
+    "LintPlan", ["files", "results", "keys", "batches", "copies"]
+)):
+    """
+    The work needed to lint a set of files with a `Linter`.
+
+    Attributes:
+        files: the sorted list of the files that the linter applies to.
+        results: a dictionary mapping files to `(exit status, diagnostics)`
+            tuples (see `pre_commit.diagnostics`), initially holding the
+            cached results.
+        keys: a dictionary mapping files to their key in the cache.
+        batches: a list of lists of files, each to be linted by a single
+            process.
+        copies: a dictionary mapping the files that are linted to the other
+            files with the same blob and the same rules, which are not linted
+            but get the same results (see `Linter.copy_results()`).
+    """
+    __slots__ = ()
+
 
 class Linter(object):
     """
     Convenience class to wrap linters for different programming languages.
     """
 
+    # the name of the linter in reports (see `pre_commit.reports`); defaults
+    # to the name of the class
+    name = None
+
+    # whether the linter implements `batch_command()` or `batch_process()`
+    batch = False
+
+    # whether the linter reports problems on stderr rather than on stdout
+    stderr_to_stdout = False
+
+    # a command that prints the version of the linter (e.g. its plugins),
+    # which is part of the key of cached results
+    version_command = None
+
+    # the options of the configuration file that make the rules depend on
+    # the path of the linted file (e.g. flake8's `per-file-ignores`), in
+    # which case results are not shared between paths
+    path_scoped_options = ()
+
+    # a command that starts a long-lived interpreter of the linter (see
+    # `pre_commit.worker`)
+    worker_command = None
+
+    # an optional `PathMatcher` of the files that the linter does not apply
+    # to, in addition to the files excluded for all linters (see
+    # `pre_commit.patterns`)
+    path_matcher = None
+
     def __init__(self, extension="", config_path=""):
         """
         Args:
@@ -37,6 +299,69 @@ class Linter(object):
         self.extension = extension
         self.config_path = config_path
 
+        # computed on demand by `_get_cache_key()`
+        self._config_hash = None
+        self._version = None
+        self._path_scoped = None
+
+        # set by `use_worker()`
+        self._worker = None
+
+    def use_worker(self, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Lints files with a long-lived worker (see `pre_commit.worker`)
+        instead of starting the linter for each batch of files, if the linter
+        defines a `worker_command`.
+        If the worker fails, the linter falls back to its commands.
+
+        Args:
+            idle_timeout: the number of seconds after which the worker exits
+                if it receives no requests.
+        """
+        if self.worker_command:
+            self._worker = WorkerClient(self.worker_command, idle_timeout)
+
+    def linter_command(self, pth):
+        """
+        Returns the command that runs the desired linter on a file, e.g.
+        ```
+        return ["flake8", pth]
+        ```
+
+        Args:
+            pth: placeholder for a file path.
+
+        Returns:
+            A list of strings, or `None` if the linter implements
+            `linter_process()` instead.
+
+        Make sure that the linter's output goes to stdout (or set the
+        `stderr_to_stdout` attribute to `True`)!
+        """
+        return None
+
+    def batch_command(self, paths):
+        """
+        Returns the command that runs the desired linter on several files at
+        once, e.g.
+        ```
+        return ["flake8"] + paths
+        ```
+
+        This is only used if the `batch` attribute is `True`.
+
+        Args:
+            paths: a list of file paths.
+
+        Returns:
+            A list of strings, or `None` if the linter implements
+            `batch_process()` instead.
+
+        Make sure that each problem is reported on lines starting with
+        "<file path>:"!
+        """
+        return None
+
     def linter_process(self, pth):
         """
         Create a subprocess to run the desired linter, e.g.
@@ -49,6 +374,8 @@ class Linter(object):
         return pipe
         ```
 
+        By default, this runs the command returned by `linter_command()`.
+
         Args:
             pth: placeholder for a file path.
 
@@ -57,22 +384,221 @@ class Linter(object):
 
         Make sure to send the linter's output to stdout!
         """
-        raise NotImplementedError
+        cmd = self.linter_command(pth)
+        if cmd is None:
+            raise NotImplementedError
+
+        return self._popen(cmd)
+
+    def batch_process(self, paths):
+        """
+        Create a subprocess to run the desired linter on several files at
+        once, e.g.
+        ```
+        pipe = Popen(
+            ["flake8"] + paths,
+            stdout=PIPE,
+            stderr=PIPE,
+        )
+        return pipe
+        ```
+
+        By default, this runs the command returned by `batch_command()`.
+        This is only used if the `batch` attribute is `True`.
+
+        Args:
+            paths: a list of file paths.
+
+        Returns:
+            A `subprocess.Popen` instance.
+
+        Make sure to send the linter's output to stdout, and that each
+        problem is reported on lines starting with "<file path>:"!
+        """
+        cmd = self.batch_command(paths)
+        if cmd is None:
+            raise NotImplementedError
+
+        return self._popen(cmd)
+
+    def _popen(self, cmd):
+        """
+        Starts a linter command, collecting its output from stdout.
+        """
+        return Popen(
+            cmd,
+            stdout=PIPE,
+            stderr=STDOUT if self.stderr_to_stdout else PIPE
+        )
+
+    def _get_config_hash(self):
+        """
+        Returns the hash of the content of the configuration file, if any.
+        """
+        if self._config_hash is None:
+            self._config_hash = ""
+            if self.config_path:
+                with open(self.config_path, "rb") as config_file:
+                    self._config_hash = sha1(config_file.read()).hexdigest()
+
+        return self._config_hash
+
+    def _get_version(self, cache=None):
+        """
+        Returns the version of the linter (see `_look_up_version()`).
+
+        The version is stored in the cache together with a fingerprint of
+        the linter's executable and of the paths from which the linter loads
+        its code (e.g. its plugins or packages), so that it is only looked
+        up again when one of them changes (e.g. after an upgrade).
+        """
+        if self._version is None:
+            self._version = ""
+            executable = self._get_executable()
+            if executable:
+                name = type(self).__name__
+                stored = (
+                    cache.get_version(name, executable)
+                    if cache is not None else None
+                )
+                if stored is not None and stored[0] == get_fingerprint(
+                    [executable] + stored[1]
+                ):
+                    self._version = stored[2]
+                else:
+                    self._version, paths = self._look_up_version()
+                    if cache is not None and paths is not None:
+                        cache.set_version(
+                            name, executable,
+                            get_fingerprint([executable] + paths), paths,
+                            self._version
+                        )
+
+        return self._version
+
+    def _get_executable(self):
+        """
+        Returns the full path of the executable of the linter, or `None` if
+        it is not available.
+        """
+        return which(self.version_command[0]) if self.version_command else None
 
-    def lint(self, dir_content):
+    def _look_up_version(self):
+        """
+        Runs `version_command`.
+
+        Returns:
+            A `(version, paths)` tuple with the output of the command and the
+            list of the paths from which the linter loads its code, if known
+            (see `_get_version()`), or `None` instead of the list if the
+            command failed (e.g. because a package is missing), in which case
+            the version is not stored.
+        """
+        pipe = Popen(self.version_command, stdout=PIPE, stderr=STDOUT)
+        out, err = pipe.communicate()
+
+        return (
+            out.decode('utf-8').strip(),
+            [] if pipe.returncode == 0 else None
+        )
+
+    def _get_path_key(self, pth):
+        """
+        Returns the part of the key of a result that depends on the path of
+        the linted file: the path itself if the configuration file has
+        options that apply to some paths only (see `path_scoped_options`),
+        so that results are never shared between paths that may be linted
+        with different rules, or "" otherwise.
+        """
+        if self._path_scoped is None:
+            self._path_scoped = False
+            if self.config_path and self.path_scoped_options:
+                with open(self.config_path, encoding="utf-8",
+                          errors="replace") as config_file:
+                    self._path_scoped = re.search(
+                        r"^\s*(?:%s)\s*[=:]" % "|".join(
+                            re.escape(option)
+                            for option in self.path_scoped_options
+                        ),
+                        config_file.read(),
+                        re.MULTILINE
+                    ) is not None
+
+        return pth if self._path_scoped else ""
+
+    def _get_cache_key(self, blob, cache, pth):
+        """
+        Returns the key of the result of linting a given blob at a given
+        path in the cache.
+        """
+        return cache.make_key(
+            blob,
+            type(self).__name__,
+            self._get_config_hash(),
+            self._get_version(cache),
+            self._get_path_key(pth)
+        )
+
+    def lint(self, dir_content, blobs=None, cache=None, jobs=1):
         """
         Main method to perform linting.
 
         Args:
             dir_content: a list of file paths corresponding to files on which
                 to run the linter.
+            blobs: an optional dictionary mapping the file paths in
+                `dir_content` to the hashes of their blobs.
+            cache: an optional `ResultCache` (see `pre_commit.cache`); the
+                results of files listed in `blobs` are looked up in it before
+                running the linter, and stored in it afterwards.
+            jobs: the maximum number of linter processes to run at the same
+                time.
 
         Returns:
             An integer corresponding to the number of files with the specified
             extension that have linting problems in `dir_content`.
         """
-        # initialize a counter for files with linting problems
-        non_zero_exits = 0
+        return asyncio.run(self.lint_async(dir_content, blobs, cache, jobs))
+
+    async def lint_async(self, dir_content, blobs=None, cache=None, jobs=1):
+        """
+        Coroutine version of `lint()`.
+        """
+        plan = self.plan(dir_content, blobs, cache, jobs)
+
+        semaphore = asyncio.Semaphore(jobs)
+
+        async def run_batch(batch):
+            async with semaphore:
+                return await self.run_batch_async(batch)
+
+        for results in await asyncio.gather(
+            *[run_batch(batch) for batch in plan.batches]
+        ):
+            plan.results.update(self.copy_results(plan, results))
+
+        return self.report(plan, cache)
+
+    def plan(self, dir_content, blobs=None, cache=None, jobs=1):
+        """
+        Selects the files to lint, looks up cached results and splits the
+        other files into the batches that are linted by a single process.
+
+        Args:
+            dir_content: see `lint()`.
+            blobs: see `lint()`.
+            cache: see `lint()`.
+            jobs: the number of processes that are expected to run at the
+                same time; batches are made small enough to keep them busy.
+
+        Returns:
+            A `LintPlan`, whose `results` are completed by running
+            `run_batch()` on each of its `batches` and then passed on to
+            `report()`.
+        """
+        files = []
+        results = {}    # maps files to `(status, output)` tuples
+        keys = {}
 
         # grab all files with the relevant extension from a list of file paths
         if self.extension:
@@ -80,100 +606,700 @@ class Linter(object):
                 _file for _file in dir_content
                 if _file.endswith(self.extension)
             ]
+            files = sorted(self.relevant_files)
+
+            # look up cached results
+            if cache is not None and blobs:
+                for _file in files:
+                    if _file in blobs:
+                        keys[_file] = self._get_cache_key(
+                            blobs[_file], cache, _file
+                        )
+                        result = cache.get(keys[_file])
+                        if result is not None:
+                            status, data = result
+                            results[_file] = (
+                                status, load_diagnostics(data, _file)
+                            )
+
+        # lint a single file per blob (e.g. of a vendored library copied at
+        # several paths), whose results are copied to the other ones, unless
+        # the configuration may lint the paths differently (see
+        # `_get_path_key()`)
+        files_to_lint = []
+        copies = {}
+        blob_files = {}
+        for _file in files:
+            if _file in results:
+                continue
+
+            sha = blobs.get(_file) if blobs else None
+            blob_key = (sha, self._get_path_key(_file))
+            if sha is not None and blob_key in blob_files:
+                copies.setdefault(blob_files[blob_key], []).append(_file)
+                continue
+
+            if sha is not None:
+                blob_files[blob_key] = _file
+            files_to_lint.append(_file)
+
+        batches = self._get_batches(files_to_lint, jobs)
+
+        return LintPlan(files, results, keys, batches, copies)
+
+    def copy_results(self, plan, results):
+        """
+        Copies the results of the files of a `LintPlan` to the other files
+        with the same blob, replacing the path of their diagnostics.
+
+        Args:
+            plan: a `LintPlan`.
+            results: the results of some of the `batches` of the plan, as
+                returned by `run_batch()`.
+
+        Returns:
+            A dictionary with `results` and the results of the copies of
+            their files.
+        """
+        results = dict(results)
+        for _file, (status, diagnostics) in list(results.items()):
+            for copy in plan.copies.get(_file, ()):
+                results[copy] = (status, [
+                    diagnostic._replace(
+                        path=copy,
+                        # e.g. the output of a crash of the linter
+                        message=diagnostic.message.replace(_file, copy)
+                        if diagnostic.line is None else diagnostic.message
+                    )
+                    for diagnostic in diagnostics
+                ])
+
+        return results
+
+    def report(self, plan, cache=None, changed_lines=None, writer=None):
+        """
+        Caches the new results of a `LintPlan` and prints all of its results
+        to stdout, file by file.
+
+        Args:
+            plan: a `LintPlan` whose `results` are complete.
+            cache: see `lint()`.
+            changed_lines: an optional dictionary mapping files to a
+                `LineIndex` of their changed lines (see `pre_commit.diff`);
+                if given, only the problems on changed lines are reported.
+            writer: an optional `ReportWriter` (see `pre_commit.reports`) to
+                which the problems of each file are written too.
+
+        Returns:
+            An integer corresponding to the number of files with linting
+            problems.
+        """
+        # initialize a counter for files with linting problems
+        non_zero_exits = 0
 
-            # run the linter on each file
-            for _file in sorted(self.relevant_files):
-                pipe = self.linter_process(_file)
-                out, err = pipe.communicate()
+        for _file in plan.files:
+            status, diagnostics = plan.results[_file]
+            if _file in plan.keys and cache is not None:
+                cache.put(
+                    plan.keys[_file], status, dump_diagnostics(diagnostics)
+                )
 
-                out = out.decode('utf-8')
-                # if the liner outputs something, print the message to stdout
-                if out:
-                    print(out)
+            # the cache holds all of the problems, whatever the changed lines
+            if changed_lines is not None:
+                diagnostics = filter_diagnostics(
+                    diagnostics, changed_lines.get(_file, LineIndex())
+                )
 
-                # get exit status
-                non_zero_exits += (1 if out else 0)
+            if writer is not None:
+                writer.write(self.name or type(self).__name__, _file,
+                             diagnostics)
+
+            # if the liner reports problems, print them to stdout
+            if diagnostics:
+                print(format_diagnostics(diagnostics))
+
+            # get exit status
+            non_zero_exits += (1 if diagnostics else 0)
 
         return non_zero_exits
 
+    def _get_batches(self, files, jobs=1):
+        """
+        Splits a list of files into the lists of files that are linted by a
+        single process.
+        """
+        if self._worker is not None:
+            # the worker lints files one after the other
+            return [files] if files else []
+
+        if self.batch:
+            # spread the files over `jobs` processes
+            per_process = max(-(-len(files) // jobs), 1)
+            return chunk_paths(files, get_max_args_size(), per_process)
+
+        return [[_file] for _file in files]
+
+    def run_batch(self, files):
+        """
+        Runs the linter on a list of files from the `batches` of a
+        `LintPlan`.
+
+        Returns:
+            A dictionary mapping each file to an `(exit status, diagnostics)`
+            tuple.
+        """
+        if self._worker is not None:
+            try:
+                return self.run_worker(files)
+            except (OSError, ValueError, WorkerError):
+                # fall back to the commands of the linter from now on
+                self._worker = None
+                results = {}
+                for batch in self._get_batches(files):
+                    results.update(self.run_batch(batch))
+                return results
+
+        if self.batch:
+            pipe = self.batch_process(files)
+        else:
+            pipe = self.linter_process(files[0])
+        out, err = pipe.communicate()
+
+        return self._get_results(files, pipe.returncode, out)
+
+    async def run_batch_async(self, files):
+        """
+        Coroutine version of `run_batch()`, which runs the linter command as
+        an asyncio subprocess.
+        """
+        if self._worker is not None:
+            # the worker is reached with blocking sockets: wait for it in a
+            # thread
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.run_batch, files
+            )
+
+        if self.batch:
+            cmd = self.batch_command(files)
+        else:
+            cmd = self.linter_command(files[0])
+
+        if cmd is None:
+            # the linter only knows how to start a `Popen`: wait for it in a
+            # thread
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.run_batch, files
+            )
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=(
+                asyncio.subprocess.STDOUT if self.stderr_to_stdout
+                else asyncio.subprocess.PIPE
+            )
+        )
+        try:
+            out, err = await process.communicate()
+        except asyncio.CancelledError:
+            # do not leave the linter running (e.g. in fail-fast mode)
+            try:
+                process.kill()
+            except ProcessLookupError:    # it exited in the meantime
+                pass
+            await process.wait()
+            raise
+
+        return self._get_results(files, process.returncode, out)
+
+    def run_worker(self, files):
+        """
+        Lints a list of files with the worker, from the current working
+        directory.
+
+        Returns:
+            A dictionary mapping each file to an `(exit status, diagnostics)`
+            tuple.
+        """
+        outputs = self._worker.lint(getcwd(), files)
+
+        results = {}
+        for _file in files:
+            diagnostics = self.parse_output(outputs[_file], [_file])
+            results[_file] = (1 if diagnostics else 0, diagnostics)
+
+        return results
+
+    def parse_output(self, out, files):
+        """
+        Parses the output of the linter run on a list of files.
+
+        By default, the output is split by file (see `split_output()`) and
+        parsed as "<path>:<line>[:<column>]: <message>" lines (see
+        `pre_commit.diagnostics`).
+
+        Args:
+            out: the output of the linter, as a string.
+            files: the list of linted files.
+
+        Returns:
+            A list of `Diagnostic` objects.
+        """
+        return [
+            diagnostic
+            for _file, file_out in split_output(out, files).items()
+            for diagnostic in parse_text(file_out, _file)
+        ]
+
+    def _get_results(self, files, returncode, out):
+        """
+        Splits the exit status and the output of a linter run on a list of
+        files into per-file `(exit status, diagnostics)` tuples.
+        """
+        diagnostics = {_file: [] for _file in files}
+        for diagnostic in self.parse_output(
+            out.decode('utf-8', errors='replace'), files
+        ):
+            # problems with files that the linter was not asked about (e.g.
+            # a crash) go to the first file
+            diagnostics.get(diagnostic.path, diagnostics[files[0]]).append(
+                diagnostic
+            )
+
+        # the exit status of a batch cannot be attributed to single files:
+        # files without problems are considered clean
+        return {
+            _file: ((returncode or 1) if file_diagnostics else 0,
+                    file_diagnostics)
+            for _file, file_diagnostics in diagnostics.items()
+        }
+
+
+class LinterIndex(object):
+    """
+    An index of linters by the extensions of the files that they apply to,
+    which finds the linters of a path with a lookup per suffix of its file
+    name rather than a check per linter.
+
+    The files excluded by the `path_matcher` of a linter are left out.
+    """
+
+    def __init__(self, linters):
+        """
+        Args:
+            linters: an iterable of `Linter` objects.
+        """
+        self.linters = list(linters)
+
+        # maps extensions such as ".py" to the positions of their linters;
+        # the other extensions (e.g. "Makefile") are checked one by one
+        self._by_extension = {}
+        self._other_extensions = []
+        for i, linter in enumerate(self.linters):
+            extensions = linter.extension
+            if isinstance(extensions, str):
+                extensions = (extensions,) if extensions else ()
+
+            for extension in extensions:
+                if extension.startswith(".") and "/" not in extension:
+                    self._by_extension.setdefault(extension, []).append(i)
+                else:
+                    self._other_extensions.append((extension, i))
+
+    def get_linters(self, pth):
+        """
+        Returns the linters that apply to a file, in the order in which they
+        were given, as a list of `Linter` objects.
+        """
+        return [self.linters[i] for i in self._get_positions(pth)]
+
+    def _get_positions(self, pth):
+        """
+        Returns the sorted positions of the linters that apply to a file.
+        """
+        name = path.basename(pth)
+
+        positions = set()
+        # e.g. ".tar.gz" and ".gz" for "foo.tar.gz"
+        start = name.find(".")
+        while start >= 0:
+            positions.update(self._by_extension.get(name[start:], ()))
+            start = name.find(".", start + 1)
+        positions.update(
+            i for extension, i in self._other_extensions
+            if pth.endswith(extension)
+        )
+
+        return sorted(
+            i for i in positions
+            if not self.linters[i].path_matcher or
+            not self.linters[i].path_matcher.excludes(pth)
+        )
+
+    def classify(self, paths):
+        """
+        Finds the files that each linter applies to.
+
+        Args:
+            paths: an iterable of relative paths.
+
+        Returns:
+            A list with a sorted list of paths for each linter, in the order
+            in which the linters were given.
+        """
+        files = [[] for linter in self.linters]
+        for pth in sorted(paths):
+            for i in self._get_positions(pth):
+                files[i].append(pth)
+
+        return files
+
 
 class MarkdownLinter(Linter):
     """
     A wrapper for "markdownlint".
     """
 
+    name = "markdownlint"
+
+    batch = True
+
+    # markdownlint outputs linting information to stderr...
+    stderr_to_stdout = True
+
+    version_command = ["markdownlint", "--version"]
+
+    # a Node.js script that loads markdownlint (from the installation of
+    # markdownlint-cli) once and lints the files it reads on stdin, printing
+    # problems like markdownlint-cli does with `--json`, on a single line, or
+    # the error raised by markdownlint (see `pre_commit.worker`)
+    worker_script = """
+const readline = require("readline");
+const markdownlint = require(
+    require.resolve("markdownlint", {paths: [process.argv[1]]})
+);
+const configPath = process.argv[2];
+
+readline.createInterface({input: process.stdin}).on("line", (line) => {
+    const [cwd, file] = line.split("\\t");
+    try {
+        process.chdir(cwd);
+        const results = markdownlint.sync({
+            files: [file],
+            config: configPath ?
+                markdownlint.readConfigSync(configPath) : undefined,
+            resultVersion: 3
+        })[file];
+        process.stdout.write(JSON.stringify(results.map(
+            (result) => Object.assign({fileName: file}, result)
+        )) + "\\n");
+    } catch (error) {
+        // not JSON: reported as a problem of the file that is not about a
+        // line (see `parse_markdownlint()`)
+        process.stdout.write(error + "\\n");
+    }
+    process.stdout.write("\\x1e\\n");
+});
+"""
+
     def __init__(self, config_path=""):
         super().__init__(".md", config_path)
 
-    def linter_process(self, f):
-        cmd = ["markdownlint", f]
+    @property
+    def worker_command(self):
+        executable = which("markdownlint")
+        if executable is None or which("node") is None:
+            return None
+
+        # the configuration file is read for each file, so that changes to
+        # it are picked up by a running worker
+        return [
+            "node", "-e", self.worker_script,
+            path.dirname(path.realpath(executable)), self.config_path
+        ]
+
+    def linter_command(self, f):
+        return self.batch_command([f])
+
+    def batch_command(self, files):
+        cmd = ["markdownlint", "--json"] + files
         # if a config file is available, instruct the linter to use it
         if self.config_path:
             cmd += ["--config", self.config_path]
-        pipe = Popen(
-            cmd,
-            stdout=PIPE,
-            # redirect stderr to stdout: markdownlint outputs linting
-            # information to stderr...
-            stderr=STDOUT,
-        )
-        return pipe
+        return cmd
+
+    def parse_output(self, out, files):
+        return parse_markdownlint(out, files[0])
 
 
 class PythonLinter(Linter):
     """
     A wrapper for "flake8".
+
+    With `in_process=True`, flake8 runs inside of the hook's process through
+    its Python API, so that the interpreter, the plugins and the options
+    are loaded only once; all files are then checked in a single batch,
+    which flake8 spreads over several processes itself (see its `--jobs`
+    option).
+    This falls back to running the `flake8` command if flake8 cannot be
+    imported, is older than 6.0, or its API fails.
     """
 
-    def __init__(self, config_path=""):
+    name = "flake8"
+
+    batch = True
+
+    version_command = ["flake8", "--version"]
+
+    path_scoped_options = (
+        "per-file-ignores", "per_file_ignores",
+        "filename",
+        "exclude", "extend-exclude", "extend_exclude"
+    )
+
+    def __init__(self, config_path="", in_process=False):
+        """
+        Args:
+            config_path: the full path to a configuration file for the linter,
+                if one is available.
+            in_process: whether to run flake8 inside of the hook's process.
+        """
         super().__init__(".py", config_path)
 
-    def linter_process(self, f):
-        cmd = ["flake8", f]
+        self.in_process = in_process and _can_run_flake8_in_process()
+
+        # the flake8 application is initialized on demand, with the number
+        # of jobs of the plan
+        self._application = None
+        self._jobs = 1
+
+    def linter_command(self, f):
+        return self.batch_command([f])
+
+    def batch_command(self, files):
+        return ["flake8"] + self._get_argv() + files
+
+    def parse_output(self, out, files):
+        return parse_flake8(out, files[0])
+
+    def _get_executable(self):
+        if self.in_process:
+            return sys.executable
+
+        return super()._get_executable()
+
+    def _look_up_version(self):
+        # flake8 reports the versions of its plugins, which are installed
+        # in the directories of packages of its interpreter
+        if not self.in_process:
+            version, paths = super()._look_up_version()
+            if paths is not None:
+                paths = get_site_dirs(self._get_executable())
+            return version, paths
+
+        import flake8
+
+        plugins = self._get_application().plugins
+        version = "%s (in process) %s" % (
+            flake8.__version__,
+            plugins.versions_str() if hasattr(plugins, "versions_str") else ""
+        )
+
+        return version, sorted(set(
+            site.getsitepackages() + [site.getusersitepackages()]
+        ))
+
+    def plan(self, dir_content, blobs=None, cache=None, jobs=1):
+        # in process, flake8 spreads the files over `jobs` processes itself
+        self._jobs = jobs
+
+        return super().plan(dir_content, blobs, cache, jobs)
+
+    def _get_batches(self, files, jobs=1):
+        if not self.in_process:
+            return super()._get_batches(files, jobs)
+
+        return [files] if files else []
+
+    def run_batch(self, files):
+        if not self.in_process:
+            return super().run_batch(files)
+
+        # check the files with a new file checker manager, collecting what
+        # the formatter writes
+        output = StringIO()
+        try:
+            application = self._get_application()
+            application.options.filenames = files
+            application.make_file_checker_manager(
+                self._get_in_process_argv() + files
+            )
+            application.formatter.output_fd = output
+            try:
+                application.run_checks()
+                application.report_errors()
+            finally:
+                application.formatter.output_fd = None
+        except (AttributeError, TypeError):
+            # the API of flake8 changed: fall back to the `flake8` command
+            # from now on
+            self.in_process = False
+            results = {}
+            for batch in self._get_batches(files, self._jobs):
+                results.update(self.run_batch(batch))
+            return results
+
+        return self._get_results(
+            files,
+            1 if application.result_count else 0,
+            output.getvalue().encode('utf-8')
+        )
+
+    async def run_batch_async(self, files):
+        if not self.in_process:
+            return await super().run_batch_async(files)
+
+        # checking files is CPU-bound: do not block the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.run_batch, files
+        )
+
+    def _get_argv(self):
+        """
+        Returns the command line options of flake8, without the files.
+        """
+        argv = ["--format", FLAKE8_FORMAT]
         # if a config file is available, instruct the linter to use it
         if self.config_path:
-            cmd += ["--config", self.config_path]
-        # if there is a config file
-        pipe = Popen(
-            cmd,
-            stdout=PIPE,
-            stderr=PIPE,
-        )
-        return pipe
+            argv += ["--config", self.config_path]
+        return argv
+
+    def _get_in_process_argv(self):
+        """
+        Returns the options of the flake8 application, which are those of
+        the command plus the number of jobs of the plan (flake8 uses all
+        CPUs by default).
+        """
+        return self._get_argv() + ["--jobs", str(self._jobs)]
+
+    def _get_application(self):
+        """
+        Returns the flake8 application, finding its plugins and parsing its
+        options the first time.
+        """
+        if self._application is None:
+            # importing flake8's application is slow: only do it when flake8
+            # runs in process
+            from flake8.main.application import Application
+
+            self._application = Application()
+            self._application.initialize(self._get_in_process_argv())
+
+        return self._application
 
 
 class RLinter(Linter):
     """
     A wrapper for "lintr".
+
+    Each R session lints a whole batch of files; the output for each file is
+    followed by a line with the `END_OF_OUTPUT` character (see
+    `pre_commit.worker`), which is used to split the output by file.
+    Starting R and loading lintr takes much longer than linting a file, so
+    that lintr can also run in a long-lived R session (see `use_worker()`).
     """
 
+    name = "lintr"
+
+    batch = True
+
+    version_command = [
+        "Rscript", "--slave", "--vanilla",
+        "-e",
+        "cat(format(packageVersion('lintr')), .libPaths(), sep = '\\n')"
+    ]
+
+    path_scoped_options = ("exclusions",)
+
+    # an R function that prints the problems found in a file, one per line
+    # (see `parse_lintr()`), followed by a line with the `END_OF_OUTPUT`
+    # character
+    lint_file_function = """
+lint_file <- function(f) {
+    try(for (l in lintr::lint(f)) {
+        cat(
+            f, l$line_number, l$column_number,
+            if (is.null(l$linter)) "" else l$linter, l$type,
+            gsub("[\\t\\n]", " ", l$message),
+            sep = "\\t"
+        )
+        cat("\\n")
+    })
+    cat("\\036\\n")
+    flush(stdout())
+}
+"""
+
+    # an R session that loads lintr once and lints the files it reads on
+    # stdin (see `pre_commit.worker`)
+    worker_command = [
+        "Rscript", "--slave", "--vanilla",
+        "-e", lint_file_function + """
+suppressPackageStartupMessages(library(lintr))
+input <- file("stdin")
+open(input)
+while (length(line <- readLines(input, n = 1)) > 0) {
+    request <- strsplit(line, "\\t", fixed = TRUE)[[1]]
+    setwd(request[1])
+    lint_file(request[2])
+}
+"""
+    ]
+
     def __init__(self, config_path=""):
         super().__init__((".r", ".R"), config_path)
 
-    def linter_process(self, f):
+    def _look_up_version(self):
+        # the version of lintr is followed by the libraries of R, in which
+        # lintr and its dependencies are installed
+        out, paths = super()._look_up_version()
+        if paths is None:
+            return out, None
+
+        lines = out.splitlines()
+        return (lines[0] if lines else ""), lines[1:]
+
+    def plan(self, dir_content, blobs=None, cache=None, jobs=1):
         # if a config file is available, instruct the linter to use it;
         # with lintr, unfortunately this requires a little hack:
         # we need to copy the .lintr file from the root of the local repo
-        # to the working directory of the R session so that the lintr package
-        # picks it up
+        # to the working directory of the R sessions so that the lintr
+        # package picks it up (once for all of them, and without overwriting
+        # a config file that is being committed)
         if self.config_path:
-            pipe = Popen(
-                [
-                    "Rscript", "--slave", "--vanilla",
-                    "-e",
-                    ". <- file.copy('%s', basename('%s')); lintr::lint('%s')"
-                    % (self.config_path, self.config_path, f)
-                ],
-                stdout=PIPE,
-                stderr=PIPE
-            )
-        else:
-            pipe = Popen(
-                [
-                    "Rscript", "--slave", "--vanilla",
-                    "-e", "lintr::lint('%s')" % f
-                ],
-                stdout=PIPE,
-                stderr=PIPE
+            config_copy = path.basename(self.config_path)
+            if not path.exists(config_copy):
+                copyfile(self.config_path, config_copy)
+
+        return super().plan(dir_content, blobs, cache, jobs)
+
+    def linter_command(self, f):
+        return self.batch_command([f])
+
+    def batch_command(self, files):
+        # the files are passed as arguments of the R script
+        return [
+            "Rscript", "--slave", "--vanilla",
+            "-e", self.lint_file_function +
+            "for (f in commandArgs(trailingOnly = TRUE)) lint_file(f)"
+        ] + files
+
+    def parse_output(self, out, files):
+        # files after a crash of R have no output
+        return [
+            diagnostic
+            for _file, file_out in zip(
+                files, out.split("%s\n" % END_OF_OUTPUT)
             )
-        return pipe
+            for diagnostic in parse_lintr(file_out, _file)
+        ]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+This module defines the `Mirror` class, a persistent copy of the staged files
+that is kept under the git directory of a repository and updated
+incrementally between runs of the hook.
+"""
+import json
+from os import (
+    makedirs,
+    path,
+    remove,
+    replace,
+    rmdir,
+    walk
+)
+
+
+class Mirror(object):
+    """
+    A directory under `.git/style/` that holds the staged version of the
+    staged files.
+
+    The hash of the blob written for each path is recorded in a manifest, so
+    that on each run only the paths whose staged blob changed since the
+    previous run are rewritten (see `prepare()` and `save()`).
+    """
+
+    def __init__(self, git_handle, name="mirror"):
+        """
+        Args:
+            git_handle: a `GitHandle` instance for the repository of interest.
+            name: the name of the mirror directory inside of `.git/style/`.
+        """
+        self.git_handle = git_handle
+
+        style_dir = path.join(git_handle.get_git_dir(), "style")
+        self.path = path.join(style_dir, name)
+        self.manifest_path = path.join(style_dir, "%s.json" % name)
+
+    def _load_manifest(self):
+        """
+        Returns the `{path: blob hash}` dictionary recorded by the last
+        `save()`, or an empty dictionary if there is none.
+        """
+        try:
+            with open(self.manifest_path) as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        """
+        Atomically records a `{path: blob hash}` dictionary in the manifest.
+        """
+        tmp_manifest_path = "%s.tmp" % self.manifest_path
+        with open(tmp_manifest_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        replace(tmp_manifest_path, self.manifest_path)
+
+    def _prune(self, blobs):
+        """
+        Removes all files that are not in `blobs` from the mirror, together
+        with the directories that are left empty.
+        """
+        for dir_path, dir_names, file_names in walk(self.path, topdown=False):
+            for file_name in file_names:
+                file_path = path.join(dir_path, file_name)
+                if path.relpath(file_path, self.path) not in blobs:
+                    remove(file_path)
+
+            if dir_path != self.path:
+                try:
+                    rmdir(dir_path)
+                except OSError:    # the directory is not empty
+                    pass
+
+    def prepare(self, blobs):
+        """
+        Removes the files that are not in `blobs` from the mirror and
+        returns the blobs that need to be (re)written to it.
+
+        Once they are written, `save()` must be called to record them.
+
+        Args:
+            blobs: a dictionary mapping the relative paths of the staged
+                files to the hashes of their staged blobs, as returned by
+                `GitHandle.get_staged_files_blobs()`.
+
+        Returns:
+            A dictionary with the items of `blobs` that are not in the
+            mirror yet.
+        """
+        makedirs(self.path, exist_ok=True)
+        manifest = self._load_manifest()
+
+        # drop paths that are no longer staged (as well as any other stray
+        # file, e.g. a config file copied by a linter)
+        self._prune(blobs)
+
+        changed_blobs = {
+            _path: sha for _path, sha in blobs.items()
+            if manifest.get(_path) != sha or
+            not path.isfile(path.join(self.path, _path))
+        }
+
+        # forget the paths that are about to be rewritten first, so that an
+        # interrupted run never leaves a stale file recorded as up to date
+        self._save_manifest({
+            _path: sha for _path, sha in blobs.items()
+            if _path not in changed_blobs
+        })
+
+        return changed_blobs
+
+    def save(self, blobs):
+        """
+        Records that the mirror contains exactly the given blobs.
+        """
+        self._save_manifest(blobs)
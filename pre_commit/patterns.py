@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+This module implements the patterns of the paths that are excluded from
+linting (e.g. vendored code or generated files).
+
+Patterns follow the syntax of `.gitignore` files:
+
+- a pattern without a "/" (other than a trailing one) matches a file or a
+  directory at any depth, e.g. "*_pb2.py"; other patterns are relative to
+  the root of the repository, e.g. "/setup.py" or "app/migrations"
+- a trailing "/" only matches directories, e.g. "vendor/"
+- "*" and "?" match any characters but "/", "[...]" matches one of a set of
+  characters, and "**" matches any number of directories
+- a leading "!" re-includes the paths that previous patterns exclude
+
+The patterns are compiled into a single regular expression, so that
+matching a path does not depend on the number of patterns.
+"""
+import re
+
+
+def translate_pattern(pattern):
+    """
+    Translates a pattern (without its leading "!", if any) into a regular
+    expression that matches the relative paths of the files it applies to.
+    """
+    # a pattern matches a file, or all of the files of a directory
+    suffix = "/.*" if pattern.endswith("/") else "(?:/.*)?"
+    pattern = pattern.rstrip("/")
+
+    # patterns without a "/" apply at any depth
+    prefix = "(?:.*/)?" if "/" not in pattern else ""
+    pattern = pattern.lstrip("/")
+
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) > 0:
+            end = pattern.find("]", i + 2)
+            chars = pattern[i + 1:end].replace("\\", "\\\\")
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            regex.append("[%s]" % chars)
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+
+    return prefix + "".join(regex) + suffix
+
+
+class PathMatcher(object):
+    """
+    A compiled list of patterns of excluded paths.
+    """
+
+    def __init__(self, patterns=()):
+        """
+        Args:
+            patterns: an iterable of patterns; blank lines and lines starting
+                with "#" are ignored.
+        """
+        regexes = []
+        self._negated = []
+
+        # the last pattern that matches a path decides whether it is
+        # excluded, so the patterns are tried in reverse order, each in a
+        # group of its own
+        for pattern in reversed(list(patterns)):
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            negated = pattern.startswith("!")
+            regexes.append("(%s)" % translate_pattern(pattern[negated:]))
+            self._negated.append(negated)
+
+        self._regex = re.compile("|".join(regexes)) if regexes else None
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def excludes(self, pth):
+        """
+        Tells whether a file is excluded.
+
+        Args:
+            pth: the relative path of the file.
+        """
+        if self._regex is None:
+            return False
+
+        match = self._regex.fullmatch(pth)
+
+        return match is not None and not self._negated[match.lastindex - 1]
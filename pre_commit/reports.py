@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+This module defines the report writers, which write the problems found by
+the linters to a machine-readable file (e.g. for CI), in addition to the
+text printed by the hook.
+
+The writers stream the diagnostics of each file (see
+`pre_commit.diagnostics`) to the report as soon as the linters report them,
+so that reports of whole repositories are never held in memory.
+The available formats are
+
+- "jsonl": JSON Lines, one diagnostic per line
+- "sarif": SARIF 2.1.0, one run per linter
+- "junit": JUnit XML, one test suite per linter and one test case per file
+"""
+import json
+from os import (
+    makedirs,
+    path
+)
+from xml.sax.saxutils import (
+    escape,
+    quoteattr
+)
+
+from pre_commit.diagnostics import format_diagnostics
+
+
+class ReportWriter(object):
+    """
+    Base class of the report writers.
+    """
+
+    # the extension of the report files
+    extension = ""
+
+    def __init__(self, report_file):
+        """
+        Args:
+            report_file: a file object opened for writing text.
+        """
+        self.report_file = report_file
+
+        self.start()
+
+    def start(self):
+        """
+        Writes the beginning of the report.
+        """
+        pass
+
+    def write(self, linter_name, pth, diagnostics):
+        """
+        Writes the diagnostics of a file.
+
+        Args:
+            linter_name: the name of the linter.
+            pth: the path of the file, relative to the root of the
+                repository.
+            diagnostics: a list of `Diagnostic` objects, which is empty if
+                the file has no linting problems.
+        """
+        raise NotImplementedError
+
+    def end(self):
+        """
+        Writes the end of the report.
+        """
+        pass
+
+    def close(self):
+        """
+        Ends the report and closes its file.
+        """
+        try:
+            self.end()
+        finally:
+            self.report_file.close()
+
+
+class JsonLinesWriter(ReportWriter):
+    """
+    Writes a JSON object per diagnostic, on its own line.
+    """
+
+    extension = ".jsonl"
+
+    def write(self, linter_name, pth, diagnostics):
+        for diagnostic in diagnostics:
+            self.report_file.write(
+                json.dumps(dict(diagnostic._asdict(), linter=linter_name))
+            )
+            self.report_file.write("\n")
+
+
+class SarifWriter(ReportWriter):
+    """
+    Writes a SARIF log with a run per linter.
+    """
+
+    extension = ".sarif"
+
+    # the SARIF levels of the severities of diagnostics
+    levels = {"error": "error", "warning": "warning", "style": "note"}
+
+    def start(self):
+        self.report_file.write(
+            '{"version": "2.1.0", "$schema": '
+            '"https://json.schemastore.org/sarif-2.1.0.json", "runs": ['
+        )
+
+        # the linter of the current run, and whether the current run (and
+        # the list of runs) has results already
+        self._linter_name = None
+        self._first_run = True
+        self._first_result = True
+
+    def write(self, linter_name, pth, diagnostics):
+        if linter_name != self._linter_name:
+            self._end_run()
+            self.report_file.write(
+                '%s\n{"tool": {"driver": {"name": %s}}, "results": [' % (
+                    "" if self._first_run else ",", json.dumps(linter_name)
+                )
+            )
+            self._linter_name = linter_name
+            self._first_run = False
+            self._first_result = True
+
+        for diagnostic in diagnostics:
+            location = {
+                "artifactLocation": {"uri": pth, "uriBaseId": "%SRCROOT%"}
+            }
+            if diagnostic.line is not None:
+                location["region"] = {"startLine": diagnostic.line}
+                if diagnostic.column is not None:
+                    location["region"]["startColumn"] = diagnostic.column
+
+            result = {
+                "level": self.levels.get(diagnostic.severity, "error"),
+                "message": {"text": diagnostic.message},
+                "locations": [{"physicalLocation": location}]
+            }
+            if diagnostic.code:
+                result["ruleId"] = diagnostic.code
+
+            self.report_file.write(
+                "%s\n%s" % (
+                    "" if self._first_result else ",", json.dumps(result)
+                )
+            )
+            self._first_result = False
+
+    def _end_run(self):
+        """
+        Ends the run of the current linter, if any.
+        """
+        if self._linter_name is not None:
+            self.report_file.write("]}")
+
+    def end(self):
+        self._end_run()
+        self.report_file.write("]}\n")
+
+
+class JUnitWriter(ReportWriter):
+    """
+    Writes a JUnit XML report with a test suite per linter and a test case
+    per file, which fails if the file has linting problems.
+    """
+
+    extension = ".xml"
+
+    def start(self):
+        self.report_file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n'
+        )
+
+        # the linter of the current test suite
+        self._linter_name = None
+
+    def write(self, linter_name, pth, diagnostics):
+        if linter_name != self._linter_name:
+            self._end_suite()
+            self.report_file.write(
+                "<testsuite name=%s>\n" % quoteattr(linter_name)
+            )
+            self._linter_name = linter_name
+
+        self.report_file.write(
+            "<testcase classname=%s name=%s>" % (
+                quoteattr(linter_name), quoteattr(pth)
+            )
+        )
+        if diagnostics:
+            self.report_file.write(
+                "<failure message=%s>%s</failure>" % (
+                    quoteattr("linting problems: %d" % len(diagnostics)),
+                    escape(format_diagnostics(diagnostics))
+                )
+            )
+        self.report_file.write("</testcase>\n")
+
+    def _end_suite(self):
+        """
+        Ends the test suite of the current linter, if any.
+        """
+        if self._linter_name is not None:
+            self.report_file.write("</testsuite>\n")
+
+    def end(self):
+        self._end_suite()
+        self.report_file.write("</testsuites>\n")
+
+
+# the report writers by format
+REPORT_WRITERS = {
+    "jsonl": JsonLinesWriter,
+    "sarif": SarifWriter,
+    "junit": JUnitWriter
+}
+
+
+def get_default_report_path(git_dir, report_format):
+    """
+    Returns the path of the report of the hook in a repository.
+
+    Args:
+        git_dir: the absolute path of the git directory of the repository.
+        report_format: one of the keys of `REPORT_WRITERS`.
+    """
+    return path.join(
+        git_dir, "style", "report%s" % REPORT_WRITERS[report_format].extension
+    )
+
+
+def open_report(report_format, report_path):
+    """
+    Creates a report file and returns its writer.
+
+    Args:
+        report_format: one of the keys of `REPORT_WRITERS`.
+        report_path: the path of the report file, which is overwritten if
+            it exists.
+
+    Returns:
+        A `ReportWriter` object, which must be closed once all of the
+        diagnostics are written.
+    """
+    makedirs(path.dirname(path.abspath(report_path)), exist_ok=True)
+
+    return REPORT_WRITERS[report_format](
+        open(report_path, "w", encoding="utf-8")
+    )
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+This module implements the lint server, an optional per-user daemon that
+keeps the linters of the hook (e.g. an in-process flake8, see
+`PythonLinter`) and the results of recently linted blobs in memory between
+commits.
+
+The hook sends the root of the repository, its configuration file, the
+hashes of the staged blobs and the lines changed in the index (see
+`pre_commit.client`), and prints the output that the server sends back.
+Repositories whose cache is enabled (see `pre_commit.cache`) use it instead
+of the memory of the server, so that the server also finds the results of
+the hook and of the watcher (see `pre_commit.watcher`).
+The server is started on demand and exits once it has been idle for a while
+(see `pre_commit.worker`):
+
+```
+python -m pre_commit.server --socket PATH --idle-timeout SECONDS
+```
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from os import (
+    path,
+    stat
+)
+
+from pre_commit.cache import (
+    DEFAULT_MAX_SIZE,
+    ResultCache
+)
+from pre_commit.diff import LineIndex
+from pre_commit.git import GitHandle
+from pre_commit.hook import (
+    get_lint,
+    get_linters,
+    LINTER_CONFIG_FILES,
+    PATHS_FILE
+)
+from pre_commit.util import get_config
+from pre_commit.worker import (
+    DEFAULT_IDLE_TIMEOUT,
+    lock_socket,
+    serve_requests
+)
+
+
+class LintServer(object):
+    """
+    Serves the requests of `LintClient` objects.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        Args:
+            max_size: the maximum size of the results kept in memory, in
+                bytes.
+        """
+        self.cache = ResultCache(":memory:", max_size)
+
+        # maps `(root, conf_file_path)` tuples to the linters of a
+        # repository and the signature of their configuration
+        self._linters = {}
+
+    def _get_linters(self, root, conf_file_path):
+        """
+        Returns the linters of a repository, building them again if their
+        configuration changed.
+        """
+        signature = []
+        for config_path in [conf_file_path, path.join(root, PATHS_FILE)] + [
+            path.join(root, file_name)
+            for file_name in LINTER_CONFIG_FILES.values()
+        ]:
+            try:
+                signature.append(stat(config_path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+
+        key = (root, conf_file_path)
+        if key not in self._linters or self._linters[key][0] != signature:
+            self._linters[key] = (
+                signature, get_linters(root, conf_file_path)
+            )
+
+        return self._linters[key][1]
+
+    def handle(self, request):
+        """
+        Lints the blobs of a request.
+
+        Returns:
+            A dictionary with the number of files with linting problems
+            (`status`) and the output of the linters (`output`).
+        """
+        git_handle = GitHandle(path=request["root"])
+
+        # the cache of the repository, if it is enabled, is opened by
+        # `get_lint()`
+        disk_cache = get_config(
+            "options", "cache", request["conf_file_path"], "False"
+        ) == "True"
+        lint = get_lint(
+            git_handle,
+            request["conf_file_path"],
+            linters=self._get_linters(
+                git_handle.root, request["conf_file_path"]
+            ),
+            cache=None if disk_cache else self.cache
+        )
+
+        changed_lines = request.get("changed_lines")
+        if changed_lines is not None:
+            changed_lines = {
+                pth: LineIndex(tuple(_range) for _range in ranges)
+                for pth, ranges in changed_lines.items()
+            }
+
+        output = StringIO()
+        try:
+            with redirect_stdout(output):
+                status = lint.run(
+                    blobs=request["blobs"], changed_lines=changed_lines
+                )
+        finally:
+            if disk_cache and lint.cache is not None:
+                lint.cache.close()
+
+        return {"status": status, "output": output.getvalue()}
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run the lint server.")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT
+    )
+    args = parser.parse_args()
+
+    lock_file = lock_socket(args.socket)
+    if lock_file is not None:
+        try:
+            serve_requests(args.socket, LintServer().handle, args.idle_timeout)
+        finally:
+            lock_file.close()
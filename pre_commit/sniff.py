@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+This module decides which files are not worth linting (e.g. generated SQL
+dumps or minified assets, which linters can take a long time to choke on)
+from their size and the first few KB of their content, so that their full
+content is never read:
+
+- files larger than a size limit are skipped from the size of their blob
+  alone (see `GitHandle.get_blob_sizes()`)
+- files with a NUL byte at the start are considered binary, like git does
+- optionally, files with a marker of generated code in their first lines
+  are considered generated: "@generated", or a comment in one of the forms
+  of the headers written by common code generators, e.g.
+  "// Code generated by protoc-gen-go. DO NOT EDIT." (phrases like "DO NOT
+  EDIT" or "auto-generated" alone are too common in hand-written files)
+"""
+import re
+
+
+# the number of bytes at the start of a file that are inspected (which is
+# also what git inspects to tell binary files apart)
+SNIFF_SIZE = 8000
+
+# the number of lines at the start of a file that may hold a marker of
+# generated code
+MARKER_LINES = 10
+
+# the markers of generated code
+GENERATED_MARKER = re.compile(
+    rb"@generated\b|"
+    rb"^[ \t]*(?:#|//|/?\*|--|<!--)[ \t]*(?:"
+    rb"Code generated .* DO NOT EDIT\.|"
+    rb"Generated by Django \d|"
+    rb"Generated by the protocol buffer compiler\.  DO NOT EDIT!"
+    rb")",
+    re.MULTILINE
+)
+
+
+def get_skip_reason(head, skip_generated=False):
+    """
+    Tells whether a file should not be linted, from the start of its
+    content.
+
+    Args:
+        head: the first `SNIFF_SIZE` bytes of the file (or all of it).
+        skip_generated: whether generated files should not be linted.
+
+    Returns:
+        "binary", "generated", or `None` if the file should be linted.
+    """
+    if b"\0" in head:
+        return "binary"
+
+    if skip_generated and GENERATED_MARKER.search(
+        b"\n".join(head.split(b"\n")[:MARKER_LINES])
+    ):
+        return "generated"
+
+    return None
+
+
+def format_skipped(skipped, max_file_size=None):
+    """
+    Returns the summary of the files that were not linted.
+
+    Args:
+        skipped: a dictionary mapping the relative path of each skipped file
+            to the reason why it was skipped ("large", "binary" or
+            "generated").
+        max_file_size: the size limit of the files, in bytes.
+
+    Returns:
+        A string with a summary line followed by one line per file, e.g.
+
+        ```
+        Skipped 2 files: 1 larger than 1024 KB, 1 generated.
+          dump.sql (larger than 1024 KB)
+          foo_pb2.py (generated)
+        ```
+
+        or "" if no file was skipped.
+    """
+    if not skipped:
+        return ""
+
+    descriptions = {
+        "large": "larger than %d KB" % ((max_file_size or 0) // 1024),
+        "generated": "generated",
+        "binary": "binary"
+    }
+
+    reasons = list(skipped.values())
+    counts = [
+        "%d %s" % (reasons.count(reason), description)
+        for reason, description in descriptions.items()
+        if reason in reasons
+    ]
+
+    lines = ["Skipped %d file%s: %s." % (
+        len(skipped), "" if len(skipped) == 1 else "s", ", ".join(counts)
+    )]
+    for _file in sorted(skipped):
+        lines.append("  %s (%s)" % (_file, descriptions[skipped[_file]]))
+
+    return "\n".join(lines)
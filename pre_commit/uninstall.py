@@ -15,6 +15,18 @@ try:
 except FileNotFoundError:  # noqa
     pass
 
+# remove pre-push hook, if it was installed with the pre-commit hook
+pre_push_hook = path.abspath(
+    path.join(path.dirname(path.dirname(__file__)), "pre-push")
+)
+try:
+    with open(pre_push_hook) as pre_push_file:
+        installed = "from pre_commit." in pre_push_file.read()
+    if installed:
+        remove(pre_push_hook)
+except FileNotFoundError:  # noqa
+    pass
+
 # remove pre_commit subdirectory
 shutil.rmtree(
     path.abspath(path.join(path.dirname(__file__))),
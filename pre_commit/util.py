@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from configparser import ConfigParser
 from contextlib import contextmanager
+from hashlib import sha1
 from os import (
     chdir,
     getcwd,
@@ -26,7 +27,7 @@ def exec_in_dir(_dir):
         yield
 
 
-def get_config(section, option, conf_file_path):
+def get_config(section, option, conf_file_path, fallback=None):
     """
     Returns the value of an option stored in a section
     of a configuration file.
@@ -37,6 +38,9 @@ def get_config(section, option, conf_file_path):
         option: a string corresponding to an option contained in a section
             of a configuration file.
         conf_file_path: full path to the configuration file.
+        fallback: a string to return if the section or the option do not
+            exist (e.g. in configuration files written by older versions of
+            the installer); if `None`, an error is raised instead.
 
     Returns:
         A string, corresponding to the value of the target option in the
@@ -46,7 +50,10 @@ def get_config(section, option, conf_file_path):
 
     parser.read(conf_file_path)
 
-    return parser.get(section, option)
+    if fallback is None:
+        return parser.get(section, option)
+
+    return parser.get(section, option, fallback=fallback)
 
 
 def get_linter_config(pth):
@@ -60,3 +67,49 @@ def get_linter_config(pth):
         Returns its input if the path exists and "" otherwise.
     """
     return pth if path.exists(pth) else ""
+
+
+def in_shard(pth, shard, shard_count):
+    """
+    Tells whether a file belongs to a shard, so that `shard_count` machines
+    can each lint a disjoint slice of a repository.
+
+    Files are partitioned by a hash of their path, so that each file stays
+    in the same shard from one revision to the next.
+
+    Args:
+        pth: the relative path of a file.
+        shard: the number of the shard, from 1 to `shard_count`.
+        shard_count: the number of shards.
+
+    Returns:
+        `True` if the file belongs to the shard, `False` otherwise.
+    """
+    digest = sha1(pth.encode('utf-8')).digest()
+
+    return int.from_bytes(digest[:8], "big") % shard_count == shard - 1
+
+
+def split_versions(files_blobs):
+    """
+    Splits several versions of the same files into as few dictionaries as
+    possible, so that each of them holds at most one version of each file
+    and can be linted in a single directory.
+
+    Args:
+        files_blobs: a list of `(path, blob hash)` tuples.
+
+    Returns:
+        A list of dictionaries mapping paths to blob hashes; the versions of
+        each file appear in the same order as in `files_blobs`.
+    """
+    layers = []
+    for pth, sha in files_blobs:
+        for layer in layers:
+            if pth not in layer:
+                layer[pth] = sha
+                break
+        else:
+            layers.append({pth: sha})
+
+    return layers
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+This module implements the index watcher, an optional daemon that lints the
+staged files of a repository in the background, as soon as they are staged,
+and records the results in the cache of the repository (see
+`pre_commit.cache`), so that the hook usually finds all of its results there
+at commit time.
+
+The watcher is started by the hook once it is done linting (see
+`start_watcher()`), runs at a low priority, and exits once the index has not
+changed for a while.
+It can also be started by hand, e.g. with a longer idle timeout when commits
+are further apart than the one of the hook:
+
+```
+python -m pre_commit.watcher --root PATH --conf PATH --idle-timeout SECONDS
+```
+"""
+import ctypes
+import ctypes.util
+import struct
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from os import (
+    close,
+    makedirs,
+    nice,
+    path,
+    read,
+    stat
+)
+from select import select
+from subprocess import (
+    DEVNULL,
+    Popen
+)
+from time import (
+    sleep,
+    time
+)
+
+from pre_commit.git import GitHandle
+from pre_commit.worker import (
+    DEFAULT_IDLE_TIMEOUT,
+    get_daemon_env
+)
+
+
+# inotify constants (see inotify(7))
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# number of seconds the index must stay unchanged before the staged files
+# are linted (e.g. while `git add` runs on several paths)
+SETTLE_TIME = 0.5
+
+
+class IndexWatcher(object):
+    """
+    Notices changes to the index of a repository, through inotify on Linux
+    or by polling the modification time of the index elsewhere.
+    """
+
+    def __init__(self, git_dir, poll_interval=1.0, use_inotify=True):
+        """
+        Args:
+            git_dir: the absolute path of the git directory of the
+                repository.
+            poll_interval: the number of seconds between two checks of the
+                modification time of the index, if inotify is not available.
+            use_inotify: whether to use inotify, if it is available.
+        """
+        self.git_dir = git_dir
+        self.index_path = path.join(git_dir, "index")
+        self.poll_interval = poll_interval
+
+        self._fd = self._init_inotify() if use_inotify else None
+        self._mtime = self._get_mtime()
+
+    def _init_inotify(self):
+        """
+        Returns an inotify file descriptor that watches the git directory,
+        or `None` if inotify is not available.
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(_IN_CLOEXEC)
+        except (AttributeError, OSError):    # e.g. not on Linux
+            return None
+
+        if fd < 0:
+            return None
+
+        # git replaces the index by renaming "index.lock", so the directory
+        # is watched rather than the file
+        if libc.inotify_add_watch(
+            fd, self.git_dir.encode('utf-8'), _IN_CLOSE_WRITE | _IN_MOVED_TO
+        ) < 0:
+            close(fd)
+            return None
+
+        return fd
+
+    def _get_mtime(self):
+        try:
+            return stat(self.index_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def wait(self, timeout):
+        """
+        Waits for the index to change.
+
+        Returns:
+            `True` if the index changed within `timeout` seconds, `False`
+            otherwise.
+        """
+        deadline = time() + timeout
+
+        while True:
+            remaining = deadline - time()
+
+            if self._fd is not None:
+                readable, _, _ = select([self._fd], [], [], max(remaining, 0))
+                if readable and self._read_events():
+                    return True
+
+            else:
+                mtime = self._get_mtime()
+                if mtime != self._mtime:
+                    self._mtime = mtime
+                    return True
+                sleep(max(min(self.poll_interval, remaining), 0))
+
+            if time() >= deadline:
+                return False
+
+    def _read_events(self):
+        """
+        Reads the pending inotify events.
+
+        Returns:
+            Whether one of them concerns the index.
+        """
+        data = read(self._fd, 64 * 1024)
+        changed = False
+
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name == b"index":
+                changed = True
+
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            close(self._fd)
+            self._fd = None
+
+
+def get_lock_path(git_dir):
+    """
+    Returns the path of the file that is locked by the running watcher of a
+    repository.
+    """
+    return path.join(git_dir, "style", "watcher.lock")
+
+
+def lock_watcher(git_dir):
+    """
+    Makes sure that only one watcher runs for a repository.
+
+    Returns:
+        A lock file, which must be kept open while the watcher runs, or
+        `None` if another watcher holds the lock.
+    """
+    import fcntl
+
+    makedirs(path.join(git_dir, "style"), exist_ok=True)
+    lock_file = open(get_lock_path(git_dir), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+
+    return lock_file
+
+
+def start_watcher(root, git_dir, conf_file_path,
+                  idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Starts the watcher of a repository in a new session, unless it is
+    already running.
+
+    Args:
+        root: the absolute path of the root of the repository.
+        git_dir: the absolute path of the git directory of the repository.
+        conf_file_path: the full path to the `linters.conf` file of the hook.
+        idle_timeout: the number of seconds after which the watcher exits if
+            the index does not change.
+    """
+    lock_file = lock_watcher(git_dir)
+    if lock_file is None:
+        return
+    # release the lock for the new watcher
+    lock_file.close()
+
+    Popen(
+        [
+            sys.executable, "-m", "pre_commit.watcher",
+            "--root", root,
+            "--conf", conf_file_path,
+            "--idle-timeout", str(idle_timeout)
+        ],
+        stdin=DEVNULL,
+        stdout=DEVNULL,
+        stderr=DEVNULL,
+        env=get_daemon_env(),
+        cwd=root,
+        start_new_session=True
+    )
+
+
+def lint_staged_files(git_handle, conf_file_path):
+    """
+    Lints the staged files of a repository whose results are not in its
+    cache yet, discarding the output.
+    """
+    # the linters are only needed by the watcher itself
+    from pre_commit.hook import get_lint
+
+    # the files are written to a temporary directory, as the mirror belongs
+    # to the hook
+    # the report is left to the hook, and all results are needed
+    lint = get_lint(
+        git_handle, conf_file_path, mirror=False, report=False,
+        fail_fast=False
+    )
+    if lint.cache is None:
+        return
+
+    try:
+        with redirect_stdout(StringIO()):
+            lint.run()
+
+    except Exception:
+        # e.g. a path with forbidden characters: the hook reports it
+        pass
+
+    finally:
+        lint.cache.close()
+
+
+def watch(git_handle, conf_file_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Runs the watcher of a repository until its index does not change for
+    `idle_timeout` seconds.
+    """
+    git_dir = git_handle.get_git_dir()
+
+    lock_file = lock_watcher(git_dir)
+    if lock_file is None:
+        return
+
+    watcher = IndexWatcher(git_dir)
+    try:
+        # yield to the hook and to the user
+        nice(10)
+
+        lint_staged_files(git_handle, conf_file_path)
+        while watcher.wait(idle_timeout):
+            # wait for git to be done with the index
+            while watcher.wait(SETTLE_TIME):
+                pass
+            lint_staged_files(git_handle, conf_file_path)
+
+    finally:
+        watcher.close()
+        lock_file.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Lint the staged files of a repository in the background."
+    )
+    parser.add_argument("--root", required=True)
+    parser.add_argument("--conf", required=True)
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT
+    )
+    args = parser.parse_args()
+
+    watch(GitHandle(path=args.root), args.conf, args.idle_timeout)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+This module implements long-lived linter workers.
+
+A worker is a small daemon that owns the interpreter of a linter (e.g. an R
+session in which `lintr` is loaded) and serves requests from the hook over a
+Unix socket, so that the interpreter only starts once for many files and
+many commits.
+The daemon is started on demand by `WorkerClient` and exits once it has been
+idle for `idle_timeout` seconds.
+
+The interpreter must read one "<directory>\\t<file path>" line per file on
+stdin, and write the output of the linter for that file (run from that
+directory) followed by a line with the `END_OF_OUTPUT` character on stdout.
+
+This module only depends on the standard library, as it is run as a script
+to start a daemon:
+
+```
+python worker.py --socket PATH --idle-timeout SECONDS -- COMMAND...
+```
+"""
+import json
+import socket
+import sys
+from argparse import ArgumentParser
+from hashlib import sha1
+from os import (
+    chmod,
+    environ,
+    getuid,
+    lstat,
+    mkdir,
+    path,
+    remove
+)
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    Popen
+)
+from stat import S_ISDIR
+from tempfile import gettempdir
+from time import (
+    sleep,
+    time
+)
+
+
+# the character on the line that ends the output for each file
+END_OF_OUTPUT = "\x1e"
+
+# default number of seconds after which an idle daemon exits
+DEFAULT_IDLE_TIMEOUT = 600
+
+# number of seconds after which a client gives up connecting to a daemon
+CONNECT_TIMEOUT = 5
+
+# default number of seconds after which a client gives up waiting for the
+# response of a daemon (e.g. a daemon that hangs), and lints on its own
+DEFAULT_REQUEST_TIMEOUT = 300
+
+
+class WorkerError(Exception):
+    """
+    Exception raised if a worker (or another daemon) cannot serve a
+    request.
+    """
+    pass
+
+
+def get_socket_dir():
+    """
+    Returns the path of the directory that holds the sockets of the daemons
+    of the current user (see `make_socket_dir()`).
+    """
+    runtime_dir = environ.get("XDG_RUNTIME_DIR") or gettempdir()
+
+    return path.join(runtime_dir, "style-%d" % getuid())
+
+
+def make_socket_dir(socket_dir):
+    """
+    Creates the directory of the sockets of the daemons of the current user
+    if it does not exist, and checks that no other user can access it: it
+    may be in a shared directory (e.g. `/tmp`), where anybody could have
+    created it first to serve or intercept requests.
+
+    Raises:
+        WorkerError: if the directory is not a private directory of the
+            current user.
+    """
+    try:
+        mkdir(socket_dir, 0o700)
+    except FileExistsError:
+        pass
+
+    # `lstat()`: a symbolic link is rejected as well
+    socket_dir_stat = lstat(socket_dir)
+    if (not S_ISDIR(socket_dir_stat.st_mode) or
+            socket_dir_stat.st_uid != getuid() or
+            socket_dir_stat.st_mode & 0o077):
+        raise WorkerError(
+            "%s is not a private directory of the current user." % socket_dir
+        )
+
+
+def get_socket_path(*parts):
+    """
+    Returns the path of the socket of a daemon identified by some strings,
+    e.g. the command that it runs (there is one daemon per user and
+    identity).
+    """
+    return path.join(get_socket_dir(), "%s.sock" % (
+        sha1("\0".join(parts).encode('utf-8')).hexdigest()[:16]
+    ))
+
+
+def get_daemon_env():
+    """
+    Returns the environment of a new daemon.
+    """
+    # the daemon outlives the hook: it must not inherit the variables that
+    # git sets for the hook (e.g. `GIT_INDEX_FILE`)
+    env = {
+        key: value for key, value in environ.items()
+        if not key.startswith("GIT_")
+    }
+    # make the `pre_commit` package importable
+    env["PYTHONPATH"] = path.dirname(path.dirname(path.abspath(__file__)))
+
+    return env
+
+
+class DaemonClient(object):
+    """
+    The client side of a daemon that serves JSON requests on a Unix socket
+    (see `serve_requests()`): starts the daemon if it is not running.
+    """
+
+    def __init__(self, socket_path, daemon_command, start_timeout=30,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        """
+        Args:
+            socket_path: the path of the socket of the daemon.
+            daemon_command: the command that starts the daemon.
+            start_timeout: the maximum number of seconds to wait for a new
+                daemon to accept requests.
+            request_timeout: the maximum number of seconds to wait for the
+                response to a request.
+        """
+        self.socket_path = socket_path
+        self.daemon_command = daemon_command
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+
+    def request(self, request):
+        """
+        Sends a request (a JSON-serializable dictionary) to the daemon,
+        starting the daemon if needed, and returns its response.
+
+        Raises:
+            WorkerError: if the daemon is not available or does not respond
+                in time.
+        """
+        make_socket_dir(path.dirname(self.socket_path))
+
+        try:
+            return self._send(request)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # the daemon is not running
+            self._start()
+            return self._send(request)
+
+    def _send(self, request):
+        """
+        Sends a request to the daemon and waits for its response.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.settimeout(CONNECT_TIMEOUT)
+                client.connect(self.socket_path)
+                client.settimeout(self.request_timeout)
+                client.sendall((json.dumps(request) + "\n").encode('utf-8'))
+                with client.makefile("rb") as reader:
+                    line = reader.readline()
+            except socket.timeout:
+                raise WorkerError("The daemon did not respond in time.")
+
+        if not line:
+            raise WorkerError("The daemon closed the connection.")
+
+        response = json.loads(line.decode('utf-8'))
+        if "error" in response:
+            raise WorkerError(response["error"])
+
+        return response
+
+    def _start(self):
+        """
+        Starts the daemon in a new session and waits until it accepts
+        connections.
+        """
+        daemon = Popen(
+            self.daemon_command,
+            stdin=DEVNULL,
+            stdout=DEVNULL,
+            stderr=DEVNULL,
+            env=get_daemon_env(),
+            # do not keep the working directory of the hook busy
+            cwd=path.dirname(self.socket_path),
+            start_new_session=True
+        )
+
+        deadline = time() + self.start_timeout
+        while time() < deadline:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.settimeout(CONNECT_TIMEOUT)
+                try:
+                    probe.connect(self.socket_path)
+                    return
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # the daemon exits with 0 if another one is starting
+                    if daemon.poll():
+                        raise WorkerError("The daemon could not start.")
+                    sleep(0.05)
+
+        raise WorkerError("The daemon did not start.")
+
+
+class WorkerClient(DaemonClient):
+    """
+    The client side of a worker: sends files to lint to the daemon, starting
+    the daemon if it is not running.
+    """
+
+    def __init__(self, command, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 start_timeout=30, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        """
+        Args:
+            command: the command that starts the interpreter of the linter.
+            idle_timeout: the number of seconds after which the daemon exits
+                if it receives no requests.
+            start_timeout, request_timeout: see `DaemonClient`.
+        """
+        socket_path = get_socket_path(*command)
+
+        super().__init__(
+            socket_path,
+            [
+                sys.executable, path.abspath(__file__),
+                "--socket", socket_path,
+                "--idle-timeout", str(idle_timeout),
+                "--"
+            ] + command,
+            start_timeout,
+            request_timeout
+        )
+
+    def lint(self, cwd, files):
+        """
+        Lints files with the worker.
+
+        Args:
+            cwd: the directory from which to lint the files.
+            files: a list of file paths, relative to `cwd`.
+
+        Returns:
+            A dictionary mapping each file to the output of the linter.
+        """
+        return self.request({"cwd": cwd, "files": files})["outputs"]
+
+
+def lock_socket(socket_path):
+    """
+    Makes sure that only one daemon serves a socket.
+
+    Returns:
+        A lock file, which must be kept open while the daemon runs, or
+        `None` if another daemon holds the lock.
+    """
+    import fcntl
+
+    lock_file = open("%s.lock" % socket_path, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+
+    return lock_file
+
+
+def serve_requests(socket_path, handle_request,
+                   idle_timeout=DEFAULT_IDLE_TIMEOUT, is_alive=None):
+    """
+    Serves JSON requests on a Unix socket, one at a time, until no request
+    arrives for `idle_timeout` seconds.
+
+    Args:
+        socket_path: the path of the socket.
+        handle_request: a function that takes a request (a dictionary) and
+            returns a JSON-serializable dictionary; if it raises an
+            exception, an `{"error": message}` response is sent instead.
+        idle_timeout: see above.
+        is_alive: an optional function that returns `False` once the daemon
+            cannot serve requests anymore.
+    """
+    # remove the socket of a daemon that died
+    if path.exists(socket_path):
+        remove(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        chmod(socket_path, 0o600)
+        server.listen()
+        server.settimeout(idle_timeout)
+
+        while is_alive is None or is_alive():
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                break
+
+            with connection:
+                connection.settimeout(None)
+                with connection.makefile("rb") as reader:
+                    line = reader.readline()
+
+                # e.g. a client checking that the daemon accepts connections
+                if not line:
+                    continue
+
+                try:
+                    response = handle_request(json.loads(line.decode('utf-8')))
+                except Exception as e:
+                    response = {"error": str(e)}
+
+                try:
+                    connection.sendall(
+                        (json.dumps(response) + "\n").encode('utf-8')
+                    )
+                except OSError:    # the client is gone
+                    pass
+
+    finally:
+        server.close()
+        remove(socket_path)
+
+
+def _lint(interpreter, request):
+    """
+    Serves a request of a `WorkerClient`, forwarding each file to the
+    interpreter.
+    """
+    outputs = {}
+    for _file in request["files"]:
+        interpreter.stdin.write(
+            ("%s\t%s\n" % (request["cwd"], _file)).encode('utf-8')
+        )
+        interpreter.stdin.flush()
+
+        lines = []
+        while True:
+            line = interpreter.stdout.readline()
+            if not line:
+                raise WorkerError("The interpreter of the worker exited.")
+            if line.rstrip(b"\r\n") == END_OF_OUTPUT.encode('utf-8'):
+                break
+            lines.append(line)
+        outputs[_file] = b"".join(lines).decode('utf-8')
+
+    return {"outputs": outputs}
+
+
+def serve(socket_path, command, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Runs a worker: starts the interpreter of the linter and serves requests
+    on a Unix socket until no request arrives for `idle_timeout` seconds or
+    the interpreter exits.
+    """
+    lock_file = lock_socket(socket_path)
+    if lock_file is None:
+        return
+
+    interpreter = Popen(command, stdin=PIPE, stdout=PIPE, stderr=DEVNULL)
+    try:
+        serve_requests(
+            socket_path,
+            lambda request: _lint(interpreter, request),
+            idle_timeout,
+            lambda: interpreter.poll() is None
+        )
+
+    finally:
+        interpreter.stdin.close()
+        interpreter.kill()
+        interpreter.wait()
+        lock_file.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run a linter worker daemon.")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT
+    )
+    parser.add_argument("command", nargs="+")
+    args = parser.parse_args()
+
+    serve(args.socket, args.command, args.idle_timeout)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.cache` submodule.
+"""
+import sqlite3
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.cache import ResultCache
+
+
+class TestResultCache(TestCase):
+
+    def test_get_put(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(path.join(tmp.name, "style", "cache.sqlite"))
+
+            key = cache.make_key("blob", "PythonLinter", "", "1.0")
+
+            # nothing is cached yet
+            self.assertIsNone(cache.get(key))
+
+            output = '[[1, 1, "F401", "\'index.py\' imported but unused"]]'
+            cache.put(key, 1, output)
+            self.assertEqual(cache.get(key), (1, output))
+
+            # results persist across sessions
+            cache.close()
+            cache = ResultCache(path.join(tmp.name, "style", "cache.sqlite"))
+            self.assertEqual(cache.get(key), (1, output))
+
+            # a different version of the linter is a different key
+            self.assertIsNone(
+                cache.get(cache.make_key("blob", "PythonLinter", "", "2.0"))
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            cache.close()
+            tmp.cleanup()
+
+    def test_eviction(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(
+                path.join(tmp.name, "cache.sqlite"), max_size=2000
+            )
+
+            # each result takes more than 1000 bytes, so that only one fits
+            cache.put("old", 1, "x" * 1000)
+            cache.commit()
+            cache.put("new", 1, "y" * 1000)
+            cache.commit()
+
+            self.assertIsNone(cache.get("old"))
+            self.assertEqual(cache.get("new"), (1, "y" * 1000))
+
+        except Exception:
+            raise
+
+        finally:
+            cache.close()
+            tmp.cleanup()
+
+    def test_stats(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(path.join(tmp.name, "cache.sqlite"))
+
+            # no lookups yet
+            self.assertIsNone(cache.get_hit_ratio())
+
+            cache.put("key", 0, "")
+            cache.get("key")
+            cache.get("key")
+            cache.get("other")
+            cache.commit()
+
+            stats = cache.get_stats()
+            self.assertEqual(stats["entries"], 1)
+            self.assertEqual(stats["hits"], 2)
+            self.assertEqual(stats["misses"], 1)
+            self.assertAlmostEqual(cache.get_hit_ratio(), 2 / 3)
+
+            cache.clear()
+            self.assertEqual(cache.get_stats()["entries"], 0)
+
+        except Exception:
+            raise
+
+        finally:
+            cache.close()
+            tmp.cleanup()
+
+    def test_concurrent_processes(self):
+        try:
+            tmp = TemporaryDirectory()
+            db_path = path.join(tmp.name, "cache.sqlite")
+            cache = ResultCache(db_path)
+            other = ResultCache(db_path)
+            # do not wait for locks
+            other.connection.execute("PRAGMA busy_timeout = 0")
+
+            # a hit does not keep the database locked
+            cache.put("key", 0, "")
+            self.assertEqual(cache.get("key"), (0, ""))
+            other.put("other", 1, "bar")
+            self.assertEqual(cache.get("other"), (1, "bar"))
+
+            # if the database is locked, a lookup is a miss and a result is
+            # not cached
+            locker = sqlite3.connect(db_path, isolation_level=None)
+            locker.execute("BEGIN EXCLUSIVE")
+            self.assertIsNone(other.get("key"))
+            other.put("new", 1, "baz")
+            other.commit()
+            locker.rollback()
+            locker.close()
+
+            self.assertIsNone(cache.get("new"))
+            self.assertEqual(other.get("key"), (0, ""))
+
+        except Exception:
+            raise
+
+        finally:
+            cache.close()
+            other.close()
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
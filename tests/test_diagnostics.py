@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.diagnostics` submodule.
+"""
+import json
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.diagnostics import (
+    Diagnostic,
+    dump_diagnostics,
+    format_diagnostics,
+    load_diagnostics,
+    parse_flake8,
+    parse_lintr,
+    parse_markdownlint,
+    parse_text
+)
+
+
+class TestDiagnostic(TestCase):
+
+    def test_format(self):
+        self.assertEqual(
+            format_diagnostics([
+                Diagnostic("a.py", 1, 2, "E225", "missing whitespace",
+                           "error"),
+                Diagnostic("a.md", 3, None, "", "too long", "error"),
+                Diagnostic("a.py", None, None, "", "Traceback", "error")
+            ]),
+            "a.py:1:2: E225 missing whitespace\n"
+            "a.md:3: too long\n"
+            "Traceback\n"
+        )
+
+    def test_dump_and_load(self):
+        diagnostics = [
+            Diagnostic("a.py", 1, 2, "E225", "missing whitespace", "error"),
+            Diagnostic("a.py", None, None, "", "Traceback", "error")
+        ]
+
+        # the path is not stored
+        data = dump_diagnostics(diagnostics)
+        self.assertNotIn("a.py", data)
+
+        self.assertEqual(load_diagnostics(data, "a.py"), diagnostics)
+        self.assertEqual(
+            load_diagnostics(data, "b.py")[0],
+            diagnostics[0]._replace(path="b.py")
+        )
+
+
+class TestParse(TestCase):
+
+    def test_parse_text(self):
+        self.assertEqual(
+            parse_text(
+                "crash\n"
+                "a.py:1:2: first\n"
+                "    a=1\n"
+                "a.py:3 second\n",
+                "a.py"
+            ),
+            [
+                Diagnostic("a.py", None, None, "", "crash", "error"),
+                Diagnostic("a.py", 1, 2, "", "first\n    a=1", "error"),
+                Diagnostic("a.py", 3, None, "", "second", "error")
+            ]
+        )
+
+    def test_parse_flake8(self):
+        self.assertEqual(
+            parse_flake8(
+                "a.py\t1\t2\tE225\tmissing whitespace\n"
+                "b.py\t2\t1\tW391\tblank line at end of file\n",
+                "a.py"
+            ),
+            [
+                Diagnostic("a.py", 1, 2, "E225", "missing whitespace",
+                           "error"),
+                Diagnostic("b.py", 2, 1, "W391", "blank line at end of file",
+                           "warning")
+            ]
+        )
+
+    def test_parse_markdownlint(self):
+        out = json.dumps([
+            {
+                "fileName": "a.md",
+                "lineNumber": 3,
+                "ruleNames": ["MD013", "line-length"],
+                "ruleDescription": "Line length",
+                "errorDetail": "Expected: 80; Actual: 120",
+                "errorContext": None,
+                "errorRange": [81, 40]
+            },
+            {
+                "fileName": "a.md",
+                "lineNumber": 1,
+                "ruleNames": ["MD041", "first-line-heading"],
+                "ruleDescription": "First line should be a heading",
+                "errorDetail": None,
+                "errorContext": "foo",
+                "errorRange": None
+            }
+        ], indent=2)
+
+        self.assertEqual(
+            parse_markdownlint(out, "a.md"),
+            [
+                Diagnostic("a.md", 1, None, "MD041/first-line-heading",
+                           'First line should be a heading [Context: "foo"]',
+                           "error"),
+                Diagnostic("a.md", 3, 81, "MD013/line-length",
+                           "Line length [Expected: 80; Actual: 120]", "error")
+            ]
+        )
+
+        # no problems, or a crash
+        self.assertEqual(parse_markdownlint("", "a.md"), [])
+        self.assertEqual(
+            parse_markdownlint("Error: foo\n", "a.md"),
+            [Diagnostic("a.md", None, None, "", "Error: foo", "error")]
+        )
+
+    def test_parse_lintr(self):
+        self.assertEqual(
+            parse_lintr(
+                "a.R\t1\t2\tinfix_spaces_linter\tstyle\tPut spaces.\n",
+                "a.R"
+            ),
+            [
+                Diagnostic("a.R", 1, 2, "infix_spaces_linter", "Put spaces.",
+                           "style")
+            ]
+        )
+
+
+if __name__ == "__main__":
+    main()
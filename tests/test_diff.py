@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.diff` submodule.
+"""
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.diagnostics import Diagnostic
+from pre_commit.diff import (
+    filter_diagnostics,
+    LineIndex,
+    parse_changed_lines
+)
+
+
+class TestLineIndex(TestCase):
+
+    def test_contains(self):
+        line_index = LineIndex([(10, 12), (1, 1), (20, 20)])
+
+        self.assertEqual(
+            [line for line in range(25) if line in line_index],
+            [1, 10, 11, 12, 20]
+        )
+
+        # an empty index contains no lines
+        self.assertFalse(LineIndex())
+        self.assertNotIn(1, LineIndex())
+
+
+class TestParseChangedLines(TestCase):
+
+    def test_parse_changed_lines(self):
+        diff = "\n".join([
+            "diff --git a/foo.py b/foo.py",
+            "index 1111111..2222222 100644",
+            "--- a/foo.py",
+            "+++ b/foo.py",
+            "@@ -1 +1 @@",
+            "-a=1",
+            "+a = 1",
+            "@@ -5,0 +6,2 @@ def foo():",
+            "+b = 2",
+            "+c = 3",
+            "@@ -10,3 +11,0 @@",
+            "-d = 4",
+            "-e = 5",
+            "-f = 6",
+            "diff --git a/bar.py b/bar.py",
+            "deleted file mode 100644",
+            "--- a/bar.py",
+            "+++ /dev/null",
+            "@@ -1 +0,0 @@",
+            "-a = 1",
+            "diff --git a/baz.py b/baz.py",
+            "old mode 100644",
+            "new mode 100755",
+            ""
+        ])
+
+        # deleted lines and files do not count, and neither do changes
+        # without content
+        self.assertEqual(
+            parse_changed_lines(diff),
+            {"foo.py": LineIndex([(1, 1), (6, 7)])}
+        )
+
+    def test_parse_lines_like_headers(self):
+        # a removed "-- a/evil" line and an added "++ b/evil" line
+        diff = "\n".join([
+            "diff --git a/foo.md b/foo.md",
+            "index 1111111..2222222 100644",
+            "--- a/foo.md",
+            "+++ b/foo.md",
+            "@@ -3 +3,2 @@",
+            "--- a/evil",
+            "+++ b/evil",
+            "+@@ -1 +100 @@",
+            "\\ No newline at end of file",
+            ""
+        ])
+
+        self.assertEqual(
+            parse_changed_lines(diff), {"foo.md": LineIndex([(3, 4)])}
+        )
+
+
+class TestFilterDiagnostics(TestCase):
+
+    def test_filter_diagnostics(self):
+        diagnostics = [
+            Diagnostic("foo.R", 1, 2, "infix_spaces_linter", "foo", "style"),
+            Diagnostic("foo.R", 3, 1, "trailing_blank_lines_linter", "bar",
+                       "style")
+        ]
+
+        self.assertEqual(
+            filter_diagnostics(diagnostics, LineIndex([(3, 4)])),
+            diagnostics[1:]
+        )
+
+        # files without problems on changed lines are clean
+        self.assertEqual(
+            filter_diagnostics(diagnostics, LineIndex([(2, 2)])), []
+        )
+
+        # problems that are not about a line are kept
+        crash = Diagnostic("foo.R", None, None, "", "Error: foo", "error")
+        self.assertEqual(filter_diagnostics([crash], LineIndex()), [crash])
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,21 @@
 """
 Tests for the `pre_commit.git` submodule.
 """
-from os import path
+import asyncio
+from os import (
+    mkdir,
+    path
+)
 from tempfile import TemporaryDirectory
 from unittest import (
     main,
     TestCase
 )
 
+from pre_commit.diff import LineIndex
 from pre_commit.git import (
+    CHUNK_SIZE,
+    FileChange,
     ForbiddenCharacterError,
     GitHandle,
     RepositoryError
@@ -159,6 +166,317 @@ class TestGitHandle(TestCase):
         finally:
             repo.delete()
 
+    def test_get_staged_files_blobs(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # write and stage a file
+            test_staged_file = path.join(repo.repo_path, "test_staged_file")
+            with open(test_staged_file, "w") as foo:
+                foo.write("test stage")
+            repo.repo.git.add(test_staged_file)
+
+            self.assertEqual(
+                git_handle.get_staged_files_blobs(),
+                {
+                    "test_staged_file":
+                    repo.repo.git.rev_parse(":test_staged_file")
+                }
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+    def test_get_staged_changes(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # commit five files, with different contents so that renames are
+            # matched unambiguously
+            names = ["deleted", "renamed", "edited", "executable", "moved"]
+            for name in names:
+                with open(path.join(repo.repo_path, name), "w") as foo:
+                    foo.write("test content of %s\n" % name * 10)
+            repo.repo.git.add(names)
+            repo.repo.git.commit(m="base")
+
+            # delete a file, rename another one without changes, make one
+            # executable, rename and edit one, edit one and add one
+            repo.repo.git.rm("deleted")
+            repo.repo.git.mv("renamed", "renamed1")
+            repo.repo.git.update_index("--chmod=+x", "executable")
+            repo.repo.git.mv("moved", "moved1")
+            for name in ("moved1", "edited", "added"):
+                with open(path.join(repo.repo_path, name), "a") as foo:
+                    foo.write("test edit\n")
+            repo.repo.git.add(["moved1", "edited", "added"])
+
+            changes = {
+                change.path: change
+                for change in git_handle.get_staged_changes()
+            }
+            self.assertEqual(
+                {pth: change.status for pth, change in changes.items()},
+                {
+                    "deleted": "D",
+                    "renamed1": "R",
+                    "executable": "M",
+                    "moved1": "R",
+                    "edited": "M",
+                    "added": "A"
+                }
+            )
+            self.assertEqual(changes["moved1"].old_path, "moved")
+            self.assertEqual(changes["executable"].new_mode, "100755")
+
+            # only the files with new content are linted
+            self.assertEqual(
+                git_handle.get_staged_files_blobs(),
+                {
+                    name: repo.repo.git.rev_parse(":%s" % name)
+                    for name in ("moved1", "edited", "added")
+                }
+            )
+            self.assertEqual(
+                set(git_handle.get_staged_files_paths()),
+                {"renamed1", "executable", "moved1", "edited", "added"}
+            )
+
+            # a renamed file is linted again if its extension changed
+            sha = repo.repo.git.rev_parse(":renamed1")
+            self.assertTrue(FileChange(
+                "R", "script", "script.py", "100644", "100644", sha, sha
+            ).changes_content)
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+    def test_get_changed_files_blobs(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # commit two files
+            for name in ("test_file", "test_file1"):
+                with open(path.join(repo.repo_path, name), "w") as foo:
+                    foo.write("test commit")
+            repo.repo.git.add(["test_file", "test_file1"])
+            repo.repo.git.commit(m="base")
+
+            # edit one of them and delete the other one, and add a new file
+            with open(path.join(repo.repo_path, "test_file"), "a") as foo:
+                foo.write("test edit")
+            with open(path.join(repo.repo_path, "test_file2"), "w") as foo:
+                foo.write("a new file")
+            repo.repo.git.add(["test_file", "test_file2"])
+            repo.repo.git.rm("test_file1")
+            repo.repo.git.commit(m="head")
+
+            # one more change, which is not in the range
+            with open(path.join(repo.repo_path, "test_file"), "a") as foo:
+                foo.write("test edit")
+            repo.repo.git.add("test_file")
+            repo.repo.git.commit(m="next")
+
+            self.assertEqual(
+                git_handle.get_changed_files_blobs("HEAD~2..HEAD~1"),
+                {
+                    "test_file": repo.repo.git.rev_parse("HEAD~1:test_file"),
+                    "test_file2": repo.repo.git.rev_parse("HEAD~1:test_file2")
+                }
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+    def test_get_tracked_files_blobs(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # commit a file in a subdirectory
+            mkdir(path.join(repo.repo_path, "subdir"))
+            test_file = path.join(repo.repo_path, "subdir", "test_file")
+            with open(test_file, "w") as foo:
+                foo.write("test commit")
+            repo.repo.git.add(test_file)
+            repo.repo.git.commit(m="test commit")
+
+            # stage a change and a new file
+            with open(test_file, "a") as foo:
+                foo.write("test stage")
+            test_staged_file = path.join(repo.repo_path, "test_staged_file")
+            with open(test_staged_file, "w") as foo:
+                foo.write("test stage")
+            repo.repo.git.add([test_file, test_staged_file])
+
+            # the index
+            self.assertEqual(
+                git_handle.get_tracked_files_blobs(),
+                {
+                    "subdir/test_file":
+                    repo.repo.git.rev_parse(":subdir/test_file"),
+                    "test_staged_file":
+                    repo.repo.git.rev_parse(":test_staged_file")
+                }
+            )
+
+            # the last commit
+            self.assertEqual(
+                git_handle.get_tracked_files_blobs("HEAD"),
+                {
+                    "subdir/test_file":
+                    repo.repo.git.rev_parse("HEAD:subdir/test_file")
+                }
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+    def test_get_staged_changed_lines(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # stage a new file before the first commit
+            test_file = path.join(repo.repo_path, "test_file")
+            with open(test_file, "w") as foo:
+                foo.write("a\nb\nc\nd\n")
+            repo.repo.git.add(test_file)
+            self.assertEqual(
+                git_handle.get_staged_changed_lines(),
+                {"test_file": LineIndex([(1, 4)])}
+            )
+
+            # modify a line and add two more after committing the file
+            repo.repo.git.commit(m="test commit")
+            with open(test_file, "w") as foo:
+                foo.write("a\nB\nc\nd\ne\nf\n")
+            repo.repo.git.add(test_file)
+            self.assertEqual(
+                git_handle.get_staged_changed_lines(),
+                {"test_file": LineIndex([(2, 2), (5, 6)])}
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+    def test_get_pushed_files_blobs(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # a first commit, which the remote already has
+            test_file = path.join(repo.repo_path, "test_file")
+            with open(test_file, "w") as foo:
+                foo.write("v1")
+            repo.repo.git.add(test_file)
+            repo.repo.git.commit(m="v1")
+            remote_sha = repo.repo.git.rev_parse("HEAD")
+
+            # four commits to push: a change, a new file with the same
+            # content, a revert of the change and a rename of the new file
+            # that changes its extension
+            with open(test_file, "w") as foo:
+                foo.write("v2")
+            repo.repo.git.add(test_file)
+            repo.repo.git.commit(m="v2")
+
+            test_new_file = path.join(repo.repo_path, "test_new_file")
+            with open(test_new_file, "w") as foo:
+                foo.write("v2")
+            repo.repo.git.add(test_new_file)
+            repo.repo.git.commit(m="new file")
+
+            with open(test_file, "w") as foo:
+                foo.write("v1")
+            repo.repo.git.add(test_file)
+            repo.repo.git.commit(m="revert")
+
+            repo.repo.git.mv("test_new_file", "test_new_file.py")
+            repo.repo.git.commit(m="rename")
+            local_sha = repo.repo.git.rev_parse("HEAD")
+
+            # each blob appears once at each path where it was introduced
+            v1 = repo.repo.git.rev_parse("HEAD:test_file")
+            v2 = repo.repo.git.rev_parse("HEAD:test_new_file.py")
+            self.assertEqual(
+                git_handle.get_pushed_files_blobs(
+                    [(local_sha, remote_sha)], "origin"
+                ),
+                [
+                    ("test_file", v2),
+                    ("test_new_file", v2),
+                    ("test_file", v1),
+                    ("test_new_file.py", v2)
+                ]
+            )
+
+            # a new ref sends all of the commits
+            self.assertEqual(
+                len(
+                    git_handle.get_pushed_files_blobs(
+                        [(local_sha, "0" * 40)], "origin"
+                    )
+                ),
+                4
+            )
+
+            # a deleted ref sends nothing
+            self.assertEqual(
+                git_handle.get_pushed_files_blobs(
+                    [("0" * 40, remote_sha)], "origin"
+                ),
+                []
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
     def test_staged_file_content(self):
 
         try:
@@ -194,6 +512,87 @@ class TestGitHandle(TestCase):
         finally:
             repo.delete()
 
+    def test_write_blobs_async(self):
+
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # initialize git handle
+            git_handle = GitHandle(repo.repo_path)
+
+            # write and stage a large file and a small one
+            large_content = b"0123456789abcdef\n" * (CHUNK_SIZE // 4)
+            test_staged_file = path.join(repo.repo_path, "large_file")
+            with open(test_staged_file, "wb") as foo:
+                foo.write(large_content)
+
+            test_staged_file1 = path.join(repo.repo_path, "small_file")
+            with open(test_staged_file1, "w") as foo:
+                foo.write("small")
+
+            repo.repo.git.add([test_staged_file, test_staged_file1])
+
+            # write the staged files to a temporary directory, collecting
+            # the files as they are written
+            tmp = TemporaryDirectory()
+            written = []
+            asyncio.run(git_handle.write_blobs_async(
+                git_handle.get_staged_files_blobs(),
+                tmp.name,
+                callback=written.append
+            ))
+
+            self.assertEqual(written, ["large_file", "small_file"])
+            with open(path.join(tmp.name, "large_file"), "rb") as foo:
+                self.assertEqual(foo.read(), large_content)
+            with open(path.join(tmp.name, "small_file")) as foo:
+                self.assertEqual(foo.read(), "small")
+
+            # the sizes of the blobs, without their content
+            blobs = git_handle.get_staged_files_blobs()
+            self.assertEqual(
+                git_handle.get_blob_sizes(
+                    list(blobs.values()) + ["0" * 40]
+                ),
+                {
+                    blobs["large_file"]: len(large_content),
+                    blobs["small_file"]: len("small")
+                }
+            )
+
+            # skip a file from its first bytes, which removes its previous
+            # version
+            heads = {}
+
+            def sniff(_file, head):
+                heads[_file] = head
+                return head.startswith(b"0123")
+
+            written = []
+            asyncio.run(git_handle.write_blobs_async(
+                blobs,
+                tmp.name,
+                callback=written.append,
+                sniff=sniff,
+                sniff_size=10
+            ))
+
+            self.assertEqual(written, ["large_file", "small_file"])
+            self.assertEqual(
+                heads, {"large_file": b"0123456789", "small_file": b"small"}
+            )
+            self.assertFalse(path.exists(path.join(tmp.name, "large_file")))
+            with open(path.join(tmp.name, "small_file")) as foo:
+                self.assertEqual(foo.read(), "small")
+
+        except Exception:
+            raise
+
+        finally:
+            tmp.cleanup()
+            repo.delete()
+
 
 class TestGitHandleErrors(TestCase):
 
@@ -6,6 +6,7 @@ from configparser import ConfigParser
 from os import path
 from subprocess import (
     DEVNULL,
+    PIPE,
     Popen
 )
 from tempfile import TemporaryDirectory
@@ -14,7 +15,10 @@ from unittest import (
     TestCase
 )
 
-from tests.util import BasicRepo
+from tests.util import (
+    BasicRepo,
+    Writer
+)
 
 
 class TestInstall(TestCase):
@@ -65,6 +69,12 @@ class TestInstall(TestCase):
                 ))
             )
 
+            # test that the number of jobs defaults to the number of CPUs
+            self.assertEqual(parser["options"]["jobs"], "0")
+
+            # test that linter sessions are not kept running by default
+            self.assertEqual(parser["options"]["r_worker"], "False")
+
         except Exception:
             raise
 
@@ -114,6 +124,65 @@ class TestInstall(TestCase):
         finally:
             tmp.cleanup()
 
+    def test_pre_push_install(self):
+        try:
+            # create a temporary directory to host the target repo and a
+            # remote
+            tmp = TemporaryDirectory()
+            repo = BasicRepo(path=path.join(tmp.name, "repo"), bare=False)
+            BasicRepo(path=path.join(tmp.name, "remote.git"))
+            repo.repo.git.remote(
+                "add", "origin", path.join(tmp.name, "remote.git")
+            )
+
+            # run the installer
+            pipe = Popen(
+                ["python", "install.py", "-p", "--pre-push", repo.repo_path],
+                stdout=DEVNULL
+            )
+            _ = pipe.communicate()  # noqa
+            self.assertEqual(pipe.returncode, 0)
+
+            # commit a bad file without verification, and fix it in a
+            # second commit
+            w = Writer(path.join(repo.repo_path, "foo.py"))
+            w.write("a=1")
+            repo.repo.git.add(w.path)
+            repo.repo.git.commit("--no-verify", m="bad")
+            w.delete()
+            w.write("a = 1")
+            repo.repo.git.add(w.path)
+            repo.repo.git.commit(m="fix")
+
+            # the pre-push hook rejects the bad version of the file
+            pipe = Popen(
+                ["git", "push", "origin", "HEAD:master"],
+                cwd=repo.repo_path,
+                stdout=PIPE,
+                stderr=DEVNULL
+            )
+            out, _ = pipe.communicate()
+            self.assertNotEqual(pipe.returncode, 0)
+            self.assertIn(b"foo.py:1:2: E225", out)
+
+            # once the history is fixed, the push goes through
+            repo.repo.git.reset("--soft", "HEAD~1")
+            repo.repo.git.commit("--amend", m="good")
+            pipe = Popen(
+                ["git", "push", "origin", "HEAD:master"],
+                cwd=repo.repo_path,
+                stdout=DEVNULL,
+                stderr=DEVNULL
+            )
+            _ = pipe.communicate()  # noqa
+            self.assertEqual(pipe.returncode, 0)
+
+        except Exception:
+            raise
+
+        finally:
+            tmp.cleanup()
+
 
 class TestUninstall(TestCase):
 
@@ -128,7 +197,7 @@ class TestUninstall(TestCase):
 
             # run the installer
             pipe_inst = Popen(
-                ["python", "install.py", repo.repo_path],
+                ["python", "install.py", "--pre-push", repo.repo_path],
                 stdout=DEVNULL
             )
             _ = pipe_inst.communicate()  # noqa
@@ -160,6 +229,13 @@ class TestUninstall(TestCase):
                 )
             )
 
+            # test that there is no `pre-push` script in .git/hooks/
+            self.assertFalse(
+                path.exists(
+                    path.join(repo.repo_path, ".git", "hooks", "pre-push")
+                )
+            )
+
         except Exception:
             raise
 
@@ -5,9 +5,11 @@ Tests for the `pre_commit.lint` submodule.
 from contextlib import redirect_stdout
 from io import StringIO
 from os import (
+    kill,
     mkdir,
     path
 )
+from time import time
 from unittest import (
     main,
     TestCase
@@ -16,10 +18,13 @@ from unittest import (
 from pre_commit.git import GitHandle
 from pre_commit.lint import Lint
 from pre_commit.linters import (
+    Linter,
     MarkdownLinter,
     PythonLinter,
     RLinter
 )
+from pre_commit.mirror import Mirror
+from pre_commit.patterns import PathMatcher
 from tests.util import (
     BasicRepo,
     Writer
@@ -314,6 +319,452 @@ class TestLint(TestCase):
             w_py_conf.delete()
             repo.delete()
 
+    def test_run_changed_lines_only(self):
+        # test that only the problems on the changed lines of the staged
+        # files are reported
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # commit a bad Python file
+            test_file = path.join(repo.repo_path, "foo.py")
+            w = Writer(test_file)
+            w.write("a=1")
+            w.write("b = 2")
+            repo.repo.git.add(test_file)
+            repo.repo.git.commit("--no-verify", m="test commit")
+
+            # initialize a `Lint` object
+            git_handle = GitHandle(path=repo.repo_path)
+            ell = Lint(
+                git_handle=git_handle,
+                linters=[PythonLinter()],
+                changed_lines_only=True
+            )
+
+            # fixing another line leaves the file clean...
+            w.delete()
+            w.write("a=1")
+            w.write("b = 3")
+            repo.repo.git.add(test_file)
+
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 0)
+            self.assertEqual(f.getvalue(), "")
+
+            # ...but a problem on a changed line is still reported
+            w.delete()
+            w.write("a=1")
+            w.write("b=3")
+            repo.repo.git.add(test_file)
+
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 1)
+            self.assertIn("foo.py:2:2: E225", f.getvalue())
+            self.assertNotIn("foo.py:1:", f.getvalue())
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_with_mirror(self):
+        # test that `run` gives the same results when the staged files are
+        # written to a persistent mirror, also when it is run repeatedly
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage a bad Python file
+            w = Writer(path.join(repo.repo_path, "foof.py"))
+            w.write("a=2")
+            repo.repo.git.add(w.path)
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            # initialize a `Lint` object
+            ell = Lint(
+                git_handle=git_handle,
+                linters=[PythonLinter()],
+                mirror=True
+            )
+
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 1)
+
+            # fix the file and stage it again
+            w.delete()
+            w.write("a = 2")
+            repo.repo.git.add(w.path)
+
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 0)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_skips_unlinted_files(self):
+        # test that only the files that some linter applies to are written
+        # to disk
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage a Python file, an image and a text file whose
+            # name has a space (which is fine, as no linter reads it)
+            writers = []
+            for name in ("foo.py", "image.png", "My Notes.txt"):
+                w = Writer(path.join(repo.repo_path, name))
+                w.write("a = 2")
+                writers.append(w)
+            repo.repo.git.add([w.path for w in writers])
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            # initialize a `Lint` object
+            ell = Lint(
+                git_handle=git_handle,
+                linters=[PythonLinter()],
+                mirror=True
+            )
+
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 0)
+
+            mirror_path = Mirror(git_handle).path
+            self.assertTrue(path.isfile(path.join(mirror_path, "foo.py")))
+            self.assertFalse(path.exists(path.join(mirror_path, "image.png")))
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_with_path_matcher(self):
+        # test that excluded files are not linted, nor checked for forbidden
+        # characters
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage a bad Python file and two vendored ones
+            mkdir(path.join(repo.repo_path, "vendor"))
+            writers = []
+            for name in ("foo.py", "vendor/foo.py", "vendor/a file.py"):
+                w = Writer(path.join(repo.repo_path, name))
+                w.write("a=2")
+                writers.append(w)
+            repo.repo.git.add([w.path for w in writers])
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            # initialize a `Lint` object
+            ell = Lint(
+                git_handle=git_handle,
+                linters=[PythonLinter()],
+                path_matcher=PathMatcher(["vendor/"])
+            )
+
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 1)
+            self.assertTrue(f.getvalue().startswith("foo.py:1:2:"))
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_skips_large_and_generated_files(self):
+        # test that large, generated and binary files are not linted, and
+        # that they are reported in a summary line
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage a bad Python file, a large one, a generated
+            # one and a binary one
+            contents = {
+                "bad.py": "a=2\n",
+                "large.py": "a=2\n" * 1000,
+                "generated.py": "# Code generated by a script. DO NOT EDIT.\n"
+                "a=2\n",
+                "binary.py": "a=2\0"
+            }
+            for name, content in contents.items():
+                w = Writer(path.join(repo.repo_path, name))
+                w.write(content)
+            repo.repo.git.add(list(contents))
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            # lint the files in a temporary directory, then twice from the
+            # mirror
+            for mirror in (False, True, True):
+                ell = Lint(
+                    git_handle=git_handle,
+                    linters=[PythonLinter()],
+                    mirror=mirror,
+                    max_file_size=2048,
+                    skip_generated=True
+                )
+
+                f = StringIO()
+                with redirect_stdout(f):
+                    self.assertEqual(ell.run(), 1)
+                lines = f.getvalue().splitlines()
+                self.assertTrue(lines[0].startswith("bad.py:1:2:"))
+                self.assertEqual(
+                    lines[-4:],
+                    [
+                        "Skipped 3 files: 1 larger than 2 KB, 1 generated, "
+                        "1 binary.",
+                        "  binary.py (binary)",
+                        "  generated.py (generated)",
+                        "  large.py (larger than 2 KB)"
+                    ]
+                )
+
+            # generated files are linted by default, binary files are not
+            ell = Lint(git_handle=git_handle, linters=[PythonLinter()])
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 3)
+            self.assertIn("  binary.py (binary)", f.getvalue().splitlines())
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_with_copies(self):
+        # test that the results of a blob staged at several paths are
+        # reported for each of them
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # stage copies of a bad Python file and of a generated one
+            mkdir(path.join(repo.repo_path, "vendor"))
+            contents = {
+                "foo.py": "a=2",
+                "vendor/foo.py": "a=2",
+                "vendor/bar.py": "a=2",
+                "gen.py": "# @generated\na=2",
+                "vendor/gen.py": "# @generated\na=2"
+            }
+            for name, content in contents.items():
+                w = Writer(path.join(repo.repo_path, name))
+                w.write(content)
+            repo.repo.git.add(list(contents))
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            for mirror in (False, True):
+                ell = Lint(
+                    git_handle=git_handle,
+                    linters=[PythonLinter()],
+                    mirror=mirror,
+                    skip_generated=True
+                )
+
+                f = StringIO()
+                with redirect_stdout(f):
+                    self.assertEqual(ell.run(), 3)
+                lines = [line for line in f.getvalue().splitlines() if line]
+                self.assertEqual(
+                    [line.split(":")[0] for line in lines[:-3]],
+                    ["foo.py", "vendor/bar.py", "vendor/foo.py"]
+                )
+                self.assertEqual(
+                    lines[-3:],
+                    [
+                        "Skipped 2 files: 2 generated.",
+                        "  gen.py (generated)",
+                        "  vendor/gen.py (generated)"
+                    ]
+                )
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_with_copies_and_per_file_ignores(self):
+        # test that copies of a blob are linted separately if the
+        # configuration may treat their paths differently
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # stage the same file with an unused import at two paths, one of
+            # which ignores it
+            for directory in ("src", "tests"):
+                mkdir(path.join(repo.repo_path, directory))
+                w = Writer(path.join(repo.repo_path, directory, "a.py"))
+                w.write("import os")
+            repo.repo.git.add(["src/a.py", "tests/a.py"])
+
+            w_py_conf = Writer(path.join(repo.repo_path, ".flake8"))
+            w_py_conf.write("[flake8]")
+            w_py_conf.write("per-file-ignores = tests/*: F401")
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            for mirror in (False, True):
+                ell = Lint(
+                    git_handle=git_handle,
+                    linters=[PythonLinter(config_path=w_py_conf.path)],
+                    mirror=mirror
+                )
+
+                f = StringIO()
+                with redirect_stdout(f):
+                    self.assertEqual(ell.run(), 1)
+                self.assertEqual(
+                    [
+                        line.split(":")[0]
+                        for line in f.getvalue().splitlines() if line
+                    ],
+                    ["src/a.py"]
+                )
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_parallel(self):
+        # test that running linters concurrently gives the same results, in
+        # the same order, as running them one at a time
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage a few bad Python files
+            writers = []
+            for i in range(8):
+                w = Writer(path.join(repo.repo_path, "foo%d.py" % i))
+                w.write("a=%d" % i)
+                writers.append(w)
+            repo.repo.git.add([w.path for w in writers])
+
+            # initialize a `GitHandle`
+            git_handle = GitHandle(path=repo.repo_path)
+
+            outputs = []
+            for jobs in (1, 4):
+                ell = Lint(
+                    git_handle=git_handle,
+                    linters=[PythonLinter()],
+                    jobs=jobs
+                )
+
+                f = StringIO()
+                with redirect_stdout(f):
+                    self.assertEqual(ell.run(), 8)
+                outputs.append(f.getvalue())
+
+            self.assertEqual(outputs[0], outputs[1])
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
+    def test_run_fail_fast(self):
+        # test that linting stops at the first file with problems, killing
+        # the linters that are still running
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # the slow linters record their process id
+            pid_log = path.join(repo.repo_path, "pids")
+
+            class SlowLinter(Linter):
+
+                def __init__(self):
+                    super().__init__(".txt")
+
+                def linter_command(self, f):
+                    if f == "bad.txt":
+                        return ["echo", "%s:1: bad" % f]
+                    return [
+                        "sh", "-c", "echo $$ >> %s; exec sleep 30" % pid_log
+                    ]
+
+            # stage a bad file and a few slow ones
+            writers = []
+            for name in ("bad", "slow1", "slow2", "slow3", "slow4", "slow5"):
+                w = Writer(path.join(repo.repo_path, "%s.txt" % name))
+                w.write(name)
+                writers.append(w)
+            repo.repo.git.add([w.path for w in writers])
+
+            # initialize a `Lint` object
+            git_handle = GitHandle(path=repo.repo_path)
+            ell = Lint(
+                git_handle=git_handle,
+                linters=[SlowLinter()],
+                jobs=2,
+                fail_fast=True
+            )
+
+            start = time()
+            f = StringIO()
+            with redirect_stdout(f):
+                self.assertEqual(ell.run(), 1)
+            self.assertLess(time() - start, 10)
+            self.assertEqual(f.getvalue(), "bad.txt:1: bad\n\n")
+
+            # the queued files were skipped (but the file that took the place
+            # of the bad one may have started), and the running linters were
+            # killed
+            pids = []
+            if path.exists(pid_log):
+                with open(pid_log) as pid_file:
+                    pids = [int(pid) for pid in pid_file.read().split()]
+            self.assertLessEqual(len(pids), 2)
+            for pid in pids:
+                with self.assertRaises(ProcessLookupError):
+                    kill(pid, 0)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            repo.delete()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the `lint_all.py` script.
+"""
+import json
+from os import path
+from subprocess import (
+    PIPE,
+    Popen
+)
+from unittest import (
+    main,
+    TestCase
+)
+
+from tests.util import (
+    BasicRepo,
+    Writer
+)
+
+
+class TestLintAll(TestCase):
+
+    def test_lint_all(self):
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # commit a few bad Python files...
+            writers = []
+            for i in range(6):
+                w = Writer(path.join(repo.repo_path, "foo%d.py" % i))
+                w.write("a=%d" % i)
+                writers.append(w)
+            repo.repo.git.add([w.path for w in writers])
+            repo.repo.git.commit(m="test commit")
+
+            # ...and fix one of them in the index only
+            writers[0].delete()
+            writers[0].write("a = 0")
+            repo.repo.git.add(writers[0].path)
+
+            def lint_all(*args):
+                pipe = Popen(
+                    ["python", "lint_all.py", "-p", repo.repo_path] +
+                    list(args),
+                    stdout=PIPE,
+                    stderr=PIPE
+                )
+                out, err = pipe.communicate()
+                return pipe.returncode, [
+                    line.split(":")[0] for line in out.decode().splitlines()
+                    if line
+                ]
+
+            # all of the files in the index
+            returncode, files = lint_all()
+            self.assertEqual(returncode, 1)
+            self.assertEqual(files, ["foo%d.py" % i for i in range(1, 6)])
+
+            # all of the files in the last commit
+            returncode, files = lint_all("--revision", "HEAD")
+            self.assertEqual(files, ["foo%d.py" % i for i in range(6)])
+
+            # two shards split the files
+            sharded_files = []
+            for shard in ("1/2", "2/2"):
+                returncode, files = lint_all(
+                    "--revision", "HEAD", "--shard", shard
+                )
+                sharded_files += files
+            self.assertEqual(
+                sorted(sharded_files), ["foo%d.py" % i for i in range(6)]
+            )
+
+            # a report of the problems
+            report_path = path.join(repo.repo_path, "report.jsonl")
+            returncode, files = lint_all(
+                "--report", "jsonl", "--report-file", report_path
+            )
+            with open(report_path) as report_file:
+                self.assertEqual(
+                    [
+                        json.loads(line)["path"]
+                        for line in report_file.read().splitlines()
+                    ],
+                    ["foo%d.py" % i for i in range(1, 6)]
+                )
+
+            # only the files changed between two revisions: the fixed file
+            # is clean, and the new file is linted as of the last commit
+            repo.repo.git.commit(m="fix")
+            w = Writer(path.join(repo.repo_path, "bar.py"))
+            w.write("b=1")
+            repo.repo.git.add(w.path)
+            repo.repo.git.commit(m="new file")
+            w.delete()
+            w.write("b = 1")
+            repo.repo.git.add(w.path)
+
+            returncode, files = lint_all("--range", "HEAD~2..HEAD~1")
+            self.assertEqual(returncode, 0)
+            self.assertEqual(files, [])
+
+            returncode, files = lint_all("--range", "HEAD~2..HEAD")
+            self.assertEqual(returncode, 1)
+            self.assertEqual(files, ["bar.py"])
+
+            # files excluded by the `.style` file, for all linters or for
+            # flake8 only
+            with open(path.join(repo.repo_path, ".style"), "w") as style:
+                style.write(
+                    "[paths]\nexclude =\n    foo[1-3].py\n"
+                    "include =\n    foo3.py\n"
+                    "[paths.python]\nexclude = foo5.py\n"
+                )
+            returncode, files = lint_all("--revision", "HEAD")
+            self.assertEqual(returncode, 1)
+            self.assertEqual(files, ["bar.py", "foo3.py", "foo4.py"])
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+
+if __name__ == "__main__":
+    main()
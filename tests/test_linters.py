@@ -6,17 +6,29 @@ from contextlib import redirect_stdout
 from io import StringIO
 from os import (
     getcwd,
+    mkdir,
     path
 )
+from subprocess import (
+    PIPE,
+    Popen
+)
+from tempfile import TemporaryDirectory
 from unittest import (
     main,
     TestCase
 )
 
+from pre_commit.cache import ResultCache
+from pre_commit.diagnostics import Diagnostic
 from pre_commit.linters import (
+    chunk_paths,
+    Linter,
+    LinterIndex,
     MarkdownLinter,
     PythonLinter,
-    RLinter
+    RLinter,
+    split_output
 )
 
 from tests.util import Writer
@@ -189,6 +201,66 @@ class TestPythonLinter(TestCase):
             w_conf.delete()
             w.delete()
 
+    def test_in_process(self):
+        try:
+            # write the `.flake8` config file instructing to except "E225"
+            config_file_path = path.join(self.cwd, ".flake8")
+            w_conf = Writer(config_file_path)
+            w_conf.write("[flake8]")
+            w_conf.write("ignore = E225")
+
+            # write a few python files
+            writers = []
+            for name, content in (
+                ("test.py", "foo=1"),
+                ("test1.py", "import os"),
+                ("test2.py", "def f( x ):\n  return x")
+            ):
+                w = Writer(path.join(self.cwd, name))
+                w.write(content)
+                writers.append(w)
+
+            # lint them with and without a new process
+            outputs = []
+            return_values = []
+            for in_process in (False, True):
+                f = StringIO()
+                with redirect_stdout(f):
+                    return_values.append(
+                        PythonLinter(
+                            config_path=w_conf.path, in_process=in_process
+                        ).lint([w.path for w in writers])
+                    )
+                outputs.append(f.getvalue())
+
+            self.assertEqual(return_values, [2, 2])
+            self.assertEqual(outputs[0], outputs[1])
+
+            # flake8 runs as many jobs as the plan
+            linter = PythonLinter(config_path=w_conf.path, in_process=True)
+            with redirect_stdout(StringIO()):
+                linter.lint([w.path for w in writers], jobs=2)
+            self.assertEqual(linter._get_application().options.jobs.n_jobs, 2)
+
+            # the linter falls back to the flake8 command if the API of
+            # flake8 fails
+            linter._application = object()
+            f = StringIO()
+            with redirect_stdout(f):
+                return_value = linter.lint([w.path for w in writers])
+            self.assertEqual(return_value, 2)
+            self.assertEqual(f.getvalue(), outputs[0])
+            self.assertFalse(linter.in_process)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            w_conf.delete()
+            for w in writers:
+                w.delete()
+
 
 class TestRLinter(TestCase):
 
@@ -274,5 +346,364 @@ class TestRLinter(TestCase):
             w.delete()
 
 
+class TestBatch(TestCase):
+
+    cwd = getcwd()
+
+    def test_chunk_paths(self):
+        # each path takes 4 + 1 + 8 = 13 bytes
+        self.assertEqual(
+            chunk_paths(["a.py", "b.py", "c.py", "d.py", "e.py"], 30),
+            [["a.py", "b.py"], ["c.py", "d.py"], ["e.py"]]
+        )
+        self.assertEqual(chunk_paths([], 30), [])
+
+        # a maximum number of paths per chunk
+        self.assertEqual(
+            chunk_paths(["a.py", "b.py", "c.py"], 1000, 2),
+            [["a.py", "b.py"], ["c.py"]]
+        )
+
+    def test_split_output(self):
+        out = (
+            "a.py:1:2: E225 missing whitespace around operator\n"
+            "a.py.py:1:1: F401 'os' imported but unused\n"
+            "sub/b.R:1:2: style: Use <-, not =, for assignment.\n"
+            "a=1\n"
+            " ^\n"
+        )
+        self.assertEqual(
+            split_output(out, ["a.py", "a.py.py", "c.py", "sub/b.R"]),
+            {
+                "a.py": "a.py:1:2: E225 missing whitespace around operator\n",
+                "a.py.py": "a.py.py:1:1: F401 'os' imported but unused\n",
+                "c.py": "",
+                "sub/b.R": (
+                    "sub/b.R:1:2: style: Use <-, not =, for assignment.\n"
+                    "a=1\n"
+                    " ^\n"
+                )
+            }
+        )
+
+    def test_split_r_output(self):
+        # the output of each file ends with a delimiter line, and R stopped
+        # before the last file
+        out = (
+            "a.R\t1\t2\tassignment_linter\tstyle\t"
+            "Use <-, not =, for assignment.\n"
+            "\x1e\n"
+            "\x1e\n"
+        ).encode('utf-8')
+        self.assertEqual(
+            RLinter()._get_results(["a.R", "b.R", "c.R"], 0, out),
+            {
+                "a.R": (1, [
+                    Diagnostic("a.R", 1, 2, "assignment_linter",
+                               "Use <-, not =, for assignment.", "style")
+                ]),
+                "b.R": (0, []),
+                "c.R": (0, [])
+            }
+        )
+
+    def test_batch_lint(self):
+        try:
+            # write two bad python files and a good one
+            writers = []
+            for name, content in (
+                ("test.py", "foo=1"),
+                ("test1.py", "bar = 1"),
+                ("test2.py", "import os")
+            ):
+                w = Writer(path.join(self.cwd, name))
+                w.write(content)
+                writers.append(w)
+
+            # lint them with a single process
+            f = StringIO()
+            linter = CountingPythonLinter()
+            with redirect_stdout(f):
+                return_value = linter.lint([w.path for w in writers])
+
+            self.assertEqual(return_value, 2)
+            self.assertEqual(linter.runs, 1)
+
+            # the output is still printed file by file
+            self.assertEqual(
+                [line.split(":")[0] for line in f.getvalue().split()
+                 if line.startswith(self.cwd)],
+                [writers[0].path, writers[2].path]
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            for w in writers:
+                w.delete()
+
+
+class TestLinterIndex(TestCase):
+    """
+    Tests for the `LinterIndex` class.
+    """
+
+    def test_get_linters(self):
+        python_linter = PythonLinter()
+        r_linter = RLinter()
+        archive_linter = Linter((".tar.gz", "Makefile"))
+        index = LinterIndex([python_linter, r_linter, archive_linter])
+
+        self.assertEqual(index.get_linters("a/foo.py"), [python_linter])
+        self.assertEqual(index.get_linters("foo.R"), [r_linter])
+        self.assertEqual(index.get_linters("foo.r"), [r_linter])
+        self.assertEqual(index.get_linters("a.b/foo.tar.gz"), [archive_linter])
+        self.assertEqual(index.get_linters("a/Makefile"), [archive_linter])
+        self.assertEqual(index.get_linters("foo.gz"), [])
+        self.assertEqual(index.get_linters("foo.py.png"), [])
+        self.assertEqual(index.get_linters("py"), [])
+
+        self.assertEqual(
+            index.classify(["foo.png", "b.py", "a.py", "c.R"]),
+            [["a.py", "b.py"], ["c.R"], []]
+        )
+
+
+class LegacyPythonLinter(Linter):
+    """
+    A wrapper for "flake8" that only implements `linter_process()`.
+    """
+
+    def __init__(self, config_path=""):
+        super().__init__(".py", config_path)
+
+    def linter_process(self, f):
+        return Popen(["flake8", f], stdout=PIPE, stderr=PIPE)
+
+
+class TestLegacyLinter(TestCase):
+
+    cwd = getcwd()
+
+    def test_linter_process(self):
+        try:
+            # write a bad and a good python file
+            w = Writer(path.join(self.cwd, "test.py"))
+            w.write("foo=1")
+            w1 = Writer(path.join(self.cwd, "test1.py"))
+            w1.write("foo = 1")
+
+            f = StringIO()
+            with redirect_stdout(f):
+                return_value = (
+                    LegacyPythonLinter().lint([w.path, w1.path], jobs=2)
+                )
+
+            self.assertEqual(return_value, 1)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            w.delete()
+            w1.delete()
+
+
+class CountingPythonLinter(PythonLinter):
+    """
+    A `PythonLinter` that counts how many times the linter is run.
+    """
+
+    def __init__(self, config_path=""):
+        super().__init__(config_path)
+        self.runs = 0
+
+    def batch_command(self, files):
+        self.runs += 1
+        return super().batch_command(files)
+
+
+class EchoLinter(Linter):
+    """
+    A linter that reports a problem in each file, and records the files it
+    is run on.
+    """
+
+    def __init__(self):
+        super().__init__(".txt")
+        self.linted = []
+
+    def linter_command(self, f):
+        self.linted.append(f)
+        return ["echo", "%s:1: bad" % f]
+
+
+class VersionLinter(EchoLinter):
+    """
+    An `EchoLinter` with a version, which counts how many times its version
+    is looked up.
+    """
+
+    version_command = ["echo", "1.0"]
+
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+        self.lookups = 0
+
+    def _look_up_version(self):
+        self.lookups += 1
+        version, paths = super()._look_up_version()
+        return version, self.paths
+
+
+class TestLinterCopies(TestCase):
+
+    def test_copies(self):
+        blobs = {
+            "a/x.txt": "sha",
+            "b/x.txt": "sha",
+            "c.txt": "sha",
+            "d.txt": "sha1"
+        }
+
+        # a single file per blob is linted
+        linter = EchoLinter()
+        plan = linter.plan(sorted(blobs), blobs)
+        self.assertEqual(plan.batches, [["a/x.txt"], ["d.txt"]])
+        self.assertEqual(plan.copies, {"a/x.txt": ["b/x.txt", "c.txt"]})
+
+        # the results are copied to the other files, with their paths
+        f = StringIO()
+        with redirect_stdout(f):
+            self.assertEqual(linter.lint(sorted(blobs), blobs), 4)
+        self.assertEqual(linter.linted, ["a/x.txt", "d.txt"])
+        self.assertEqual(
+            f.getvalue().splitlines(),
+            [
+                "a/x.txt:1: bad", "", "b/x.txt:1: bad", "", "c.txt:1: bad",
+                "", "d.txt:1: bad", ""
+            ]
+        )
+
+        # without blobs, all files are linted
+        linter = EchoLinter()
+        with redirect_stdout(f):
+            self.assertEqual(linter.lint(sorted(blobs)), 4)
+        self.assertEqual(linter.linted, sorted(blobs))
+
+
+class TestLinterCache(TestCase):
+
+    cwd = getcwd()
+
+    def test_cache(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(path.join(tmp.name, "cache.sqlite"))
+
+            # write a bad python file
+            file_path = path.join(self.cwd, "test.py")
+            w = Writer(file_path)
+            w.write("# No space around =")
+            w.write("foo=1")
+
+            f = StringIO()
+            with redirect_stdout(f):
+                # the first time, the linter runs and the result is cached
+                linter = CountingPythonLinter()
+                return_value = linter.lint([w.path], {w.path: "sha"}, cache)
+                self.assertEqual(return_value, 1)
+                self.assertEqual(linter.runs, 1)
+
+                # the second time, the result comes from the cache
+                linter = CountingPythonLinter()
+                return_value = linter.lint([w.path], {w.path: "sha"}, cache)
+                self.assertEqual(return_value, 1)
+                self.assertEqual(linter.runs, 0)
+
+                # a different blob is linted again
+                return_value = linter.lint([w.path], {w.path: "sha1"}, cache)
+                self.assertEqual(linter.runs, 1)
+
+            self.assertEqual(cache.get_stats()["hits"], 1)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            w.delete()
+            cache.close()
+            tmp.cleanup()
+
+    def test_version(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(path.join(tmp.name, "cache.sqlite"))
+            plugins_dir = path.join(tmp.name, "plugins")
+            mkdir(plugins_dir)
+
+            # the version is looked up once...
+            linter = VersionLinter([plugins_dir])
+            self.assertEqual(linter._get_version(cache), "1.0")
+            self.assertEqual(linter.lookups, 1)
+
+            # ...and then read from the cache
+            linter = VersionLinter([plugins_dir])
+            self.assertEqual(linter._get_version(cache), "1.0")
+            self.assertEqual(linter.lookups, 0)
+
+            # until the paths of the linter change (e.g. a plugin is
+            # installed)
+            mkdir(path.join(plugins_dir, "plugin"))
+            linter = VersionLinter([plugins_dir])
+            self.assertEqual(linter._get_version(cache), "1.0")
+            self.assertEqual(linter.lookups, 1)
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            cache.close()
+            tmp.cleanup()
+
+    def test_path_scoped_cache_key(self):
+        try:
+            tmp = TemporaryDirectory()
+            cache = ResultCache(path.join(tmp.name, "cache.sqlite"))
+
+            # without path-scoped options, a blob has the same key at any
+            # path
+            config = Writer(path.join(tmp.name, ".flake8"))
+            config.write("[flake8]")
+            config.write("max-line-length = 100")
+            linter = PythonLinter(config.path)
+            self.assertEqual(
+                linter._get_cache_key("sha", cache, "src/a.py"),
+                linter._get_cache_key("sha", cache, "tests/a.py")
+            )
+
+            # with per-file-ignores, the path is part of the key
+            config.write("per-file-ignores = tests/*: F401")
+            linter = PythonLinter(config.path)
+            self.assertNotEqual(
+                linter._get_cache_key("sha", cache, "src/a.py"),
+                linter._get_cache_key("sha", cache, "tests/a.py")
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            # clean up
+            cache.close()
+            tmp.cleanup()
+
+
 if __name__ == "__main__":
     main()
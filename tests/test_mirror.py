@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.mirror` submodule.
+"""
+import asyncio
+from os import (
+    mkdir,
+    path,
+    stat
+)
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.git import GitHandle
+from pre_commit.mirror import Mirror
+
+from tests.util import (
+    BasicRepo,
+    Writer
+)
+
+
+def sync(mirror, blobs):
+    """
+    Updates a mirror so that it contains exactly the given blobs, the way
+    `Lint.run()` does, and returns the relative paths of its files.
+    """
+    asyncio.run(mirror.git_handle.write_blobs_async(
+        mirror.prepare(blobs), mirror.path
+    ))
+    mirror.save(blobs)
+
+    return sorted(blobs)
+
+
+class TestMirror(TestCase):
+
+    def test_sync(self):
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+
+            # write and stage two files, one of which in a subdirectory
+            w = Writer(path.join(repo.repo_path, "foo.py"))
+            w.write("foo = 1")
+
+            mkdir(path.join(repo.repo_path, "subdir"))
+            w1 = Writer(path.join(repo.repo_path, "subdir", "bar.py"))
+            w1.write("bar = 1")
+
+            repo.repo.git.add([w.path, w1.path])
+
+            # initialize a `GitHandle` and a `Mirror`
+            git_handle = GitHandle(path=repo.repo_path)
+            mirror = Mirror(git_handle)
+
+            # the mirror lives in the git directory
+            self.assertEqual(
+                path.abspath(mirror.path),
+                path.abspath(
+                    path.join(repo.repo_path, ".git", "style", "mirror")
+                )
+            )
+
+            # first sync: everything is written
+            files = sync(mirror, git_handle.get_staged_files_blobs())
+            self.assertEqual(files, ["foo.py", path.join("subdir", "bar.py")])
+            with open(path.join(mirror.path, "foo.py")) as foo:
+                self.assertEqual(foo.read(), "foo = 1\n")
+
+            # edit and restage one of the files, unstage the other one
+            w.write("foo = 2")
+            repo.repo.git.add(w.path)
+            repo.repo.git.rm("--cached", w1.path)
+
+            # second sync: the edited file is rewritten and the unstaged one
+            # is removed, together with its (now empty) directory
+            files = sync(mirror, git_handle.get_staged_files_blobs())
+            self.assertEqual(files, ["foo.py"])
+            with open(path.join(mirror.path, "foo.py")) as foo:
+                self.assertEqual(foo.read(), "foo = 1\nfoo = 2\n")
+            self.assertFalse(path.exists(path.join(mirror.path, "subdir")))
+
+            # third sync: nothing changed, so nothing is rewritten
+            foo_mtime = stat(path.join(mirror.path, "foo.py")).st_mtime_ns
+            sync(mirror, git_handle.get_staged_files_blobs())
+            self.assertEqual(
+                stat(path.join(mirror.path, "foo.py")).st_mtime_ns,
+                foo_mtime
+            )
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.patterns` submodule.
+"""
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.patterns import PathMatcher
+
+
+class TestPathMatcher(TestCase):
+
+    def assertExcluded(self, patterns, paths, excluded):
+        path_matcher = PathMatcher(patterns)
+        self.assertEqual(
+            [pth for pth in paths if path_matcher.excludes(pth)], excluded
+        )
+
+    def test_patterns(self):
+        paths = [
+            "setup.py",
+            "app/setup.py",
+            "app/foo_pb2.py",
+            "foo_pb2.py",
+            "vendor/lib/foo.py",
+            "app/vendor/foo.py",
+            "vendor.py",
+            "app/migrations/0001_initial.py",
+            "docs/a/b/README.md"
+        ]
+
+        # patterns without a "/" apply at any depth
+        self.assertExcluded(
+            ["*_pb2.py"], paths, ["app/foo_pb2.py", "foo_pb2.py"]
+        )
+        self.assertExcluded(
+            ["setup.py"], paths, ["setup.py", "app/setup.py"]
+        )
+
+        # other patterns are relative to the root
+        self.assertExcluded(["/setup.py"], paths, ["setup.py"])
+        self.assertExcluded(
+            ["app/migrations"], paths, ["app/migrations/0001_initial.py"]
+        )
+
+        # directories
+        self.assertExcluded(
+            ["vendor/"], paths, ["vendor/lib/foo.py", "app/vendor/foo.py"]
+        )
+        self.assertExcluded(["/vendor/"], paths, ["vendor/lib/foo.py"])
+
+        # wildcards
+        self.assertExcluded(
+            ["*/migrations/"], paths, ["app/migrations/0001_initial.py"]
+        )
+        self.assertExcluded(["docs/**/*.md"], paths, ["docs/a/b/README.md"])
+        self.assertExcluded(["docs/*.md"], paths, [])
+        self.assertExcluded(["vendor.p[xy]"], paths, ["vendor.py"])
+        self.assertExcluded(["vendor.p[!y]"], paths, [])
+        self.assertExcluded(["?endor.py"], paths, ["vendor.py"])
+
+        # the last matching pattern wins
+        self.assertExcluded(
+            ["vendor/", "!vendor/lib/", "*.py"],
+            paths,
+            [pth for pth in paths if pth.endswith(".py")]
+        )
+        self.assertExcluded(
+            ["*.py", "!vendor/lib/"], paths,
+            [
+                pth for pth in paths
+                if pth.endswith(".py") and pth != "vendor/lib/foo.py"
+            ]
+        )
+
+    def test_comments(self):
+        path_matcher = PathMatcher(["", "# a comment", "  "])
+        self.assertFalse(path_matcher)
+        self.assertFalse(path_matcher.excludes("# a comment"))
+
+        self.assertTrue(PathMatcher(["\\#foo"]).excludes("#foo"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.reports` submodule.
+"""
+import json
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import (
+    main,
+    TestCase
+)
+from xml.etree import ElementTree
+
+from pre_commit.diagnostics import Diagnostic
+from pre_commit.reports import (
+    get_default_report_path,
+    open_report
+)
+
+
+# the diagnostics of two linters
+DIAGNOSTICS = [
+    ("flake8", "a.py", [
+        Diagnostic("a.py", 1, 2, "E225", "missing whitespace", "error"),
+        Diagnostic("a.py", 2, 1, "W391", "blank line at end of file",
+                   "warning")
+    ]),
+    ("flake8", "b.py", []),
+    ("lintr", "c.R", [
+        Diagnostic("c.R", None, None, "", "Error <in> lint", "error")
+    ])
+]
+
+
+class TestReports(TestCase):
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_report(self, report_format):
+        report_path = path.join(self.tmp.name, "sub", "report")
+        writer = open_report(report_format, report_path)
+        for linter_name, pth, diagnostics in DIAGNOSTICS:
+            writer.write(linter_name, pth, diagnostics)
+        writer.close()
+
+        with open(report_path) as report_file:
+            return report_file.read()
+
+    def test_jsonl(self):
+        records = [
+            json.loads(line)
+            for line in self.write_report("jsonl").splitlines()
+        ]
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(
+            records[0],
+            {
+                "linter": "flake8", "path": "a.py", "line": 1, "column": 2,
+                "code": "E225", "message": "missing whitespace",
+                "severity": "error"
+            }
+        )
+        self.assertEqual(records[2]["line"], None)
+
+    def test_sarif(self):
+        log = json.loads(self.write_report("sarif"))
+
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertEqual(
+            [run["tool"]["driver"]["name"] for run in log["runs"]],
+            ["flake8", "lintr"]
+        )
+
+        results = log["runs"][0]["results"]
+        self.assertEqual(
+            [(result["ruleId"], result["level"]) for result in results],
+            [("E225", "error"), ("W391", "warning")]
+        )
+        self.assertEqual(
+            results[0]["locations"][0]["physicalLocation"]["region"],
+            {"startLine": 1, "startColumn": 2}
+        )
+        self.assertNotIn(
+            "region",
+            log["runs"][1]["results"][0]["locations"][0]["physicalLocation"]
+        )
+
+    def test_sarif_without_results(self):
+        report_path = path.join(self.tmp.name, "report")
+        open_report("sarif", report_path).close()
+
+        with open(report_path) as report_file:
+            self.assertEqual(json.load(report_file)["runs"], [])
+
+    def test_junit(self):
+        root = ElementTree.fromstring(self.write_report("junit"))
+
+        self.assertEqual(
+            [suite.get("name") for suite in root],
+            ["flake8", "lintr"]
+        )
+        self.assertEqual(
+            [
+                (case.get("name"), case.find("failure") is not None)
+                for case in root.iter("testcase")
+            ],
+            [("a.py", True), ("b.py", False), ("c.R", True)]
+        )
+        self.assertEqual(
+            list(root.iter("failure"))[1].text, "Error <in> lint\n"
+        )
+
+    def test_get_default_report_path(self):
+        self.assertEqual(
+            get_default_report_path("/repo/.git", "junit"),
+            "/repo/.git/style/report.xml"
+        )
+
+
+if __name__ == "__main__":
+    main()
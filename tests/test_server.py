@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.server` and `pre_commit.client` submodules.
+"""
+from os import (
+    environ,
+    path
+)
+from tempfile import TemporaryDirectory
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.cache import (
+    get_default_cache_path,
+    ResultCache
+)
+from pre_commit.client import LintClient
+from pre_commit.diff import LineIndex
+from pre_commit.git import GitHandle
+from pre_commit.server import LintServer
+
+from tests.util import (
+    BasicRepo,
+    Writer
+)
+
+
+class TestLintServer(TestCase):
+
+    def setUp(self):
+        # keep the sockets of the tests apart
+        self.tmp = TemporaryDirectory()
+        self.runtime_dir = environ.get("XDG_RUNTIME_DIR")
+        environ["XDG_RUNTIME_DIR"] = self.tmp.name
+
+        # initialize repo with a bad Python file and a config file that only
+        # enables the Python linter
+        self.repo = BasicRepo(bare=False)
+
+        w = Writer(path.join(self.repo.repo_path, "foo.py"))
+        w.write("a=1")
+        self.repo.repo.git.add(w.path)
+
+        self.conf_file_path = path.join(self.tmp.name, "linters.conf")
+        w = Writer(self.conf_file_path)
+        w.write("[linters]\nmarkdown = False\npython = True\nr = False")
+
+        self.git_handle = GitHandle(path=self.repo.repo_path)
+        self.blobs = self.git_handle.get_staged_files_blobs()
+
+    def tearDown(self):
+        if self.runtime_dir is None:
+            del environ["XDG_RUNTIME_DIR"]
+        else:
+            environ["XDG_RUNTIME_DIR"] = self.runtime_dir
+        self.repo.delete()
+        self.tmp.cleanup()
+
+    def test_handle(self):
+        server = LintServer()
+        request = {
+            "root": self.repo.repo_path,
+            "conf_file_path": self.conf_file_path,
+            "blobs": self.blobs
+        }
+
+        response = server.handle(request)
+        self.assertEqual(response["status"], 1)
+        self.assertTrue(response["output"].startswith("foo.py:1:2: E225"))
+
+        # the linters are kept, and the result is now in memory
+        linters = server._get_linters(self.repo.repo_path, self.conf_file_path)
+        self.assertEqual(server.handle(request), response)
+        self.assertEqual(server.cache.get_stats()["hits"], 1)
+        self.assertIs(
+            server._get_linters(self.repo.repo_path, self.conf_file_path),
+            linters
+        )
+
+    def test_disk_cache(self):
+        server = LintServer()
+
+        conf_file_path = path.join(self.tmp.name, "cache.conf")
+        w = Writer(conf_file_path)
+        w.write("[linters]\nmarkdown = False\npython = True\nr = False")
+        w.write("[options]\ncache = True")
+
+        request = {
+            "root": self.repo.repo_path,
+            "conf_file_path": conf_file_path,
+            "blobs": self.blobs
+        }
+
+        # the result is recorded in the cache of the repository, where the
+        # hook and the watcher find it too, and not in memory
+        response = server.handle(request)
+        self.assertEqual(server.handle(request), response)
+        self.assertEqual(server.cache.get_stats()["entries"], 0)
+
+        cache = ResultCache(
+            get_default_cache_path(self.git_handle.get_git_dir())
+        )
+        try:
+            stats = cache.get_stats()
+            self.assertEqual((stats["entries"], stats["hits"]), (1, 1))
+        finally:
+            cache.close()
+
+    def test_changed_lines(self):
+        client = LintClient(idle_timeout=1)
+
+        conf_file_path = path.join(self.tmp.name, "changed_lines.conf")
+        w = Writer(conf_file_path)
+        w.write("[linters]\nmarkdown = False\npython = True\nr = False")
+        w.write("[options]\nchanged_lines_only = True")
+
+        # only the problems on the changed lines sent by the client are
+        # reported
+        status, output = client.lint(
+            self.repo.repo_path, conf_file_path, self.blobs,
+            {"foo.py": LineIndex([(2, 3)])}
+        )
+        self.assertEqual((status, output), (0, ""))
+
+        status, output = client.lint(
+            self.repo.repo_path, conf_file_path, self.blobs,
+            {"foo.py": LineIndex([(1, 1)])}
+        )
+        self.assertEqual(status, 1)
+        self.assertTrue(output.startswith("foo.py:1:2: E225"))
+
+    def test_client(self):
+        client = LintClient(idle_timeout=1)
+
+        # the first request starts the server
+        status, output = client.lint(
+            self.repo.repo_path, self.conf_file_path, self.blobs
+        )
+        self.assertEqual(status, 1)
+        self.assertTrue(output.startswith("foo.py:1:2: E225"))
+
+        # the hook falls back to linting in process if the server fails
+        # (here because the root is not a git repository)
+        self.assertIsNone(
+            client.lint(self.tmp.name, self.conf_file_path, self.blobs)
+        )
+
+
+if __name__ == "__main__":
+    main()
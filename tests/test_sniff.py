@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.sniff` submodule.
+"""
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.sniff import (
+    format_skipped,
+    get_skip_reason,
+    MARKER_LINES
+)
+
+
+class TestSniff(TestCase):
+
+    def test_get_skip_reason(self):
+        self.assertIsNone(get_skip_reason(b"a = 1\n"))
+        self.assertIsNone(get_skip_reason(b""))
+
+        # binary content
+        self.assertEqual(get_skip_reason(b"\x89PNG\r\n\x1a\n\0\0"), "binary")
+        self.assertEqual(
+            get_skip_reason(b"\x89PNG\r\n\x1a\n\0\0", True), "binary"
+        )
+
+        # markers of generated code
+        for head in (
+            b"// Code generated by protoc-gen-go. DO NOT EDIT.\n",
+            b'"""\n@generated by a script\n"""\n',
+            b"# Generated by Django 3.2 on 2021-01-01 00:00\n",
+            b"# -*- coding: utf-8 -*-\n"
+            b"# Generated by the protocol buffer compiler.  DO NOT EDIT!\n"
+        ):
+            self.assertEqual(get_skip_reason(head, True), "generated")
+            # generated files are only skipped on demand
+            self.assertIsNone(get_skip_reason(head))
+
+        # phrases that hand-written files use too
+        for head in (
+            b"# Assigns auto-generated IDs to the records\n",
+            b"# Please DO NOT EDIT the constants below by hand\n",
+            b"Release notes, automatically generated from PR titles.\n",
+            b"-- This file is auto-generated\n",
+            b'print("Code generated by foo. DO NOT EDIT.")\n'
+        ):
+            self.assertIsNone(get_skip_reason(head, True))
+
+        # markers are only looked for near the top
+        self.assertIsNone(get_skip_reason(
+            b"\n" * MARKER_LINES + b"// Code generated by foo. DO NOT EDIT.\n",
+            True
+        ))
+
+    def test_format_skipped(self):
+        self.assertEqual(format_skipped({}), "")
+        self.assertEqual(
+            format_skipped({"a.py": "binary"}),
+            "Skipped 1 file: 1 binary.\n  a.py (binary)"
+        )
+        self.assertEqual(
+            format_skipped(
+                {
+                    "a.py": "generated",
+                    "b.sql": "large",
+                    "c.py": "generated"
+                },
+                max_file_size=1024 * 1024
+            ),
+            "Skipped 3 files: 1 larger than 1024 KB, 2 generated.\n"
+            "  a.py (generated)\n"
+            "  b.sql (larger than 1024 KB)\n"
+            "  c.py (generated)"
+        )
+
+
+if __name__ == "__main__":
+    main()
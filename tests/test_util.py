@@ -17,7 +17,9 @@ from unittest import (
 from pre_commit.util import (
     get_config,
     get_linter_config,
-    exec_in_dir
+    exec_in_dir,
+    in_shard,
+    split_versions
 )
 
 
@@ -96,6 +98,16 @@ class TestGetConfig(TestCase):
                 "bar"
             )
 
+            # test fallback for missing sections and options
+            self.assertEqual(
+                get_config("section2", "option3", test_config_path, "baz"),
+                "baz"
+            )
+            self.assertEqual(
+                get_config("section3", "option3", test_config_path, "baz"),
+                "baz"
+            )
+
         except Exception:
             raise
 
@@ -148,5 +160,37 @@ class TestGetLinterConfig(TestCase):
             remove(path.abspath(test_config_path))
 
 
+class TestInShard(TestCase):
+
+    def test_in_shard(self):
+        paths = ["foo%d.py" % i for i in range(100)]
+
+        shards = [
+            [pth for pth in paths if in_shard(pth, shard, 3)]
+            for shard in (1, 2, 3)
+        ]
+
+        # the shards are disjoint and cover all of the paths
+        self.assertEqual(sorted(sum(shards, [])), sorted(paths))
+
+        # and none of them is empty
+        self.assertTrue(all(shards))
+
+        # there is a single shard by default
+        self.assertTrue(all(in_shard(pth, 1, 1) for pth in paths))
+
+
+class TestSplitVersions(TestCase):
+
+    def test_split_versions(self):
+        self.assertEqual(
+            split_versions(
+                [("a", "1"), ("b", "2"), ("a", "3"), ("a", "4"), ("c", "5")]
+            ),
+            [{"a": "1", "b": "2", "c": "5"}, {"a": "3"}, {"a": "4"}]
+        )
+        self.assertEqual(split_versions([]), [])
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.watcher` submodule.
+"""
+from os import path
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.cache import (
+    get_default_cache_path,
+    ResultCache
+)
+from pre_commit.git import GitHandle
+from pre_commit.watcher import (
+    IndexWatcher,
+    lint_staged_files
+)
+
+from tests.util import (
+    BasicRepo,
+    Writer
+)
+
+
+class TestWatcher(TestCase):
+
+    def test_wait(self):
+        for use_inotify in (True, False):
+            try:
+                # initialize repo
+                repo = BasicRepo(bare=False)
+                git_handle = GitHandle(path=repo.repo_path)
+
+                watcher = IndexWatcher(
+                    git_handle.get_git_dir(),
+                    poll_interval=0.05,
+                    use_inotify=use_inotify
+                )
+
+                # nothing is staged
+                self.assertFalse(watcher.wait(0.2))
+
+                # stage a file
+                w = Writer(path.join(repo.repo_path, "foo.py"))
+                w.write("foo = 1")
+                repo.repo.git.add(w.path)
+
+                self.assertTrue(watcher.wait(1))
+                self.assertFalse(watcher.wait(0.2))
+
+            except Exception:
+                raise
+
+            finally:
+                watcher.close()
+                repo.delete()
+
+    def test_lint_staged_files(self):
+        try:
+            # initialize repo
+            repo = BasicRepo(bare=False)
+            git_handle = GitHandle(path=repo.repo_path)
+
+            # enable the Python linter and the cache
+            conf_file_path = path.join(repo.repo_path, "linters.conf")
+            w = Writer(conf_file_path)
+            w.write(
+                "[linters]\nmarkdown = False\npython = True\nr = False\n"
+                "[options]\ncache = True"
+            )
+
+            # stage a bad Python file
+            w = Writer(path.join(repo.repo_path, "foo.py"))
+            w.write("foo=1")
+            repo.repo.git.add(w.path)
+
+            lint_staged_files(git_handle, conf_file_path)
+
+            # the result is cached for the hook
+            cache = ResultCache(
+                get_default_cache_path(git_handle.get_git_dir())
+            )
+            self.assertEqual(cache.get_stats()["entries"], 1)
+            cache.close()
+
+        except Exception:
+            raise
+
+        finally:
+            repo.delete()
+
+
+if __name__ == "__main__":
+    main()
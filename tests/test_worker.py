@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the `pre_commit.worker` submodule.
+"""
+import sys
+from os import (
+    chdir,
+    chmod,
+    environ,
+    getcwd,
+    mkdir,
+    path
+)
+from tempfile import TemporaryDirectory
+from time import (
+    sleep,
+    time
+)
+from unittest import (
+    main,
+    TestCase
+)
+
+from pre_commit.diagnostics import Diagnostic
+from pre_commit.linters import Linter
+from pre_commit.worker import (
+    END_OF_OUTPUT,
+    get_socket_dir,
+    WorkerClient,
+    WorkerError
+)
+
+
+# an interpreter that "lints" a file by printing its first line, and that
+# prints its process id instead if the file is empty
+INTERPRETER = [
+    sys.executable, "-c", """
+import os, sys
+for line in sys.stdin:
+    cwd, file_path = line.rstrip("\\n").split("\\t")
+    with open(os.path.join(cwd, file_path)) as f:
+        content = f.readline()
+    print("%%s: %%s" %% (file_path, content.strip() or os.getpid()))
+    print(%r, flush=True)
+""" % END_OF_OUTPUT
+]
+
+
+class WorkerLinter(Linter):
+
+    worker_command = INTERPRETER
+
+    def __init__(self):
+        super().__init__(".txt")
+
+    def linter_command(self, f):
+        return ["echo", "fallback"]
+
+
+class TestWorker(TestCase):
+
+    def setUp(self):
+        # keep the sockets of the tests apart
+        self.tmp = TemporaryDirectory()
+        self.runtime_dir = environ.get("XDG_RUNTIME_DIR")
+        environ["XDG_RUNTIME_DIR"] = self.tmp.name
+
+        for name, content in (("foo.txt", "foo"), ("empty.txt", "")):
+            with open(path.join(self.tmp.name, name), "w") as f:
+                f.write(content)
+
+    def tearDown(self):
+        if self.runtime_dir is None:
+            del environ["XDG_RUNTIME_DIR"]
+        else:
+            environ["XDG_RUNTIME_DIR"] = self.runtime_dir
+        self.tmp.cleanup()
+
+    def test_client(self):
+        client = WorkerClient(INTERPRETER, idle_timeout=1)
+
+        # the first request starts the worker
+        outputs = client.lint(self.tmp.name, ["foo.txt", "empty.txt"])
+        self.assertEqual(outputs["foo.txt"], "foo.txt: foo\n")
+        pid = outputs["empty.txt"]
+
+        # the second request is served by the same interpreter
+        self.assertEqual(
+            client.lint(self.tmp.name, ["empty.txt"])["empty.txt"], pid
+        )
+
+        # the worker exits once it is idle
+        deadline = time() + 10
+        while path.exists(client.socket_path) and time() < deadline:
+            sleep(0.1)
+        self.assertFalse(path.exists(client.socket_path))
+
+        # and it is started again on demand
+        self.assertNotEqual(
+            client.lint(self.tmp.name, ["empty.txt"])["empty.txt"], pid
+        )
+
+    def test_missing_interpreter(self):
+        client = WorkerClient(["no-such-interpreter"])
+
+        # the client does not wait for a daemon that failed
+        start = time()
+        with self.assertRaises(WorkerError):
+            client.lint(self.tmp.name, ["foo.txt"])
+        self.assertLess(time() - start, client.start_timeout)
+
+    def test_request_timeout(self):
+        # an interpreter that never answers
+        client = WorkerClient(
+            [sys.executable, "-c", "import time; time.sleep(60)"],
+            idle_timeout=1,
+            request_timeout=0.5
+        )
+
+        start = time()
+        with self.assertRaises(WorkerError):
+            client.lint(self.tmp.name, ["foo.txt"])
+        self.assertLess(time() - start, 10)
+
+    def test_socket_dir(self):
+        client = WorkerClient(INTERPRETER, idle_timeout=1)
+
+        # the sockets are in a private directory of the user
+        socket_dir = get_socket_dir()
+        self.assertEqual(path.dirname(client.socket_path), socket_dir)
+        client.lint(self.tmp.name, ["foo.txt"])
+        self.assertTrue(path.isdir(socket_dir))
+
+        # a directory that other users can access is never used
+        other_dir = path.join(self.tmp.name, "other")
+        mkdir(other_dir)
+        chmod(other_dir, 0o777)
+        environ["XDG_RUNTIME_DIR"] = other_dir
+        mkdir(get_socket_dir())
+        chmod(get_socket_dir(), 0o777)
+        with self.assertRaises(WorkerError):
+            WorkerClient(INTERPRETER, idle_timeout=1).lint(
+                self.tmp.name, ["foo.txt"]
+            )
+
+    def test_linter(self):
+        linter = WorkerLinter()
+        linter.use_worker(idle_timeout=1)
+
+        plan = linter.plan(["foo.txt"])
+        self.assertEqual(plan.batches, [["foo.txt"]])
+
+        cwd = getcwd()
+        try:
+            chdir(self.tmp.name)
+            self.assertEqual(
+                linter.run_batch(["foo.txt"]),
+                {"foo.txt": (1, [
+                    Diagnostic("foo.txt", None, None, "", "foo.txt: foo",
+                               "error")
+                ])}
+            )
+
+            # if the worker fails, the linter falls back to its command
+            linter._worker = WorkerClient(["false"], start_timeout=0.5)
+            self.assertEqual(
+                linter.run_batch(["foo.txt"]),
+                {"foo.txt": (1, [
+                    Diagnostic("foo.txt", None, None, "", "fallback", "error")
+                ])}
+            )
+            self.assertIsNone(linter._worker)
+
+        except Exception:
+            raise
+
+        finally:
+            chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()